@@ -0,0 +1,57 @@
+import argparse
+import backtest
+from rules import iter_shoes
+from results import iter_binary
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtests betting strategies on baccarat shoes.')
+    parser.add_argument('-i', action='store', dest='input', default=None,
+                        help='binary file of baccarat-sim.py to replay, simulates new shoes by default')
+    parser.add_argument('-s', action='store', dest='shoes', default=1000,
+                        type=int, help='number of shoes to be simulated, default 1000')
+    parser.add_argument('-d', action='store', dest='decks', default=8,
+                        type=int, help='number of decks per shoe, default 8')
+    parser.add_argument('--seed', action='store', dest='seed', default=None,
+                        type=int, help='seed of the shuffles, random by default')
+    parser.add_argument('-b', action='store', dest='bankrolls', default=[100, 1000],
+                        type=int, nargs='+', help='initial balances, default 100 1000')
+    parser.add_argument('-u', action='store', dest='unit', default=10,
+                        type=int, help='base bet, default 10')
+    parser.add_argument('--hand', action='store', dest='hand', default='banco',
+                        choices=['punto', 'banco', 'tie'], help='hand bet by the strategies, default banco')
+    parser.add_argument('--strategies', action='store', dest='strategies', nargs='+',
+                        default=list(backtest.STRATEGIES), choices=list(backtest.STRATEGIES),
+                        help='strategies to be tested, default all')
+    parser.add_argument('--session', action='store', dest='session', default=1,
+                        type=int, help='number of shoes of a session, default 1')
+    args = parser.parse_args()
+    if args.unit < 1:
+        parser.error('the base bet must be positive')
+    if min(args.bankrolls) < 1:
+        parser.error('the bankrolls must be positive')
+    if args.session < 1:
+        parser.error('the shoes of a session must be positive')
+
+    if args.input:
+        stream = iter_binary(args.input)
+    else:
+        stream = iter_shoes(args.shoes, args.decks, args.seed)
+
+    strategies = {name: (lambda name=name: backtest.STRATEGIES[name](args.unit, args.hand))
+                  for name in args.strategies}
+    test = backtest.Backtest(strategies, args.bankrolls, args.session)
+    test.run(stream)
+
+    for name, bankrolls in test.report().items():
+        print(f'\n{name.title()}:')
+        for bankroll, result in bankrolls.items():
+            percentiles = ', '.join(f'p{point}: {value}'
+                                    for point, value in result['percentiles'].items())
+            print(f'Bankroll {bankroll}:\t{result["sessions"]} sessions\t'
+                  f'mean: {round(result["mean_balance"], 2)}\t{percentiles}\t'
+                  f'ruin: {round(result["ruin_probability"] * 100, 2)}%\t'
+                  f'drawdown mean: {round(result["mean_drawdown"], 2)}, '
+                  f'max: {result["max_drawdown"]}')
+
+if __name__ == '__main__':
+    main()
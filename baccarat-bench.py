@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import importlib.util
+from cards import Card, Shoe
+from hands import Hand, Banco
+from rules import Game
+from results import MAGIC, RECORD
+
+SIM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baccarat-sim.py')
+# Engines of baccarat-sim.py, the numpy one only if NumPy is installed.
+ENGINES = ['object', 'table'] + (['numpy'] if importlib.util.find_spec('numpy') else [])
+
+def time_call(func, repeats):
+    """Times a callable with timeit.
+
+    Args:
+        func: callable without arguments.
+        repeats: int, number of timing repeats, the fastest one is kept.
+
+    Returns:
+        float, seconds per call.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+def bench_shoe_init():
+    return lambda: Shoe(8)
+
+def bench_add_decks():
+    shoe = Shoe(8)
+
+    def add_decks():
+        shoe.clear()
+        shoe.add_decks()
+    return add_decks
+
+def bench_draw_cards():
+    shoe = Shoe(8, rng=1)
+    return lambda: shoe.draw_cards(6)
+
+def bench_hand_value():
+    hand = Hand([Card(7, 'hearts'), Card('king', 'spades'), Card(5, 'clubs')])
+    return lambda: hand.value
+
+def bench_banco_draw_third():
+    banco = Banco([Card(4, 'hearts'), Card('ace', 'spades')])
+    player_third = Card(6, 'clubs')
+    return lambda: banco.draw_third(player_third)
+
+def bench_game_cycle():
+    game = Game(8, rng=1)
+
+    def cycle():
+        if game.num_cards < 6:
+            game.create_shoe(8)
+        game.deal_hands()
+        if not game.is_natural():
+            game.draw_thirds()
+        game.game_result()
+    return cycle
+
+BENCHMARKS = {
+    'shoe_init': bench_shoe_init,
+    'shoe_add_decks': bench_add_decks,
+    'shoe_draw_cards': bench_draw_cards,
+    'hand_value': bench_hand_value,
+    'banco_draw_third': bench_banco_draw_third,
+    'game_cycle': bench_game_cycle,
+    }
+
+def bench_simulator(engine, num_shoes):
+    """Runs baccarat-sim.py end to end with an engine, from the start of the
+    interpreter to the totals, writing num_shoes 8 deck shoes with a fixed
+    seed to a binary file in a temporary directory.
+
+    Returns:
+        dict, with the seconds, the number of coups and the coups per second
+            of the run.
+    """
+    command = [sys.executable, SIM_PATH, '-s', str(num_shoes), '-d', '8', '-e', engine,
+               '--seed', '1', '-f', 'bin']
+    with tempfile.TemporaryDirectory() as directory:
+        # Untimed run of a single shoe, so that the modules are compiled and cached
+        subprocess.run(command[:3] + ['1'] + command[4:], cwd=directory, check=True,
+                       stdout=subprocess.DEVNULL)
+        for file_name in os.listdir(directory):
+            os.remove(os.path.join(directory, file_name))
+        start = time.perf_counter()
+        subprocess.run(command, cwd=directory, check=True, stdout=subprocess.DEVNULL)
+        seconds = time.perf_counter() - start
+        file_name, = os.listdir(directory)
+        coups = (os.path.getsize(os.path.join(directory, file_name)) - len(MAGIC)) // RECORD.size
+    return {'seconds': seconds, 'coups': coups, 'coups_per_second': coups / seconds}
+
+def run(repeats, num_shoes, engines):
+    """Runs all the benchmarks.
+
+    Returns:
+        dict, the report to be saved as JSON.
+    """
+    report = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'benchmarks': {},
+        'simulator': {},
+        }
+    for name, setup in BENCHMARKS.items():
+        seconds = time_call(setup(), repeats)
+        report['benchmarks'][name] = {'seconds': seconds, 'ops_per_second': 1 / seconds}
+        print(f'{name}:\t{seconds * 1e6:.3f} us', file=sys.stderr)
+    for engine in engines:
+        report['simulator'][engine] = bench_simulator(engine, num_shoes)
+        print(f'sim_{engine}:\t{report["simulator"][engine]["coups_per_second"]:.0f} coups/s',
+              file=sys.stderr)
+    return report
+
+def compare(old_file, new_file, threshold):
+    """Prints the change of each benchmark between two reports.
+
+    Returns:
+        int, the number of regressions slower than threshold.
+    """
+    with open(old_file) as old_json, open(new_file) as new_json:
+        old = json.load(old_json)
+        new = json.load(new_json)
+    rows = []
+    for name in old['benchmarks'].keys() & new['benchmarks'].keys():
+        rows.append((name, old['benchmarks'][name]['seconds'],
+                     new['benchmarks'][name]['seconds']))
+    for engine in old['simulator'].keys() & new['simulator'].keys():
+        # Time per coup, so that it compares like the other benchmarks
+        rows.append((f'sim_{engine}', 1 / old['simulator'][engine]['coups_per_second'],
+                     1 / new['simulator'][engine]['coups_per_second']))
+    regressions = 0
+    for name, old_seconds, new_seconds in sorted(rows):
+        ratio = new_seconds / old_seconds
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '\tREGRESSION'
+            regressions += 1
+        print(f'{name}:\t{old_seconds * 1e6:.3f} us -> {new_seconds * 1e6:.3f} us\t'
+              f'x{1 / ratio:.2f}{flag}')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the game classes and the simulator.')
+    parser.add_argument('-o', action='store', dest='output', default=None,
+                        help='JSON report file, printed to stdout by default')
+    parser.add_argument('-r', action='store', dest='repeats', default=5,
+                        type=int, help='timing repeats of each benchmark, default 5')
+    parser.add_argument('-s', action='store', dest='shoes', default=1000,
+                        type=int, help='shoes played by each simulator engine, default 1000')
+    parser.add_argument('-e', '--engines', action='store', dest='engines', nargs='*',
+                        default=ENGINES, help='simulator engines, default all the '
+                                              f'installed ones: {" ".join(ENGINES)}')
+    parser.add_argument('--compare', action='store', dest='compare', nargs=2, default=None,
+                        metavar=('OLD', 'NEW'), help='compare two JSON reports')
+    parser.add_argument('--threshold', action='store', dest='threshold', default=0.2,
+                        type=float, help='slowdown reported as regression, default 0.2')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = json.dumps(run(args.repeats, args.shoes, args.engines), indent=2)
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            report_file.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,46 @@
+import sys
+import json
 import time
-from rules import Table
+import argparse
+from rules import Table, GameError
+from players import InvalidBet
+
+# Hands accepted on the bet prompts and commands.
+HANDS = {
+    'p': 'punto',
+    'punto': 'punto',
+    'b': 'banco',
+    'banco': 'banco',
+    't': 'tie',
+    'tie': 'tie'
+    }
+
+# Errors of a script command reported on its record instead of stopping the script.
+COMMAND_ERRORS = (ValueError, TypeError, IndexError, GameError, InvalidBet)
+
+def to_int(value):
+    """Converts a string to int if it can, returns it unchanged otherwise so
+    the game reports the invalid value.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
 
 class Cli:
     """Command line interface of the game. Only interacts with Table object in
     order to receive input from the game logic.
+
+    Args:
+        seed: int, seed of the shoe shuffles. Optional, random by default.
+        pace: bool, pause between the steps of a coup and wait for <enter>
+            after each action. Optional, default value True.
     """
-    def __init__(self):
-        self._game = Table()
+    def __init__(self, seed=None, pace=True):
+        self._game = Table(rng=seed)
         self._quit = False
+        self._pace = pace
+        self._rounds = 0
         self._options = {
             '1': self.status,
             '2': self.add_player,
@@ -16,6 +49,26 @@ class Cli:
             '5': self.create_shoe,
             '0': self.quit
             }
+        # Script commands and their usage, see run_script().
+        self._commands = {
+            'add': (self.add_command, 'add BALANCE'),
+            'bet': (self.bet_command, 'bet PLAYER HAND AMOUNT'),
+            'side': (self.side_command, 'side PLAYER BET AMOUNT'),
+            'deal': (self.play_round, 'deal'),
+            'shoe': (self.shoe_command, 'shoe DECKS'),
+            'status': (self.status_command, 'status'),
+            'quit': (None, 'quit')
+            }
+
+    def sleep(self, seconds):
+        """Pauses the output unless pacing is disabled."""
+        if self._pace:
+            time.sleep(seconds)
+
+    def wait(self):
+        """Waits for <enter> unless pacing is disabled."""
+        if self._pace:
+            input('Press <enter> to continue...')
 
     def run(self):
         """Main menu of the game."""
@@ -39,14 +92,15 @@ Options:
 
     def status(self):
         """Prints the players status and other in game information."""
-        print(f'Shoe with {self._game.num_decks} deck(s).')
-        if self._game.available_players:
-            print(f'{len(self._game.available_players)} player(s) in game:')
-            for player in self._game.available_players:
-                print(self._game[player])
+        record = self.status_command()
+        print(f'Shoe with {record["decks"]} deck(s).')
+        if record['players']:
+            print(f'{len(record["players"])} player(s) in game:')
+            for player in record['players']:
+                print(player)
         else:
             print('No players present on the table.')
-        input('Press <enter> to continue...')
+        self.wait()
 
     def add_player(self):
         """Adds a new player to the game."""
@@ -54,15 +108,10 @@ Options:
         if balance_input.lower() in ['c', 'cancel']:
             return
         try:
-            # Try to convert to int but don't capture error
-            try:
-                balance_input = int(balance_input)
-            except:
-                pass
-            self._game.add_player(balance_input)
+            record = self.add_command(balance_input)
             print()
-            print(f'Player added with {balance_input} balance.')
-            input('Press <enter> to continue...')
+            print(f'Player added with {record["balance"]} balance.')
+            self.wait()
         except (ValueError, TypeError) as error:
             print()
             print(error)
@@ -78,18 +127,10 @@ Options:
             print('All bets placed.')
         else:
             print('No players to place bets.')
-        input('Press <enter> to continue...')
+        self.wait()
 
     def bet(self, player_i):
         """Places an individual bet for player_i."""
-        hands = {
-            'p': 'punto',
-            'punto': 'punto',
-            'b': 'banco',
-            'banco': 'banco',
-            't': 'tie',
-            'tie': 'tie'
-            }
         action = 'Replacing' if player_i in self._game.valid_bets else 'New'
         print(f'{action} bet for Player {player_i + 1}. Press <s> to skip.')
         hand_input = input('The hand to bet. <p> punto, <b> banco, <t> tie: ')
@@ -101,12 +142,7 @@ Options:
             print()
             return
         try:
-            # Try to convert to int but don't capture error
-            try:
-                amount_input = int(amount_input)
-            except:
-                pass
-            self._game.bet(player_i, hands.get(hand_input.lower()), amount_input)
+            self.bet_command(player_i + 1, hand_input, amount_input)
             print()
         except (ValueError, TypeError, GameError) as error:
             print()
@@ -114,65 +150,62 @@ Options:
             self.bet(player_i)
 
     def deal_hands(self):
-        """Deals both punto and banco hands and proceeds with the game itself.
-        Check if there is a natural, draws possible thrird cards and apply the
-        bet results.
+        """Plays a coup with play_round() and prints it step by step: both
+        hands as dealt, the natural or the third cards drawn, the result and
+        the settled bets.
         """
+        record = self.play_round()
 
         def result_str():
             """Returns a string with the game result to be printed as output."""
-            if self._game.game_result() != 'tie':
-                return self._game.game_result().title() + ' win'
+            if record['result'] != 'tie':
+                return record['result'].title() + ' win'
             else:
-                return self._game.game_result().title()
-
-        def print_hands():
-            print(f'Punto hand: {self._game.punto_cards}.')
-            punto_values = ', '.join([str(value) for value in self._game.punto_values])
-            print(f'Cards values: {punto_values}.')
-            print(f'Total hand value: value: {self._game.punto_value}.')
-            time.sleep(0.5)
-            print(f'Banco hand: {self._game.banco_cards}.')
-            banco_values = ', '.join([str(value) for value in self._game.banco_values])
-            print(f'Cards values: {banco_values}.')
-            print(f'Total hand value: value: {self._game.banco_value}.')
+                return record['result'].title()
 
+        def print_hands(num_cards=None):
+            """Prints both hands, with only their num_cards first cards if set."""
+            for hand in ['punto', 'banco']:
+                if hand == 'banco':
+                    self.sleep(0.5)
+                cards = record[f'{hand}_cards'].split(', ')[:num_cards]
+                values = record[f'{hand}_values'][:num_cards]
+                print(f'{hand.title()} hand: {", ".join(cards)}.')
+                print(f'Cards values: {", ".join([str(value) for value in values])}.')
+                print(f'Total hand value: value: {sum(values) % 10}.')
 
         print('Dealing hands...')
-        time.sleep(1)
-        self._game.deal_hands()
-        print_hands()
+        self.sleep(1)
+        print_hands(2)
         print()
-        if self._game.is_natural():
-            time.sleep(0.5)
+        if record['natural']:
+            self.sleep(0.5)
             print(f'{result_str()}. Natural.')
         else:
             print('Drawing third cards...')
-            time.sleep(1)
-            third_draws = self._game.draw_thirds()
-            for third_draw in third_draws:
+            self.sleep(1)
+            for third_draw in record['third_draws']:
                 print(f'{third_draw[0].title()} draw third card, {third_draw[1]}.')
-                time.sleep(0.5)
+                self.sleep(0.5)
             print()
             print_hands()
-            time.sleep(0.5)
+            self.sleep(0.5)
             print(f'{result_str()}.')
         print()
-        input('Press <enter> to continue...')
+        self.wait()
         print()
         print('Checking bets...')
-        time.sleep(1)
-        if self._game.valid_bets:
-            for player_i in self._game.valid_bets:
-                bet_result = self._game.bet_result(player_i)
-                print(f'Player {player_i + 1} {bet_result[0]}. Balance: {bet_result[1]}.')
-                time.sleep(0.5)
+        self.sleep(1)
+        if record['bets']:
+            for bet in record['bets']:
+                print(f'Player {bet["player"]} {bet["outcome"]}. Balance: {bet["balance"]}.')
+                self.sleep(0.5)
         else:
             print('No bets no table.')
-        if self._game.open_bets():
+        if record['bets_open']:
             print('Bets are open.')
         print()
-        input('Press <enter> to continue...')
+        self.wait()
 
     def create_shoe(self):
         """Creates a new shoe. Replaces the previous one."""
@@ -180,15 +213,10 @@ Options:
         if shoe_input.lower() in ['c', 'cancel']:
             return
         try:
-            # Try to convert to int but don't capture error
-            try:
-                shoe_input = int(shoe_input)
-            except:
-                pass
-            self._game.create_shoe(shoe_input)
+            record = self.shoe_command(shoe_input)
             print()
-            print(f'A new shoe with {int(shoe_input)} deck(s) will be used on the game.')
-            input('Press <enter> to continue...')
+            print(f'A new shoe with {record["decks"]} deck(s) will be used on the game.')
+            self.wait()
         except (ValueError, TypeError) as error:
             print()
             print(error)
@@ -205,5 +233,125 @@ Options:
             print('Invalid input.')
             self.quit()
 
+    def run_script(self, lines):
+        """Runs commands without pauses or prompts and prints a JSON record of
+        each one. Each line holds a command of self._commands with its
+        arguments, players being numbered from 1 as on the menus. Anything
+        after a # is a comment. A command that fails is reported with ok false
+        and the error, and the script goes on.
+
+        Args:
+            lines: iterable, the lines of the script, such as a file.
+
+        Returns:
+            int, the number of commands that failed.
+        """
+        failed = 0
+        for line_number, line in enumerate(lines, 1):
+            words = line.split('#', 1)[0].split()
+            if not words:
+                continue
+            command = words[0].lower()
+            record = {'line': line_number, 'command': command}
+            try:
+                if command not in self._commands:
+                    raise ValueError('Command not recognized.')
+                action, usage = self._commands[command]
+                if len(words) != len(usage.split()):
+                    raise ValueError(f'Usage: {usage}.')
+                if action is None:
+                    break
+                record.update(action(*words[1:]))
+                record['ok'] = True
+            except COMMAND_ERRORS as error:
+                record.update({'ok': False, 'error': str(error)})
+                failed += 1
+            print(json.dumps(record))
+        return failed
+
+    def player_index(self, player):
+        """Returns the index of a player numbered from 1.
+
+        Raises:
+            IndexError: If there is no such player.
+        """
+        player_i = to_int(player)
+        if not isinstance(player_i, int) or not 0 < player_i <= self._game.num_players:
+            raise IndexError('Invalid player.')
+        return player_i - 1
+
+    def add_command(self, balance):
+        """Adds a new player, see run_script(). Used by add_player()."""
+        balance = to_int(balance)
+        self._game.add_player(balance)
+        return {'player': self._game.num_players, 'balance': balance}
+
+    def bet_command(self, player, hand, amount):
+        """Places or replaces the bet of a player, see run_script(). Used by
+        bet().
+        """
+        player_i = self.player_index(player)
+        self._game.bet(player_i, HANDS.get(hand.lower()), to_int(amount))
+        return {'player': player_i + 1}
+
+    def side_command(self, player, bet, amount):
+        """Places a side bet of a player, see run_script()."""
+        player_i = self.player_index(player)
+        self._game.side_bet(player_i, bet.lower(), to_int(amount))
+        return {'player': player_i + 1}
+
+    def play_round(self):
+        """Plays a coup step by step and settles every bet, without any
+        output. Runs the deal command of the scripts and deal_hands().
+
+        Returns:
+            dict, the round number, the result, whether there was a natural,
+                the cards, card values and values of both hands, the third
+                cards drawn, for every bet the player, win, lose or push and
+                the balance, and whether the bets are open.
+        """
+        self._game.deal_hands()
+        natural = self._game.is_natural()
+        third_draws = [] if natural else self._game.draw_thirds()
+        bets = []
+        for player_i in self._game.valid_bets:
+            outcome, balance = self._game.bet_result(player_i)
+            bets.append({'player': player_i + 1, 'outcome': outcome, 'balance': balance})
+        bets_open = self._game.open_bets()
+        self._rounds += 1
+        return {'round': self._rounds, 'result': self._game.game_result(), 'natural': natural,
+                'punto_cards': self._game.punto_cards, 'punto_values': self._game.punto_values,
+                'punto_value': self._game.punto_value, 'banco_cards': self._game.banco_cards,
+                'banco_values': self._game.banco_values, 'banco_value': self._game.banco_value,
+                'third_draws': third_draws, 'bets': bets, 'bets_open': bets_open}
+
+    def shoe_command(self, decks):
+        """Replaces the shoe, see run_script(). Used by create_shoe()."""
+        self._game.create_shoe(to_int(decks))
+        return {'decks': self._game.num_decks}
+
+    def status_command(self):
+        """Returns the status of the players in game, see run_script(). Used
+        by status().
+        """
+        return {'decks': self._game.num_decks,
+                'players': [self._game[player_i] for player_i in self._game.available_players]}
+
 if __name__ == '__main__':
-    Cli().run()
+    parser = argparse.ArgumentParser(description='Plays baccarat on the command line.')
+    parser.add_argument('--seed', action='store', dest='seed', default=None,
+                        type=int, help='seed of the shoe shuffles, random by default')
+    parser.add_argument('--script', action='store', dest='script', default=None,
+                        help='runs the commands of a file, or of stdin with -, without '
+                             'pauses and prints a JSON line per command')
+    args = parser.parse_args()
+    if args.script is None:
+        Cli(args.seed).run()
+    else:
+        cli = Cli(args.seed, pace=False)
+        if args.script == '-':
+            failed = cli.run_script(sys.stdin)
+        else:
+            with open(args.script) as script:
+                failed = cli.run_script(script)
+        sys.exit(1 if failed else 0)
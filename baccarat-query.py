@@ -0,0 +1,101 @@
+import argparse
+import index
+from results import RECORD
+
+def print_matches(matches, idx, limit):
+    """Prints the number of matches, of shoes with matches and the first ones."""
+    shoes = len({shoe_i for shoe_i, *_ in matches})
+    print(f'{len(matches)} matches in {shoes} of {idx.num_shoes} shoes.')
+    for shoe_i, coup, *length in matches[:limit]:
+        extra = f', length {length[0]}' if length else ''
+        print(f'Shoe {idx.shoe_number(shoe_i)}, coup {coup + 1}{extra}')
+
+def flag(value):
+    """Parses a yes or no command line value."""
+    if value.lower() not in ['yes', 'no']:
+        raise argparse.ArgumentTypeError('Expected yes or no.')
+    return value.lower() == 'yes'
+
+def main():
+    parser = argparse.ArgumentParser(description='Queries results files of baccarat-sim.py '
+                                                 'through their side index.')
+    parser.add_argument('file', help='results file of baccarat-sim.py, in any format')
+    parser.add_argument('--rebuild', action='store_true', dest='rebuild',
+                        help='build the index again even if it is up to date')
+    parser.add_argument('-n', action='store', dest='limit', default=10,
+                        type=int, help='number of matches listed, default 10')
+    queries = parser.add_subparsers(dest='query')
+
+    streaks = queries.add_parser('streaks', help='streaks of a result')
+    streaks.add_argument('result', choices=['banco', 'punto', 'tie'])
+    streaks.add_argument('--min', action='store', dest='minimum', default=1, type=int,
+                         help='shortest streak, default 1')
+    streaks.add_argument('--skip-ties', action='store_true', dest='skip_ties',
+                         help='ties neither break nor extend the streaks')
+    streaks.add_argument('--histogram', action='store_true', dest='histogram',
+                         help='print the number of streaks of each length')
+
+    shoes = queries.add_parser('shoes', help='shoes by the number of wins of a result')
+    shoes.add_argument('result', choices=['banco', 'punto', 'tie'])
+    shoes.add_argument('--min', action='store', dest='minimum', default=0, type=int,
+                       help='fewest wins, default 0')
+    shoes.add_argument('--max', action='store', dest='maximum', default=None, type=int,
+                       help='most wins, unlimited by default')
+
+    pattern = queries.add_parser('pattern', help='regular expression over the results')
+    pattern.add_argument('pattern', help='pattern of the letters B, P and T, such as B{8,}')
+
+    outcomes = queries.add_parser('outcomes', help='coups by card values')
+    outcomes.add_argument('--result', choices=['banco', 'punto', 'tie'], default=None)
+    outcomes.add_argument('--punto-value', dest='punto_value', type=int, default=None)
+    outcomes.add_argument('--banco-value', dest='banco_value', type=int, default=None)
+    outcomes.add_argument('--punto-third', dest='punto_third', type=flag, default=None,
+                          metavar='{yes,no}')
+    outcomes.add_argument('--banco-third', dest='banco_third', type=flag, default=None,
+                          metavar='{yes,no}')
+    outcomes.add_argument('--natural', dest='natural', type=flag, default=None,
+                          metavar='{yes,no}')
+
+    show = queries.add_parser('show', help='print the records of a shoe')
+    show.add_argument('shoe', type=int, help='index of the shoe, starting at 1')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        idx = index.build_index(args.file)
+    else:
+        idx = index.open_index(args.file)
+    print(f'{idx.num_shoes} shoes, {idx.num_coups} coups.')
+
+    if args.query == 'streaks':
+        if args.histogram:
+            for length, count in idx.streak_counts(args.result, args.skip_ties).items():
+                if length >= args.minimum:
+                    print(f'{length}:\t{count}')
+        else:
+            print_matches(idx.runs(args.result, args.minimum, args.skip_ties), idx, args.limit)
+    elif args.query == 'shoes':
+        shoe_indexes = idx.shoes_where(args.result, args.minimum, args.maximum)
+        print(f'{len(shoe_indexes)} of {idx.num_shoes} shoes.')
+        for shoe_i in shoe_indexes[:args.limit]:
+            counts = ', '.join(f'{result}: {count}'
+                               for result, count in idx.shoe_counts(shoe_i).items())
+            print(f'Shoe {idx.shoe_number(shoe_i)}: {counts}')
+    elif args.query == 'pattern':
+        print_matches(idx.find(args.pattern), idx, args.limit)
+    elif args.query == 'outcomes':
+        print_matches(idx.outcomes(args.result, args.punto_value, args.banco_value,
+                                   args.punto_third, args.banco_third, args.natural),
+                      idx, args.limit)
+    elif args.query == 'show':
+        if not 1 <= args.shoe <= idx.num_shoes:
+            parser.error(f'the shoe must be between 1 and {idx.num_shoes}')
+        records = idx.shoe_records(args.shoe - 1)
+        if idx.file_format == 'bin':
+            records = ''.join(','.join(map(str, record)) + '\n'
+                              for record in RECORD.iter_unpack(records))
+        else:
+            records = records.decode()
+        print(records)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import bankroll
+import odds
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulates bankroll trajectories of flat betting.')
+    parser.add_argument('--hand', action='store', dest='hand', default='banco',
+                        choices=['punto', 'banco', 'tie'], help='hand bet on every coup, default banco')
+    parser.add_argument('-u', action='store', dest='bet', default=10,
+                        type=int, help='amount of every bet, default 10')
+    parser.add_argument('-b', action='store', dest='bankroll', default=1000,
+                        type=int, help='initial balance, default 1000')
+    parser.add_argument('-c', action='store', dest='coups', default=1000,
+                        type=int, help='number of coups of a trajectory, default 1000')
+    parser.add_argument('-t', action='store', dest='trajectories', default=100000,
+                        type=int, help='number of trajectories, default 100000')
+    parser.add_argument('-d', action='store', dest='decks', default=8,
+                        type=int, help='number of decks of the exact probabilities, default 8')
+    parser.add_argument('-p', action='store', dest='probabilities', default=None,
+                        type=float, nargs=3, metavar=('BANCO', 'PUNTO', 'TIE'),
+                        help='probabilities or counts of the results, such as the totals of '
+                             'baccarat-sim.py, exact ones by default')
+    parser.add_argument('--chunk', action='store', dest='chunk', default=100000,
+                        type=int, help='trajectories simulated at a time, default 100000')
+    parser.add_argument('--seed', action='store', dest='seed', default=None,
+                        type=int, help='seed of the simulation, random by default')
+    args = parser.parse_args()
+
+    if args.probabilities:
+        probabilities = dict(zip(['banco', 'punto', 'tie'], args.probabilities))
+    else:
+        probabilities = odds.outcome_probabilities(odds.shoe_counts(args.decks))
+
+    result = bankroll.risk_of_ruin(probabilities, args.hand, args.bet, args.bankroll,
+                                   args.coups, args.trajectories, args.chunk, rng=args.seed)
+
+    print(f'Risk of ruin:\t{round(result["ruin_probability"] * 100, 4)}%')
+    if result['time_to_ruin']['mean'] is not None:
+        percentiles = ', '.join(f'p{point}: {value}'
+                                for point, value in result['time_to_ruin']['percentiles'].items())
+        print(f'Time to ruin:\tmean: {round(result["time_to_ruin"]["mean"], 2)}\t{percentiles}')
+    print(f'Mean balance:\t{round(result["mean_balance"], 2)}')
+    print('\nCoup\t' + '\t'.join(f'p{point}' for point in result['curves']))
+    for i, coup in enumerate(result['coups']):
+        print(f'{coup}\t' + '\t'.join(str(curve[i]) for curve in result['curves'].values()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import asyncio
+import argparse
+from server import Server, BET_WINDOW, QUEUE_SIZE
+
+def main():
+    parser = argparse.ArgumentParser(description='Hosts baccarat tables for clients speaking '
+                                                 'JSON lines over TCP or a Unix socket.')
+    parser.add_argument('--host', action='store', dest='host', default='127.0.0.1',
+                        help='address to listen on, default 127.0.0.1')
+    parser.add_argument('-p', action='store', dest='port', default=8765,
+                        type=int, help='TCP port, default 8765')
+    parser.add_argument('--unix', action='store', dest='path', default=None,
+                        help='listen on a Unix socket at this path instead of TCP')
+    parser.add_argument('-w', action='store', dest='window', default=BET_WINDOW,
+                        type=float, help=f'seconds the bets stay open after the first bet '
+                                         f'of a coup, default {BET_WINDOW}')
+    parser.add_argument('-d', action='store', dest='decks', default=8,
+                        type=int, help='number of decks of new tables, default 8')
+    parser.add_argument('--seed', action='store', dest='seed', default=None,
+                        type=int, help='seed of the shoe shuffles, random by default')
+    parser.add_argument('--queue', action='store', dest='queue', default=QUEUE_SIZE,
+                        type=int, help='messages queued for a client before it is '
+                                       f'disconnected, default {QUEUE_SIZE}')
+    args = parser.parse_args()
+
+    server = Server(args.window, args.decks, args.seed, args.queue)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    listener = loop.run_until_complete(server.start(args.host, args.port, args.path))
+    print(f'Serving on {args.path or f"{args.host}:{args.port}"}.')
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        listener.close()
+        loop.run_until_complete(listener.wait_closed())
+        loop.close()
+
+if __name__ == '__main__':
+    main()
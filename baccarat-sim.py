@@ -1,16 +1,314 @@
+import os
+import json
 import datetime
 import argparse
-from rules import Game
-
-def hand_values(hand):
-    """Creates a list of strings with the values of a hand."""
-    values = []
-    for i in range(3):
-        try:
-            values.append(str(hand[i]))
-        except IndexError:
-            values.append('x')
-    return values
+import cProfile
+import itertools
+import collections
+import multiprocessing
+import random
+from cards import CompactShoe, make_rng
+from rules import Coup, iter_coups
+from results import FORMATS, WRITERS, EXTENSIONS
+from profiling import StageTimer
+from sides import SIDE_BETS, PAIR_PAYOUT, LOSS, SideTally, coup_payouts, value_payout_table
+from roads import RoadStats
+from stats import BatchMeans
+from players import PAYOUTS
+
+ENGINES = ['object', 'table', 'numpy']
+SHOE_BATCH = 1000
+RESULTS = ['banco', 'punto', 'tie']
+CATEGORIES = {result: i for i, result in enumerate(RESULTS)}
+
+# Value of each streamed statistic on a coup of each result of RESULTS, the
+# rate of every result and the winnings of a unit bet on every hand.
+METRICS = {**{f'{result} rate': [int(result == other) for other in RESULTS]
+              for result in RESULTS},
+           **{f'{hand} EV': [PAYOUTS[hand] if hand == other else -1 for other in RESULTS]
+              for hand in RESULTS}}
+
+def side_bet_payouts():
+    """Returns, by side bet of sides.SIDE_BETS, the sorted winnings per unit it
+    can pay on a coup, the categories of its streamed EV.
+    """
+    payouts = {bet: {PAIR_PAYOUT, LOSS} for bet in SIDE_BETS[:2]}
+    payouts.update({bet: set() for bet in SIDE_BETS[2:]})
+    for value_payouts in value_payout_table().values():
+        for bet, payout in zip(SIDE_BETS[2:], value_payouts):
+            payouts[bet].add(payout)
+    return {bet: sorted(bet_payouts) for bet, bet_payouts in payouts.items()}
+
+def chunk_seed(seed, chunk):
+    """Derives the seed of the RNG stream of a chunk of shoes from the
+    master seed, so that results don't depend on which worker plays it.
+    """
+    return random.Random(f'{seed}-{chunk}').getrandbits(64)
+
+def object_shoes(num_shoes, num_decks, seed=None, timer=None, tally=None):
+    """Plays shoes through the rules.iter_coups() stream. Reference engine.
+
+    Args:
+        num_shoes: int, number of shoes to be simulated.
+        num_decks: int, number of decks per shoe.
+        seed: int, seed of the shuffles. Optional.
+        timer: StageTimer, times the shoe creation and coup resolution
+            stages. Optional.
+        tally: SideTally, adds the side bets of every coup as it is resolved.
+            Optional.
+
+    Yields:
+        list, the Coup records of a shoe.
+    """
+    rng = make_rng(seed)
+    for i in range(num_shoes):
+        start = timer and timer.clock()
+        shoe = CompactShoe(num_decks, rng)
+        if timer:
+            start = timer.add('shoe creation', start)
+        coups = list(iter_coups(shoe))
+        if tally:
+            for coup in coups:
+                tally.add(coup)
+        if timer:
+            timer.add('coup resolution', start)
+        yield coups
+
+def table_shoes(num_shoes, num_decks, seed=None, timer=None, tally=None):
+    """Plays shoes of card codes resolving each coup with a single lookup on
+    the outcomes table of their values. Every shoe is shuffled and dealt like
+    a CompactShoe with the same RNG, so with the same seed it yields the same
+    coups as object_shoes().
+    """
+    import outcomes
+
+    rng = make_rng(seed)
+    outcome_table = outcomes.outcome_table()
+    outcome_index = outcomes.outcome_index
+    unpack_outcome = outcomes.unpack_outcome
+    deck_values = outcomes.DECK_VALUES
+    deck_codes = list(range(len(deck_values)))
+    for i in range(num_shoes):
+        start = timer and timer.clock()
+        coups = []
+        # CompactShoe draws from the end of its shuffled codes
+        codes = deck_codes * num_decks
+        rng.shuffle(codes)
+        codes.reverse()
+        shoe = [deck_values[code] for code in codes]
+        if timer:
+            start = timer.add('shoe creation', start)
+        position = 0
+        while len(shoe) - position >= 6:
+            cards = shoe[position:position + 6]
+            result, punto_value, banco_value, punto_third, banco_third, natural = \
+                unpack_outcome(outcome_table[outcome_index(cards)])
+            punto_cards, banco_cards = outcomes.hand_cards(cards, punto_third, banco_third)
+            coup = Coup(result, punto_value, banco_value, punto_cards, banco_cards, natural,
+                        codes[position] % 13 == codes[position + 1] % 13,
+                        codes[position + 2] % 13 == codes[position + 3] % 13)
+            if tally:
+                tally.add(coup)
+            coups.append(coup)
+            position += 4 + punto_third + banco_third
+        if timer:
+            timer.add('coup resolution', start)
+        yield coups
+
+def numpy_shoes(num_shoes, num_decks, seed=None, timer=None, tally=None):
+    """Plays shoes in batches of SHOE_BATCH with the vectorized engine. The
+    shuffles come from a NumPy generator, so its coups are equivalent to those
+    of object_shoes(), not the same coups for a seed. The coups stay numpy
+    arrays, and the side bets are added to the tally a whole batch at a time.
+
+    Yields:
+        dict, the numpy arrays of the coups of a batch of shoes with the fields
+            of results.record_dtype(), the shoe being its index on the batch,
+            and with a tally side_payouts, see engine.side_payouts().
+    """
+    import numpy as np
+    import engine
+    from results import record_dtype
+
+    fields = record_dtype().names
+    rng = np.random.default_rng(seed)
+    for first in range(0, num_shoes, SHOE_BATCH):
+        batch = min(SHOE_BATCH, num_shoes - first)
+        start = timer and timer.clock()
+        codes = engine.shuffle_codes(batch, num_decks, rng)
+        shoes = engine.DECK_VALUES[codes]
+        if timer:
+            start = timer.add('shoe creation', start)
+        coups = engine.play_shoes(shoes, codes % 13)
+        records = {field: coups[field] for field in fields}
+        if tally:
+            records['side_payouts'] = engine.side_payouts(coups)
+            tally.add_batch(records['side_payouts'])
+        if timer:
+            timer.add('coup resolution', start)
+        yield records
+
+def play_chunk(task):
+    """Plays a chunk of at most SHOE_BATCH shoes. Runs on the worker
+    processes.
+
+    Args:
+        task: tuple, with the engine name, the number of shoes, the number of
+            decks, the seed of the chunk, whether to time the stages, whether
+            to tally the side bets and whether to build the roads.
+
+    Returns:
+        tuple, with the shoes, the results, the side bets, the StageTimer of
+            the chunk or None, the SideTally of the chunk or None and the
+            RoadStats of the chunk or None. The shoes are a list with the
+            coups of each shoe, or the arrays yielded by numpy_shoes() with
+            the numpy engine. The results are bytes with the index in RESULTS
+            of the result of every coup. The side bets are, for every side bet
+            of sides.SIDE_BETS, bytes with the index of its winnings on every
+            coup in side_bet_payouts(), or None without side bets.
+    """
+    engine, num_shoes, num_decks, seed, profile, side_bets, roads = task
+    timer = StageTimer() if profile else None
+    tally = SideTally() if side_bets else None
+    sides = None
+    if engine == 'numpy':
+        import numpy as np
+
+        # A chunk is a single batch of the engine
+        shoes = next(numpy_shoes(num_shoes, num_decks, seed, timer, tally))
+        if side_bets:
+            payouts = shoes.pop('side_payouts')
+            sides = [np.searchsorted(bet_payouts, payouts[:, i]).astype(np.uint8).tobytes()
+                     for i, bet_payouts in enumerate(side_bet_payouts().values())]
+        results = shoes['result'].tobytes()
+        bounds = shoes['shoe'].searchsorted(range(num_shoes + 1)).tolist()
+    else:
+        if engine == 'table':
+            shoes = list(table_shoes(num_shoes, num_decks, seed, timer, tally))
+        else:
+            shoes = list(object_shoes(num_shoes, num_decks, seed, timer, tally))
+        if side_bets:
+            payouts = zip(*(coup_payouts(coup) for coups in shoes for coup in coups))
+            sides = [bytes(map({payout: i for i, payout in enumerate(bet_payouts)}.get, column))
+                     for bet_payouts, column in zip(side_bet_payouts().values(), payouts)]
+        results = bytes(CATEGORIES[coup.result] for coups in shoes for coup in coups)
+        bounds = [0, *itertools.accumulate(len(coups) for coups in shoes)]
+    road_stats = None
+    if roads:
+        road_stats = RoadStats()
+        for start, stop in zip(bounds, bounds[1:]):
+            road_stats.add_shoe([RESULTS[category] for category in results[start:stop]])
+    return shoes, results, sides, timer, tally, road_stats
+
+def imap_ahead(pool, tasks, ahead):
+    """Plays the chunks of tasks on a pool in order, like pool.imap(), with at
+    most ahead chunks in flight so that the workers don't play far past an
+    early stop.
+    """
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(play_chunk, (task,)))
+        if len(pending) >= ahead:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def play_chunks(chunks, timer=None, tally=None, road_stats=None):
+    """Yields the shoes, results and side bets of the chunks adding their
+    times to timer, their side bets to tally and their roads to road_stats.
+    """
+    for shoes, results, sides, chunk_timer, chunk_tally, chunk_road_stats in chunks:
+        if timer:
+            timer.merge(chunk_timer)
+        if tally:
+            tally.merge(chunk_tally)
+        if road_stats:
+            road_stats.merge(chunk_road_stats)
+        yield shoes, results, sides
+
+def write_chunk(sim_writer, shoe_count, shoes, timer=None):
+    """Writes the shoes of a chunk numbered after shoe_count. The coups of
+    the numpy engine are formatted at once from their arrays.
+
+    Args:
+        sim_writer: results.Writer, the writer of the file.
+        shoe_count: int, the number of shoes already written.
+        shoes: list or dict, the shoes of a chunk, see play_chunk().
+        timer: StageTimer, times the record formatting and file writes
+            stages. Optional.
+
+    Returns:
+        int, the number of shoes of the chunk.
+    """
+    start = timer and timer.clock()
+    if isinstance(shoes, dict):
+        num_shoes = int(shoes['shoe'][-1]) + 1
+        records = [sim_writer.format_records(dict(shoes, shoe=shoes['shoe'] + shoe_count + 1))]
+    else:
+        num_shoes = len(shoes)
+        records = [sim_writer.format_shoe(shoe_count + i, coups)
+                   for i, coups in enumerate(shoes, 1)]
+    if timer:
+        start = timer.add('record formatting', start)
+    for record in records:
+        sim_writer.write(record)
+    if timer:
+        timer.add('file writes', start)
+    return num_shoes
+
+def save_checkpoint(file_name, state):
+    """Writes a checkpoint atomically, replacing the previous one only once
+    the new one is complete.
+
+    Args:
+        file_name: str, the name of the checkpoint file.
+        state: dict, the JSON serializable state of the run.
+    """
+    with open(file_name + '.tmp', 'w') as checkpoint:
+        json.dump(state, checkpoint)
+    os.replace(file_name + '.tmp', file_name)
+
+def load_checkpoint(file_name):
+    """Reads a checkpoint written by save_checkpoint()."""
+    with open(file_name) as checkpoint:
+        return json.load(checkpoint)
+
+def print_side_bets(odds):
+    """Prints the probability and the expected value of every side bet."""
+    for bet, bet_odds in odds.items():
+        print(f'{bet.replace("_", " ").title()}:\t{round(bet_odds["probability"] * 100, 4)}%\t\
+EV: {round(bet_odds["expectation"] * 100, 4)}%')
+
+def print_statistics(statistics):
+    """Prints the mean, standard error and 95% confidence interval of every
+    streamed statistic.
+
+    Args:
+        statistics: dict, the BatchMeans of every stream.
+    """
+    for stream in statistics.values():
+        for metric, metric_stats in stream.report().items():
+            label = metric.replace('_', ' ')
+            line = f'{label[0].upper() + label[1:]}:\t{round(metric_stats["mean"] * 100, 4)}%'
+            if metric_stats['standard_error'] is not None:
+                low, high = metric_stats['interval']
+                line += f'\tSE: {round(metric_stats["standard_error"] * 100, 4)}%\t\
+95% CI: {round(low * 100, 4)}% - {round(high * 100, 4)}%'
+            print(line)
+
+def precise(statistics, target):
+    """Checks if the standard error of every metric of every stream is at
+    most target, see BatchMeans.precise().
+    """
+    return all(stream.precise(target) for stream in statistics.values())
+
+def print_roads(road_stats):
+    """Prints the number and lengths of the columns of every road."""
+    print(f'Roads of {road_stats.shoes} shoes:')
+    for road, marks in road_stats.report().items():
+        for name, columns in marks.items():
+            print(f'{road.replace("_", " ").capitalize()} {name}:\t{columns["columns"]} columns\t\
+mean length: {round(columns["mean_length"], 4)}\tlongest: {columns["longest"]}')
 
 def main():
 
@@ -20,66 +318,185 @@ def main():
     total_wins = {'banco': 0, 'punto': 0, 'tie': 0}
 
     # Argument parser
-    parser = argparse.ArgumentParser(description='Simulates baccarat games to a text file.')
+    parser = argparse.ArgumentParser(description='Simulates baccarat games to a file.')
     parser.add_argument('-s', action='store', dest='shoes', default=10000,
                         type=int, help='number of shoes to be simulated, default 10000')
     parser.add_argument('-d', action='store', dest='decks', default=8,
                         type=int, help='number of decks per shoe, default 8')
+    parser.add_argument('-e', '--engine', action='store', dest='engine', default='object',
+                        choices=ENGINES, help='simulation engine, default object')
+    parser.add_argument('-j', '--workers', action='store', dest='workers', default=1,
+                        type=int, help='number of worker processes, default 1')
+    parser.add_argument('--seed', action='store', dest='seed', default=None,
+                        type=int, help='master seed of the shuffles, random by default')
+    parser.add_argument('-f', '--format', action='store', dest='format', default='text',
+                        choices=FORMATS, help='output file format, default text')
+    parser.add_argument('--profile', action='store_true', dest='profile',
+                        help='print the time spent on each stage of the simulation')
+    parser.add_argument('--profile-out', action='store', dest='profile_out', default=None,
+                        help='dump cProfile stats of the main process to a file')
+    parser.add_argument('--exact', action='store_true', dest='exact',
+                        help='print the exact probabilities of a full shoe instead of simulating')
+    parser.add_argument('--side-bets', action='store_true', dest='side_bets',
+                        help='print the hit rate and expected value of the side bets')
+    parser.add_argument('--resume', action='store', dest='resume', default=None,
+                        help='continue an interrupted run from its checkpoint file')
+    parser.add_argument('--target-se', action='store', dest='target_se', default=None,
+                        type=float, help='stop once the standard error of every rate and EV '
+                                         'is at most this, with -s as the maximum of shoes')
+    parser.add_argument('--batch-size', action='store', dest='batch_size', default=1000,
+                        type=int, help='coups per batch of the standard errors, default 1000')
+    parser.add_argument('--roads', action='store_true', dest='roads',
+                        help='print the column statistics of the scoreboard roads')
+    parser.add_argument('--roads-out', action='store', dest='roads_out', default=None,
+                        help='write the column length histograms of the roads to a JSON file')
     args = parser.parse_args()
 
-    # Create game object
-    sim = Game()
-    sim.create_shoe(args.decks)
+    # Exact probabilities and expected values
+    if args.exact:
+        import odds
+
+        probabilities = odds.outcome_probabilities(odds.shoe_counts(args.decks))
+        expectations = odds.bet_expectations(probabilities)
+        for result in total_wins:
+            print(f'{result.title()}:\t{round(probabilities[result] * 100, 4)}%\t\
+EV: {round(expectations[result] * 100, 4)}%')
+        if args.side_bets:
+            print_side_bets(odds.side_bet_odds(odds.shoe_rank_counts(args.decks)))
+        return
+
+    # Resume the settings, counters and output file of an interrupted run
+    checkpoint = None
+    offset = None
+    if args.resume:
+        checkpoint = load_checkpoint(args.resume)
+        for option in ['shoes', 'decks', 'engine', 'seed', 'format', 'side_bets',
+                       'target_se', 'batch_size', 'roads', 'roads_out']:
+            setattr(args, option, checkpoint[option])
+        shoe_count = checkpoint['shoe_count']
+        game_count = checkpoint['game_count']
+        total_wins = checkpoint['total_wins']
+        offset = checkpoint['offset']
+    resumed_games = game_count
+
+    args.roads = args.roads or args.roads_out is not None
+
+    # Split the shoes in chunks, each one with its own RNG stream. The state of
+    # the shuffles is the master seed and the next chunk to be played.
+    seed = args.seed if args.seed is not None else random.getrandbits(64)
+    tasks = []
+    for chunk, first in enumerate(range(0, args.shoes, SHOE_BATCH)):
+        tasks.append((args.engine, min(SHOE_BATCH, args.shoes - first), args.decks,
+                      chunk_seed(seed, chunk), args.profile, args.side_bets, args.roads))
+    tasks = tasks[shoe_count // SHOE_BATCH:]
+
+    # Profiling
+    timer = StageTimer() if args.profile else None
+    tally = SideTally() if args.side_bets else None
+    if checkpoint and tally:
+        tally.coups, tally.hits, tally.net = (checkpoint['side_tally'][key]
+                                              for key in ['coups', 'hits', 'net'])
+
+    road_stats = RoadStats() if args.roads else None
+    if checkpoint and road_stats:
+        road_stats.restore(checkpoint['road_stats'])
+
+    # Streaming statistics, the EV of each side bet streamed over the payouts
+    # it can have
+    statistics = {'bets': BatchMeans(METRICS, args.batch_size)}
+    if args.side_bets:
+        for bet, payouts in side_bet_payouts().items():
+            statistics[bet] = BatchMeans({f'{bet} EV': payouts}, args.batch_size)
+    if checkpoint:
+        for name, state in checkpoint['statistics'].items():
+            statistics[name].restore(state)
+    start_time = StageTimer.clock()
+    profiler = None
+    if args.profile_out:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # Chunks are played by the workers and merged back in shoe order
+    pool = None
+    if args.workers > 1:
+        pool = multiprocessing.Pool(args.workers)
+        chunks = imap_ahead(pool, tasks, 2 * args.workers)
+    else:
+        chunks = map(play_chunk, tasks)
 
     # Set file name
-    now = datetime.datetime.now()
-    file_name = f'{args.decks}_{args.shoes}_{now.strftime("%d%m%y%H%M%S")}.txt'
+    if checkpoint:
+        file_name = os.path.join(os.path.dirname(args.resume), checkpoint['file_name'])
+    else:
+        now = datetime.datetime.now()
+        file_name = f'{args.decks}_{args.shoes}_{now.strftime("%d%m%y%H%M%S")}.{EXTENSIONS[args.format]}'
+    checkpoint_name = file_name + '.checkpoint'
 
     # Open file
-    with open(file_name, 'w') as sim_file:
+    with WRITERS[args.format](file_name, offset) as sim_writer:
 
         # Run through num_shoes
-        for i in range(args.shoes):
-            shoe_wins = {'banco': 0, 'punto': 0, 'tie': 0}
-            shoe_count += 1
-            sim_file.write(f'\nShoe number {i + 1}\n\n')
-
-            # While the shoe has more than 5 cards
-            while sim.num_cards >= 6:
-                result = []
-                game_count += 1
-
-                # Baccarat game
-                sim.deal_hands()
-                if not sim.is_natural():
-                    sim.draw_thirds()
-                game_result = sim.game_result()
-                shoe_wins[game_result] += 1
-                total_wins[game_result] += 1
-
-                # Append to results list
-                result.append(game_result.title()[0])
-                result.append(str(sim.banco_value))
-                result.append(str(sim.punto_value))
-                result.extend(hand_values(sim.banco_values))
-                result.extend(hand_values(sim.punto_values))
-                sim_file.write(','.join(result) + '\n')
-
-                # Progress
-                progress = round((shoe_count / args.shoes) * 100, 1)
-                print(f'Progress: {progress}%', end='\r')
-
-            # Shoe results
-            sim_file.write('\nShoe results:\n')
-            for win in shoe_wins:
-                sim_file.write(f'{win.title()}:\t{shoe_wins[win]}\n')
-            sim.create_shoe(args.decks)
+        for shoes, results, sides in play_chunks(chunks, timer, tally, road_stats):
+            shoe_count += write_chunk(sim_writer, shoe_count, shoes, timer)
+            game_count += len(results)
+            for category, result in enumerate(RESULTS):
+                total_wins[result] += results.count(category)
+            statistics['bets'].add_categories(results)
+            if sides:
+                for bet, categories in zip(SIDE_BETS, sides):
+                    statistics[bet].add_categories(categories)
+
+            # Progress
+            progress = round((shoe_count / args.shoes) * 100, 1)
+            print(f'Progress: {progress}%', end='\r')
+
+            # Checkpoint after every chunk, with the file flushed up to it
+            save_checkpoint(checkpoint_name, {
+                'shoes': args.shoes, 'decks': args.decks, 'engine': args.engine,
+                'seed': seed, 'format': args.format, 'side_bets': args.side_bets,
+                'file_name': os.path.basename(file_name), 'offset': sim_writer.tell(),
+                'shoe_count': shoe_count, 'game_count': game_count,
+                'total_wins': total_wins, 'target_se': args.target_se,
+                'batch_size': args.batch_size,
+                'statistics': {name: stream.state() for name, stream in statistics.items()},
+                'side_tally': tally and {'coups': tally.coups, 'hits': tally.hits,
+                                         'net': tally.net},
+                'roads': args.roads, 'roads_out': args.roads_out,
+                'road_stats': road_stats and road_stats.state()})
+
+            # Stop on the first chunk that reaches the precision
+            if args.target_se and precise(statistics, args.target_se):
+                break
 
         # Total results
-        sim_file.write('\nTotal results:\n')
-        for win in total_wins:
-            sim_file.write(f'{win.title()}:\t{total_wins[win]}\t\
-({round((total_wins[win]/game_count) * 100, 4)}%)\n')
+        sim_writer.write_totals(total_wins, game_count)
+    if os.path.exists(checkpoint_name):
+        os.remove(checkpoint_name)
+
+    if pool:
+        pool.terminate()
+        pool.join()
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile_out)
+    print()
+    if args.target_se:
+        reached = 'reached' if precise(statistics, args.target_se) else 'not reached'
+        print(f'Target SE {reached} after {shoe_count} shoes and {game_count} coups.')
+    print_statistics(statistics)
+    if tally:
+        print()
+        print_side_bets(tally.report())
+    if road_stats:
+        print()
+        print_roads(road_stats)
+        if args.roads_out:
+            with open(args.roads_out, 'w') as roads_file:
+                json.dump(road_stats.state(), roads_file)
+    if timer:
+        print()
+        print(timer.report(StageTimer.clock() - start_time, game_count - resumed_games))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,230 @@
+from players import Player
+
+class Strategy:
+    """Base class of the betting strategies. A new instance is created for
+    every account, so strategies can keep their progression as attributes.
+
+    Args:
+        unit: int, the base amount of a bet.
+        hand: str, the hand to bet on. Optional, default value banco.
+
+    Raises:
+        TypeError: If the unit is not an integer.
+        ValueError: If the unit is not positive.
+    """
+    name = 'strategy'
+
+    def __init__(self, unit, hand='banco'):
+        if not isinstance(unit, int):
+            raise TypeError('Unit must be an integer.')
+        elif unit < 1:
+            raise ValueError('Unit must be positive.')
+        self.unit = unit
+        self.hand = hand
+
+    def new_shoe(self):
+        """Called before the first coup of every shoe."""
+        pass
+
+    def next_bet(self):
+        """Returns the next bet.
+
+        Returns:
+            tuple, with the hand and the amount to bet, or None to skip the coup.
+        """
+        return self.hand, self.unit
+
+    def result(self, coup, won):
+        """Called after every coup.
+
+        Args:
+            coup: rules.Coup, the result record of the coup.
+            won: bool or None, if the bet won, None if there was no bet.
+        """
+        pass
+
+class Flat(Strategy):
+    """Always bets one unit on the same hand."""
+    name = 'flat'
+
+class Martingale(Strategy):
+    """Doubles the bet after each loss and goes back to one unit after a win."""
+    name = 'martingale'
+
+    def __init__(self, unit, hand='banco'):
+        Strategy.__init__(self, unit, hand)
+        self.amount = unit
+
+    def next_bet(self):
+        return self.hand, self.amount
+
+    def result(self, coup, won):
+        if won is not None:
+            self.amount = self.unit if won else self.amount * 2
+
+class Paroli(Strategy):
+    """Doubles the bet after each win, up to streak wins in a row, and goes back
+    to one unit after a loss or a completed streak.
+    """
+    name = 'paroli'
+
+    def __init__(self, unit, hand='banco', streak=3):
+        Strategy.__init__(self, unit, hand)
+        self.streak = streak
+        self.wins = 0
+
+    def next_bet(self):
+        return self.hand, self.unit * 2 ** self.wins
+
+    def result(self, coup, won):
+        if won is not None:
+            self.wins = self.wins + 1 if won and self.wins + 1 < self.streak else 0
+
+class FollowTheShoe(Strategy):
+    """Bets one unit on the last hand that won on the current shoe, ignoring
+    ties. Skips the coups until the shoe has a winner.
+    """
+    name = 'follow'
+
+    def new_shoe(self):
+        self.hand = None
+
+    def next_bet(self):
+        if self.hand is None:
+            return None
+        return self.hand, self.unit
+
+    def result(self, coup, won):
+        if coup.result != 'tie':
+            self.hand = coup.result
+
+STRATEGIES = {strategy.name: strategy for strategy in [Flat, Martingale, Paroli, FollowTheShoe]}
+
+class Account:
+    """A bankroll played with a strategy through the rules of players.Player.
+    Bets larger than the balance are reduced to the balance.
+
+    Args:
+        strategy: Strategy, the strategy instance of the account.
+        bankroll: int, the initial balance.
+
+    Attributes:
+        player: Player, the player holding the balance and the bets.
+        ruined: bool, True once the balance reached 0.
+        max_drawdown: int, the largest fall of the balance from a previous peak.
+    """
+    def __init__(self, strategy, bankroll):
+        self.strategy = strategy
+        self.bankroll = bankroll
+        self.player = Player(bankroll)
+        self.peak = bankroll
+        self.max_drawdown = 0
+        self.ruined = False
+
+    def play(self, coup):
+        """Places the bet of the strategy and settles it with the coup."""
+        won = None
+        if not self.ruined:
+            bet = self.strategy.next_bet()
+            if bet:
+                hand, amount = bet
+                self.player.hand_bet = hand
+                self.player.amount_bet = min(amount, self.player.balance)
+                won = self.player.hand_bet == coup.result
+                if won:
+                    self.player.win()
+                else:
+                    self.player.lose()
+                balance = self.player.balance
+                if balance > self.peak:
+                    self.peak = balance
+                elif self.peak - balance > self.max_drawdown:
+                    self.max_drawdown = self.peak - balance
+                self.ruined = balance <= 0
+        self.strategy.result(coup, won)
+
+def percentiles(values, points=(5, 25, 50, 75, 95)):
+    """Returns a dict with the nearest rank percentiles of a list of values."""
+    ordered = sorted(values)
+    return {point: ordered[min(len(ordered) - 1, len(ordered) * point // 100)]
+            for point in points}
+
+class Backtest:
+    """Runs many strategies with many bankrolls against the same coup stream
+    in a single pass. The stream is split in sessions of session_shoes shoes,
+    every account starting again with its bankroll on each session.
+
+    Args:
+        strategies: dict, the strategy factories by name, called with no
+            arguments for every account.
+        bankrolls: list, the initial balances.
+        session_shoes: int, the number of shoes of a session. Optional,
+            default value 1.
+
+    Raises:
+        TypeError: If the number of shoes of a session is not an integer.
+        ValueError: If the number of shoes of a session is not positive.
+    """
+    def __init__(self, strategies, bankrolls, session_shoes=1):
+        if not isinstance(session_shoes, int):
+            raise TypeError('Session shoes must be an integer.')
+        elif session_shoes < 1:
+            raise ValueError('Session shoes must be positive.')
+        self._strategies = strategies
+        self._bankrolls = bankrolls
+        self._session_shoes = session_shoes
+        self._sessions = {(name, bankroll): [] for name in strategies for bankroll in bankrolls}
+        self._accounts = None
+
+    def _close_session(self):
+        """Records the results of the accounts of the current session."""
+        if self._accounts:
+            for key, account in self._accounts.items():
+                self._sessions[key].append((account.player.balance, account.max_drawdown,
+                                            account.ruined))
+        self._accounts = None
+
+    def run(self, stream):
+        """Plays a stream of (shoe number, coup) pairs, such as the one of
+        rules.iter_shoes().
+        """
+        shoes = 0
+        current = None
+        for shoe_number, coup in stream:
+            if shoe_number != current:
+                if shoes % self._session_shoes == 0:
+                    self._close_session()
+                    self._accounts = {(name, bankroll): Account(factory(), bankroll)
+                                      for name, factory in self._strategies.items()
+                                      for bankroll in self._bankrolls}
+                for account in self._accounts.values():
+                    account.strategy.new_shoe()
+                current = shoe_number
+                shoes += 1
+            for account in self._accounts.values():
+                account.play(coup)
+        self._close_session()
+
+    def report(self):
+        """Returns the results of every strategy and bankroll.
+
+        Returns:
+            dict, by strategy name and bankroll, with the number of sessions, the
+                mean and percentiles of the final balances, the probability of
+                ruin and the mean and largest drawdowns.
+        """
+        report = {}
+        for (name, bankroll), sessions in self._sessions.items():
+            if not sessions:
+                continue
+            balances = [balance for balance, _, _ in sessions]
+            drawdowns = [drawdown for _, drawdown, _ in sessions]
+            report.setdefault(name, {})[bankroll] = {
+                'sessions': len(sessions),
+                'mean_balance': sum(balances) / len(sessions),
+                'percentiles': percentiles(balances),
+                'ruin_probability': sum(ruined for _, _, ruined in sessions) / len(sessions),
+                'mean_drawdown': sum(drawdowns) / len(sessions),
+                'max_drawdown': max(drawdowns),
+                }
+        return report
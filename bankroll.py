@@ -0,0 +1,129 @@
+import numpy as np
+from players import PAYOUTS
+
+# Maximum number of coup draws held in memory at a time.
+BLOCK_ELEMENTS = 1 << 22
+
+def _percentiles(counts, values, total, points):
+    """Returns the nearest rank percentiles of a histogram.
+
+    Args:
+        counts: numpy array, the number of trajectories of each value.
+        values: numpy array, the values in increasing order.
+        total: int, the number of trajectories.
+        points: list, the percentiles to be computed.
+    """
+    cumulative = np.cumsum(counts)
+    ranks = [min(total - 1, total * point // 100) for point in points]
+    return values[np.searchsorted(cumulative, ranks, side='right')].tolist()
+
+def risk_of_ruin(probabilities, hand, bet, bankroll, num_coups, num_trajectories,
+                 chunk_size=100000, num_points=20, points=(5, 25, 50, 75, 95), rng=None):
+    """Simulates flat betting bankroll trajectories in batches. A trajectory is
+    ruined when its balance can no longer cover the bet. As with Table, a bet
+    loses whenever its hand does not win, and wins are paid like Player.win.
+
+    Only the number of wins of each trajectory is kept, the balance of a
+    trajectory still in play being determined by it, so the percentiles are
+    exact and memory only depends on chunk_size and BLOCK_ELEMENTS.
+
+    Args:
+        probabilities: dict, the probability or the count of each result, such
+            as odds.outcome_probabilities() or the total wins of a simulation.
+        hand: str, the hand bet on every coup.
+        bet: int, the amount of every bet.
+        bankroll: int, the initial balance.
+        num_coups: int, the number of coups of a trajectory.
+        num_trajectories: int, the number of trajectories.
+        chunk_size: int, the number of trajectories simulated at a time.
+        num_points: int, the number of points of the balance curves.
+        points: list, the percentiles of the balance curves.
+        rng: numpy Generator or seed. Optional.
+
+    Returns:
+        dict, with:
+            ruin_probability: float, the fraction of ruined trajectories.
+            time_to_ruin: dict, with the mean and the percentiles of the coup
+                on which the ruined trajectories were ruined.
+            mean_balance: float, the mean final balance.
+            coups: list, the coups of the points of the curves.
+            curves: dict, by percentile, the list of balances at each point.
+
+    Raises:
+        ValueError: If the bankroll does not cover the bet.
+    """
+    if bet < 1 or bankroll < bet:
+        raise ValueError('Bankroll must cover a positive bet.')
+    rng = np.random.default_rng(rng)
+    total = sum(probabilities.values())
+    win_probability = probabilities[hand] / total
+    win = int(bet * PAYOUTS[hand])
+    coups = np.unique(np.linspace(0, num_coups, num_points + 1).astype(np.int64))[1:]
+    block = max(1, BLOCK_ELEMENTS // chunk_size)
+
+    # Histograms of the number of wins of the trajectories in play at each
+    # point, of the balances of the ruined ones and of the time of ruin
+    wins_counts = [np.zeros(coup + 1, dtype=np.int64) for coup in coups]
+    ruined_counts = [np.zeros(bet, dtype=np.int64) for coup in coups]
+    ruin_times = np.zeros(num_coups + 1, dtype=np.int64)
+    balance_sum = 0
+
+    for first in range(0, num_trajectories, chunk_size):
+        size = min(chunk_size, num_trajectories - first)
+        wins = np.zeros(size, dtype=np.int64)
+        playing = np.ones(size, dtype=bool)
+        ruined_at = np.full(size, num_coups + 1, dtype=np.int64)
+        final = np.zeros(size, dtype=np.int64)
+        for start in range(0, num_coups, block):
+            steps = min(block, num_coups - start)
+            rows = np.flatnonzero(playing)
+            path = wins[rows, None] + np.cumsum(
+                rng.random((rows.size, steps)) < win_probability, axis=1)
+            played = start + np.arange(1, steps + 1)
+            balances = bankroll + path * win - (played - path) * bet
+            below = balances < bet
+            hit = below.any(axis=1)
+            step = below.argmax(axis=1) if rows.size else np.zeros(0, dtype=np.int64)
+            ruined_rows = rows[hit]
+            ruined_at[ruined_rows] = start + step[hit] + 1
+            final[ruined_rows] = balances[hit, step[hit]]
+            playing[ruined_rows] = False
+            if rows.size:
+                wins[rows] = path[:, -1]
+
+            # Points of the curves inside this block
+            for point, coup in enumerate(coups):
+                if start < coup <= start + steps:
+                    in_play = ruined_at[rows] > coup
+                    wins_counts[point] += np.bincount(path[in_play, coup - start - 1],
+                                                      minlength=coup + 1)
+                    gone = np.flatnonzero(ruined_at <= coup)
+                    ruined_counts[point] += np.bincount(final[gone], minlength=bet)
+
+        final[playing] = bankroll + wins[playing] * win - (num_coups - wins[playing]) * bet
+        balance_sum += int(final.sum())
+        ruin_times += np.bincount(np.minimum(ruined_at, num_coups + 1),
+                                  minlength=num_coups + 2)[:num_coups + 1]
+
+    curves = {point: [] for point in points}
+    for point, coup in enumerate(coups):
+        wins_values = np.arange(coup + 1)
+        counts = np.concatenate((ruined_counts[point], wins_counts[point]))
+        values = np.concatenate((np.arange(bet),
+                                 bankroll + wins_values * win - (coup - wins_values) * bet))
+        for percentile, balance in zip(points, _percentiles(counts, values,
+                                                            num_trajectories, points)):
+            curves[percentile].append(balance)
+
+    ruined = int(ruin_times.sum())
+    time_to_ruin = {'mean': None, 'percentiles': {}}
+    if ruined:
+        times = np.arange(num_coups + 1)
+        time_to_ruin['mean'] = float((ruin_times * times).sum() / ruined)
+        time_to_ruin['percentiles'] = dict(zip(points, _percentiles(ruin_times, times,
+                                                                    ruined, points)))
+    return {'ruin_probability': ruined / num_trajectories,
+            'time_to_ruin': time_to_ruin,
+            'mean_balance': balance_sum / num_trajectories,
+            'coups': coups.tolist(),
+            'curves': curves}
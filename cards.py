@@ -5,7 +5,8 @@ RANKS = ['ace', 2, 3, 4, 5, 6, 7, 8, 9, 10, 'jack', 'queen', 'king']
 
 class Card:
     """Playing card to be used to fill a baccarat shoe and
-    to be drawn to a playing hand.
+    to be drawn to a playing hand. Cards are immutable flyweights, only one
+    instance of each rank and suit is ever created and then reused.
 
     Args:
         rank: int or string, the rank of the card.
@@ -19,16 +20,26 @@ class Card:
     Raises:
         ValueError: On invalid card rank or suit.
     """
-    def __init__(self, rank, suit):
+    __slots__ = ('_rank', '_suit', '_value')
+    _cards = {}
+
+    def __new__(cls, rank, suit):
+        try:
+            return cls._cards[rank, suit]
+        except (KeyError, TypeError):
+            pass
         if rank not in RANKS:
             raise ValueError('Invalid card rank.')
         if suit not in SUITS:
             raise ValueError('Invalid card suit.')
-        self._rank = rank
-        self._suit = suit
-        self._value = self._rank if self._rank in range(2, 10) \
-                    else 1 if self._rank == 'ace' \
-                    else 0
+        card = object.__new__(cls)
+        object.__setattr__(card, '_rank', rank)
+        object.__setattr__(card, '_suit', suit)
+        object.__setattr__(card, '_value', rank if rank in range(2, 10)
+                                           else 1 if rank == 'ace'
+                                           else 0)
+        cls._cards[rank, suit] = card
+        return card
 
     @property
     def value(self):
@@ -50,6 +61,18 @@ class Card:
 
     __radd__ = __add__
 
+    def __setattr__(self, name, value):
+        raise AttributeError('Card objects are immutable.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Card objects are immutable.')
+
+    def __reduce__(self):
+        """Pickles the card by rank and suit, so that it is interned again
+        when unpickled.
+        """
+        return (Card, (self._rank, self._suit))
+
     def __repr__(self):
         """Return the representation string as if the object was
         called when creating a new instance.
@@ -64,29 +87,56 @@ class Card:
         """Return a string with the rank and suit of the card."""
         return f'{self._rank} of {self._suit}'
 
+# The 52 cards of a deck ordered by suit and rank, the index being the card code.
+DECK = tuple(Card(rank, suit) for suit in SUITS for rank in RANKS)
+
+def make_rng(rng=None):
+    """Returns the random number generator used to shuffle the shoes.
+
+    Args:
+        rng: None to use the global random module, an int seed to create a
+            random.Random, or any object with a shuffle method such as
+            random.Random or numpy.random.Generator.
+
+    Raises:
+        TypeError: If rng has no shuffle method.
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    if not hasattr(rng, 'shuffle'):
+        raise TypeError('Random number generator must have a shuffle method.')
+    return rng
+
 class Shoe:
     """Shoe with num_decks shuffled decks. All cards used in the game
     will be drawn from this set.
 
     Args:
         num_decks: int, number of decks on the shoe.
+        rng: random number generator or seed used to shuffle the shoe, see
+            make_rng(). Optional, the global random module by default.
 
     Attributes:
         num_decks: int, number of decks on the shoe.
         cards: list, all the instances of the object PlayinCard
             on the Shoe object.
+        counts: list, the number of cards left of each value, from 0 to 9.
 
     Raises:
         TypeError: If the num_decks is not an integer.
         ValueError: If the num_decks is not positive.
     """
-    def __init__(self, num_decks):
+    def __init__(self, num_decks, rng=None):
         if not isinstance(num_decks, int):
             raise TypeError('Number of decks must be an integer.')
         elif num_decks < 1:
             raise ValueError('Number of decks must be positive.')
         self._num_decks = num_decks
+        self._rng = make_rng(rng)
         self._cards = []
+        self._counts = [0] * 10
         self.add_decks()
 
     @property
@@ -104,16 +154,25 @@ class Shoe:
         """Returns current list of cards in shoe."""
         return self._cards
 
+    @property
+    def counts(self):
+        """Returns the number of cards left of each value."""
+        return list(self._counts)
+
+    def clear(self):
+        """Removes every card left in the shoe."""
+        self._cards.clear()
+        self._counts = [0] * 10
+
     def add_decks(self, num_decks=None):
         """Refils the shoe with decks. Uses self.num_decks value if empty."""
         if not num_decks:
             num_decks = self._num_decks
 
-        for i in range(num_decks):
-            for suit in SUITS:
-                for rank in RANKS:
-                   self._cards.append(Card(rank, suit)) 
-        random.shuffle(self._cards)
+        self._cards.extend(DECK * num_decks)
+        for card in DECK:
+            self._counts[card.value] += num_decks
+        self._rng.shuffle(self._cards)
 
     def draw_cards(self, num_cards):
         """Draws cards from shoe. Refills the shoe when
@@ -129,7 +188,9 @@ class Shoe:
         for i in range(num_cards):
             if len(self._cards) == 0:
                 self.add_decks()
-            cards_drawn.append(self._cards.pop())
+            card = self._cards.pop()
+            self._counts[card.value] -= 1
+            cards_drawn.append(card)
         return cards_drawn
 
     def __repr__(self):
@@ -143,3 +204,86 @@ class Shoe:
         number of cards left.
         """
         return f'{self._num_decks} decks shoe. {len(self._cards)} cards left.'
+
+class CompactShoe(Shoe):
+    """Shoe backed by a bytearray of card codes and a cursor with the number of
+    cards left. A card code is the index of the card on a deck ordered by suit
+    and rank. Card objects are only looked up when drawn or when the cards
+    attribute is read. Subclass of Shoe.
+
+    Args:
+        num_decks: int, number of decks on the shoe.
+        rng: random number generator or seed used to shuffle the shoe.
+
+    Attributes:
+        codes: bytearray, the codes of the cards left in the shoe. The last one
+            is the next card to be drawn.
+    """
+    def __init__(self, num_decks, rng=None):
+        self._codes = bytearray()
+        self._cursor = 0
+        Shoe.__init__(self, num_decks, rng)
+
+    @property
+    def num_cards(self):
+        """Returns current number of cards in shoe."""
+        return self._cursor
+
+    @property
+    def cards(self):
+        """Returns a new list with the cards left in shoe."""
+        return [DECK[code] for code in self._codes[:self._cursor]]
+
+    @property
+    def codes(self):
+        """Returns the codes of the cards left in shoe."""
+        return self._codes[:self._cursor]
+
+    def clear(self):
+        """Removes every card left in the shoe."""
+        self._codes = bytearray()
+        self._cursor = 0
+        self._counts = [0] * 10
+
+    def add_decks(self, num_decks=None):
+        """Refils the shoe with decks. Uses self.num_decks value if empty."""
+        if not num_decks:
+            num_decks = self._num_decks
+
+        self._codes = self._codes[:self._cursor] + bytearray(range(52)) * num_decks
+        for card in DECK:
+            self._counts[card.value] += num_decks
+        self._rng.shuffle(self._codes)
+        self._cursor = len(self._codes)
+
+    def draw_cards(self, num_cards):
+        """Draws cards from shoe moving the cursor. Refills the shoe when
+        it is empty.
+
+        Args:
+            num_cards: int, number of cards to be drawn.
+
+        Returns:
+            cards_drawn: list, cards drawn from shoe.
+        """
+        cards_drawn = []
+        for i in range(num_cards):
+            if self._cursor == 0:
+                self.add_decks()
+            self._cursor -= 1
+            card = DECK[self._codes[self._cursor]]
+            self._counts[card.value] -= 1
+            cards_drawn.append(card)
+        return cards_drawn
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'CompactShoe({self._num_decks})'
+
+    def __str__(self):
+        """Returns a string with the number of decks and the
+        number of cards left.
+        """
+        return f'{self._num_decks} decks shoe. {self._cursor} cards left.'
@@ -0,0 +1,167 @@
+import numpy as np
+from hands import BANCO_DRAWS as _BANCO_DRAWS
+from outcomes import OUTCOME_LIMIT
+from sides import PAIR_PAYOUT, LOSS, value_payout_table
+
+RESULTS = ('banco', 'punto', 'tie')
+NO_CARD = -1
+
+# Baccarat values of the 13 ranks of a suit: ace, 2 to 9, 10 and the faces.
+DECK_VALUES = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 0, 0, 0] * 4, dtype=np.int8)
+
+# Banco third card tableau of hands.BANCO_DRAWS as an array.
+BANCO_DRAWS = np.array(_BANCO_DRAWS, dtype=bool)
+
+_value_payouts = None
+
+def value_payout_lookup():
+    """Returns the payouts of the value side bets of sides.value_payout_table()
+    as a numpy array indexed by the packed outcome. Built on the first call.
+    """
+    global _value_payouts
+    if _value_payouts is None:
+        payouts = value_payout_table()
+        _value_payouts = np.full((OUTCOME_LIMIT, 4), LOSS, dtype=np.int8)
+        _value_payouts[list(payouts)] = list(payouts.values())
+    return _value_payouts
+
+def shuffle_codes(num_shoes, num_decks, rng=None):
+    """Shuffles num_shoes shoes at once with a single permutation call.
+
+    Args:
+        num_shoes: int, number of shoes to be created.
+        num_decks: int, number of decks on each shoe.
+        rng: numpy Generator or seed, used to shuffle the shoes. Optional, a new
+            unseeded generator is used by default.
+
+    Returns:
+        numpy array of shape (num_shoes, 52 * num_decks), the card codes of each
+            shoe in drawing order, as used by cards.CompactShoe.
+    """
+    rng = np.random.default_rng(rng)
+    shoes = np.tile(np.arange(52, dtype=np.uint8), (num_shoes, num_decks))
+    return rng.permuted(shoes, axis=1)
+
+def build_shoes(num_shoes, num_decks, rng=None):
+    """Creates num_shoes shuffled shoes encoded as card values.
+
+    Args:
+        num_shoes: int, number of shoes to be created.
+        num_decks: int, number of decks on each shoe.
+        rng: numpy Generator or seed, used to shuffle the shoes. Optional.
+
+    Returns:
+        numpy array of shape (num_shoes, 52 * num_decks), the card values of
+            each shoe in drawing order.
+    """
+    return DECK_VALUES[shuffle_codes(num_shoes, num_decks, rng)]
+
+def resolve_coups(cards):
+    """Applies the rules of baccarat to a batch of coups.
+
+    Args:
+        cards: numpy array of shape (n, 6), the next six cards of each coup in
+            drawing order. Punto receives the first and second cards, banco the
+            third and fourth, the remaining ones are the possible third cards.
+
+    Returns:
+        dict of numpy arrays of length n with the keys:
+            result: index of the result in RESULTS.
+            punto_value, banco_value: final value of each hand.
+            punto_third, banco_third: True if the hand drew a third card.
+            natural: True if there was a natural.
+            punto_cards, banco_cards: shape (n, 3), the card values of each
+                hand padded with NO_CARD.
+    """
+    cards = cards.astype(np.int8)
+    punto_two = (cards[:, 0] + cards[:, 1]) % 10
+    banco_two = (cards[:, 2] + cards[:, 3]) % 10
+    natural = (punto_two >= 8) | (banco_two >= 8)
+
+    punto_third = ~natural & (punto_two <= 5)
+    punto_card = np.where(punto_third, cards[:, 4], 10)
+    banco_third = ~natural & BANCO_DRAWS[banco_two, punto_card]
+    banco_card = np.where(punto_third, cards[:, 5], cards[:, 4])
+
+    punto_value = (punto_two + np.where(punto_third, punto_card, 0)) % 10
+    banco_value = (banco_two + np.where(banco_third, banco_card, 0)) % 10
+    result = np.full(len(cards), 2, dtype=np.int8)
+    result[banco_value > punto_value] = 0
+    result[punto_value > banco_value] = 1
+
+    punto_cards = np.column_stack(
+        (cards[:, 0], cards[:, 1], np.where(punto_third, punto_card, NO_CARD)))
+    banco_cards = np.column_stack(
+        (cards[:, 2], cards[:, 3], np.where(banco_third, banco_card, NO_CARD)))
+    return {'result': result,
+            'punto_value': punto_value.astype(np.int8),
+            'banco_value': banco_value.astype(np.int8),
+            'punto_third': punto_third,
+            'banco_third': banco_third,
+            'natural': natural,
+            'punto_cards': punto_cards.astype(np.int8),
+            'banco_cards': banco_cards.astype(np.int8)}
+
+def play_shoes(shoes, ranks=None):
+    """Plays every shoe until it has less than six cards, one coup of all the
+    shoes at a time.
+
+    Args:
+        shoes: numpy array of shape (num_shoes, num_cards), card values of each
+            shoe in drawing order, as returned by build_shoes().
+        ranks: numpy array with the same shape as shoes, the card ranks, such
+            as the codes of shuffle_codes() modulo 13. Optional.
+
+    Returns:
+        dict of numpy arrays with one entry per coup, ordered by shoe and then by
+            coup. Has the same keys as resolve_coups() plus shoe, the index of
+            the shoe where the coup was played, and with ranks punto_pair and
+            banco_pair, True if the two first cards of the hand have the same
+            rank.
+    """
+    num_shoes, num_cards = shoes.shape
+    position = np.zeros(num_shoes, dtype=np.intp)
+    offsets = np.arange(6)
+    batches = []
+    while True:
+        active = np.flatnonzero(num_cards - position >= 6)
+        if not active.size:
+            break
+        cards = position[active, None] + offsets
+        coups = resolve_coups(shoes[active[:, None], cards])
+        coups['shoe'] = active
+        if ranks is not None:
+            dealt = ranks[active[:, None], cards[:, :4]]
+            coups['punto_pair'] = dealt[:, 0] == dealt[:, 1]
+            coups['banco_pair'] = dealt[:, 2] == dealt[:, 3]
+        batches.append(coups)
+        position[active] += 4 + coups['punto_third'] + coups['banco_third']
+
+    if not batches:
+        coups = resolve_coups(np.empty((0, 6), dtype=np.int8))
+        coups['shoe'] = np.empty(0, dtype=np.intp)
+        if ranks is not None:
+            coups['punto_pair'] = coups['banco_pair'] = np.empty(0, dtype=bool)
+        batches.append(coups)
+    played = {key: np.concatenate([batch[key] for batch in batches])
+              for key in batches[0]}
+    order = np.argsort(played['shoe'], kind='stable')
+    return {key: value[order] for key, value in played.items()}
+
+def side_payouts(coups):
+    """Resolves the side bets of a batch of coups, see sides.SIDE_BETS.
+
+    Args:
+        coups: dict of numpy arrays, as returned by play_shoes() with ranks.
+
+    Returns:
+        numpy array of shape (n, len(SIDE_BETS)), the winnings per unit of each
+            side bet on each coup.
+    """
+    fields = [coups[key].astype(np.intp) for key in
+              ['result', 'punto_value', 'banco_value', 'punto_third', 'banco_third', 'natural']]
+    codes = (fields[0] | fields[1] << 2 | fields[2] << 6 | fields[3] << 10 | fields[4] << 11
+             | fields[5] << 12)
+    pairs = np.where(np.column_stack((coups['punto_pair'], coups['banco_pair'])),
+                     PAIR_PAYOUT, LOSS).astype(np.int8)
+    return np.hstack((pairs, value_payout_lookup()[codes]))
@@ -1,5 +1,17 @@
 from cards import Card
 
+# Banco third card tableau. Rows are the value of the two first banco cards,
+# columns the value of the punto third card, column 10 being used when punto
+# did not draw.
+_THIRD_CARD_RULES = {3: [0, 1, 2, 3, 4, 5, 6, 7, 9],
+                     4: [2, 3, 4, 5, 6, 7],
+                     5: [4, 5, 6, 7],
+                     6: [6, 7]}
+BANCO_DRAWS = tuple(
+    tuple(banco <= 2 or punto_third in _THIRD_CARD_RULES.get(banco, [])
+          for punto_third in range(10)) + (banco <= 5,)
+    for banco in range(10))
+
 class Hand:
     """A hand of cards to be played. Either from the banker or the player.
 
@@ -10,10 +22,13 @@ class Hand:
     Atributes:
         cards: list, a list of card type objects.
         value: int, the sum of the individual card values according to
-            baccarat rules.
+            baccarat rules. Kept up to date by add_cards().
     """
+    __slots__ = ('_cards', '_value')
+
     def __init__(self, cards):
         self._cards = []
+        self._value = 0
         self.add_cards(cards)
 
     @property
@@ -24,7 +39,7 @@ class Hand:
     @property
     def value(self):
         """Get hand value."""
-        return sum(self._cards)
+        return self._value
 
     def add_cards(self, cards):
         """Add cards to the hand object.
@@ -40,6 +55,7 @@ class Hand:
             if not isinstance(card, Card):
                 raise TypeError('Not a valid Card type object.')
             self._cards.append(card)
+            self._value = (self._value + card.value) % 10
 
     def is_natural(self):
         """Check if the hand is a natural according to the rules of
@@ -48,7 +64,7 @@ class Hand:
         Returns:
             bol, True if is a natural, False otherwise.
         """
-        if len(self._cards) == 2 and 8 <= self.value <= 9:
+        if len(self._cards) == 2 and self._value >= 8:
             return True
         return False
 
@@ -66,6 +82,8 @@ class Punto(Hand):
     """Player(punto) hand of baccarat. Adds the third card check for
     the player. Subclass of Hand.
     """
+    __slots__ = ()
+
     def __init__(self, cards):
         Hand.__init__(self, cards)
 
@@ -77,7 +95,7 @@ class Punto(Hand):
                 False otherwise.
         """
         if len(self._cards) == 2:
-            if 0 <= self.value <= 5:
+            if self._value <= 5:
                 return True
         return False
 
@@ -85,6 +103,8 @@ class Banco(Hand):
     """Banker(banco) hand of baccarat. Adds the third card check for
     the banker. Subclass of Hand.
     """
+    __slots__ = ()
+
     def __init__(self, cards):
         Hand.__init__(self, cards)
 
@@ -98,21 +118,10 @@ class Banco(Hand):
             bol, True if there is need to a third card draw,
                 False otherwise.
         """
-        third_card_rules = {3: [0, 1, 2, 3, 4, 5, 6, 7, 9],
-                            4: [2, 3, 4, 5, 6, 7],
-                            5: [4, 5, 6, 7],
-                            6: [6, 7]}
-
         if len(self._cards) == 2:
             if player_third:
                 if not isinstance(player_third, Card):
                     raise TypeError('Punto third card not a Card type object.')
-                if 0 <= self.value <= 2:
-                    return True
-                elif 3 <= self.value <= 6:
-                    if player_third.value in third_card_rules[self.value]:
-                        return True
-            else:
-                if 0 <= self.value <= 5:
-                    return True
+                return BANCO_DRAWS[self._value][player_third.value]
+            return BANCO_DRAWS[self._value][10]
         return False
@@ -0,0 +1,347 @@
+import os
+import re
+import sys
+import json
+import struct
+import bisect
+import collections
+from array import array
+from outcomes import RESULTS, pack_outcome, unpack_outcome
+from results import MAGIC, RECORD, NO_CARD, CsvWriter
+
+# Index files start with INDEX_MAGIC, the length of a JSON header as HEADER_SIZE
+# and the header, followed by the raw bytes of every array in ARRAYS order.
+INDEX_MAGIC = b'BACIDX01'
+HEADER_SIZE = struct.Struct('<I')
+EXTENSION = '.idx'
+
+# Letters of the results on the sequence of results, shoes being separated by
+# SEPARATOR so that patterns never cross two shoes.
+LETTERS = b'BPT'
+SEPARATOR = b'|'
+
+# Arrays of an index and their type codes.
+ARRAYS = {
+    'shoes': 'I',        # shoe number of each shoe
+    'offsets': 'Q',      # offset of each shoe on the results file
+    'starts': 'Q',       # index of the first coup of each shoe, plus the total
+    'counts': 'I',       # wins of each result of RESULTS on each shoe
+    'codes': 'H',        # packed outcome of each coup, see outcomes.outcome_table()
+    'run_results': 'B',  # index on RESULTS of each run of equal results
+    'run_lengths': 'H',  # length of each run
+    'run_starts': 'Q',   # index of the first run of each shoe, plus the total
+    'sequence': 'B',     # LETTERS of every coup, shoes separated by SEPARATOR
+    }
+
+def detect_format(file_name):
+    """Returns the format of a results file of baccarat-sim.py, from its first
+    bytes.
+    """
+    with open(file_name, 'rb') as results_file:
+        start = results_file.read(len(CsvWriter.HEADER))
+    if start.startswith(MAGIC):
+        return 'bin'
+    if start == CsvWriter.HEADER.encode():
+        return 'csv'
+    return 'text'
+
+def _scan_text(results_file):
+    """Yields the shoe number, shoe offset, result index, hand values and
+    number of cards of every coup of a text results file.
+    """
+    offset = 0
+    shoe = shoe_offset = None
+    for line in results_file:
+        if line[1:2] == b',' and line[:1] in LETTERS:
+            fields = line.rstrip().split(b',')
+            yield (shoe, shoe_offset, LETTERS.index(line[:1]), int(fields[2]), int(fields[1]),
+                   3 - fields[6:9].count(b'x'), 3 - fields[3:6].count(b'x'))
+        elif line.startswith(b'Shoe number '):
+            shoe = int(line[12:])
+            shoe_offset = offset
+        offset += len(line)
+
+def _scan_csv(results_file):
+    """Same as _scan_text() for a csv results file."""
+    offset = len(results_file.readline())
+    shoe = None
+    for line in results_file:
+        fields = line.rstrip(b'\r\n').split(b',')
+        if int(fields[0]) != shoe:
+            shoe = int(fields[0])
+            shoe_offset = offset
+        yield (shoe, shoe_offset, RESULTS.index(fields[1].decode()), int(fields[3]),
+               int(fields[2]), 3 - fields[7:10].count(b''), 3 - fields[4:7].count(b''))
+        offset += len(line)
+
+def _scan_bin(results_file, chunk_records=1 << 16):
+    """Same as _scan_text() for a binary results file."""
+    offset = len(results_file.read(len(MAGIC)))
+    shoe = None
+    while True:
+        data = results_file.read(RECORD.size * chunk_records)
+        if not data:
+            break
+        for (number, result, banco_value, punto_value, *cards) in RECORD.iter_unpack(data):
+            if number != shoe:
+                shoe = number
+                shoe_offset = offset
+            yield (shoe, shoe_offset, result, punto_value, banco_value,
+                   3 - cards[3:].count(NO_CARD), 3 - cards[:3].count(NO_CARD))
+            offset += RECORD.size
+
+SCANNERS = {'text': _scan_text, 'csv': _scan_csv, 'bin': _scan_bin}
+
+def build_index(file_name, index_name=None):
+    """Reads a results file once and writes its side index.
+
+    Args:
+        file_name: str, a results file of baccarat-sim.py in any format.
+        index_name: str, the index file. Optional, file_name plus EXTENSION by
+            default.
+
+    Returns:
+        ResultIndex, the new index.
+    """
+    index_name = index_name or file_name + EXTENSION
+    arrays = {name: array(typecode) for name, typecode in ARRAYS.items()}
+    shoes, offsets, starts, counts, codes, run_results, run_lengths, run_starts, sequence = \
+        arrays.values()
+    file_format = detect_format(file_name)
+    current = None
+    shoe_counts = None
+    with open(file_name, 'rb') as results_file:
+        for shoe, offset, result, punto_value, banco_value, punto_cards, banco_cards in \
+                SCANNERS[file_format](results_file):
+            if shoe != current:
+                if shoe_counts:
+                    counts.extend(shoe_counts)
+                    sequence.extend(SEPARATOR)
+                current = shoe
+                shoe_counts = [0, 0, 0]
+                shoes.append(shoe)
+                offsets.append(offset)
+                starts.append(len(codes))
+                run_starts.append(len(run_results))
+            natural = punto_cards == banco_cards == 2 and max(punto_value, banco_value) >= 8
+            codes.append(pack_outcome(result, punto_value, banco_value, punto_cards == 3,
+                                      banco_cards == 3, natural))
+            shoe_counts[result] += 1
+            sequence.append(LETTERS[result])
+            if len(run_results) > run_starts[-1] and run_results[-1] == result:
+                run_lengths[-1] += 1
+            else:
+                run_results.append(result)
+                run_lengths.append(1)
+    if shoe_counts:
+        counts.extend(shoe_counts)
+    starts.append(len(codes))
+    run_starts.append(len(run_results))
+
+    status = os.stat(file_name)
+    header = json.dumps({'source': os.path.basename(file_name), 'format': file_format,
+                         'size': status.st_size, 'mtime': status.st_mtime_ns,
+                         'byteorder': sys.byteorder,
+                         'lengths': {name: len(values) for name, values in arrays.items()}}
+                        ).encode()
+    with open(index_name, 'wb') as index_file:
+        index_file.write(INDEX_MAGIC)
+        index_file.write(HEADER_SIZE.pack(len(header)))
+        index_file.write(header)
+        for values in arrays.values():
+            values.tofile(index_file)
+    return ResultIndex(index_name, file_name)
+
+def open_index(file_name, rebuild=True):
+    """Opens the index of a results file, building it if it does not exist or
+    the results file changed since.
+
+    Args:
+        file_name: str, the results file.
+        rebuild: bool, build a missing or stale index. Optional, default True.
+
+    Raises:
+        ValueError: If the index is missing or stale and rebuild is False.
+    """
+    index_name = file_name + EXTENSION
+    if os.path.exists(index_name):
+        index = ResultIndex(index_name, file_name)
+        if not index.is_stale():
+            return index
+    if not rebuild:
+        raise ValueError('The index is missing or out of date.')
+    return build_index(file_name, index_name)
+
+class ResultIndex:
+    """Side index of a results file. Answers questions about streaks, per shoe
+    counts and card value patterns without reading the results file, which is
+    only opened to return the raw records of a shoe.
+
+    Args:
+        index_name: str, the index file written by build_index().
+        file_name: str, the results file. Optional, the source recorded on the
+            index, next to it, by default.
+
+    Attributes:
+        num_shoes: int, the number of shoes.
+        num_coups: int, the number of coups.
+        file_format: str, the format of the results file.
+
+    Raises:
+        ValueError: If the file is not an index.
+    """
+    def __init__(self, index_name, file_name=None):
+        with open(index_name, 'rb') as index_file:
+            if index_file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError('Not a results index file.')
+            size, = HEADER_SIZE.unpack(index_file.read(HEADER_SIZE.size))
+            self._header = json.loads(index_file.read(size))
+            for name, typecode in ARRAYS.items():
+                values = array(typecode)
+                values.fromfile(index_file, self._header['lengths'][name])
+                if self._header['byteorder'] != sys.byteorder:
+                    values.byteswap()
+                setattr(self, '_' + name, values)
+        self._file_name = file_name or os.path.join(os.path.dirname(index_name),
+                                                    self._header['source'])
+        self._sequence_starts = [start + shoe_i for shoe_i, start in enumerate(self._starts)]
+
+    @property
+    def num_shoes(self):
+        """Returns the number of shoes."""
+        return len(self._shoes)
+
+    @property
+    def num_coups(self):
+        """Returns the number of coups."""
+        return len(self._codes)
+
+    @property
+    def file_format(self):
+        """Returns the format of the results file."""
+        return self._header['format']
+
+    def is_stale(self):
+        """Checks if the results file changed since the index was built."""
+        try:
+            status = os.stat(self._file_name)
+        except FileNotFoundError:
+            return True
+        return (status.st_size, status.st_mtime_ns) != (self._header['size'],
+                                                        self._header['mtime'])
+
+    def shoe_number(self, shoe_i):
+        """Returns the shoe number of the shoe at an index."""
+        return self._shoes[shoe_i]
+
+    def shoe_counts(self, shoe_i):
+        """Returns a dict with the wins of each result on a shoe."""
+        return dict(zip(RESULTS, self._counts[3 * shoe_i:3 * shoe_i + 3]))
+
+    def shoe_records(self, shoe_i):
+        """Returns the raw bytes of a shoe on the results file."""
+        with open(self._file_name, 'rb') as results_file:
+            results_file.seek(self._offsets[shoe_i])
+            if shoe_i + 1 < len(self._offsets):
+                return results_file.read(self._offsets[shoe_i + 1] - self._offsets[shoe_i])
+            return results_file.read().split(b'\nTotal results:')[0]
+
+    def shoes_where(self, result, minimum=0, maximum=None):
+        """Returns the indexes of the shoes with a number of wins of a result
+        between minimum and maximum, both included.
+        """
+        column = RESULTS.index(result)
+        wins = self._counts[column::3]
+        return [shoe_i for shoe_i, count in enumerate(wins)
+                if count >= minimum and (maximum is None or count <= maximum)]
+
+    def _locate(self, position):
+        """Returns the shoe index and the coup index on the shoe of a position
+        on the sequence of results.
+        """
+        shoe_i = bisect.bisect_right(self._sequence_starts, position) - 1
+        return shoe_i, position - self._sequence_starts[shoe_i]
+
+    def runs(self, result, minimum=1, skip_ties=False):
+        """Finds the streaks of a result.
+
+        Args:
+            result: str, the result of the streaks.
+            minimum: int, the shortest streak. Optional, default value 1.
+            skip_ties: bool, ties neither break nor extend punto and banco
+                streaks, as on the big road. Optional, default value False.
+
+        Returns:
+            list, with the shoe index, the index of the first coup on the shoe
+                and the length of every streak.
+        """
+        letter = LETTERS[RESULTS.index(result):][:1]
+        if skip_ties and result != 'tie':
+            pattern = letter + b'(?:T*' + letter + b')*'
+        else:
+            pattern = letter + b'{%d,}' % max(minimum, 1)
+            skip_ties = False
+        streaks = []
+        for match in re.finditer(pattern, self._sequence):
+            length = match.group().count(letter) if skip_ties else match.end() - match.start()
+            if length >= minimum:
+                streaks.append(self._locate(match.start()) + (length,))
+        return streaks
+
+    def streak_counts(self, result, skip_ties=False):
+        """Returns a dict with the number of streaks of a result of each
+        length. Read from the run length encoded results unless skipping ties.
+        """
+        if skip_ties and result != 'tie':
+            counts = collections.Counter(length for _, _, length
+                                         in self.runs(result, skip_ties=True))
+        else:
+            code = RESULTS.index(result)
+            counts = collections.Counter(length for run_result, length
+                                         in zip(self._run_results, self._run_lengths)
+                                         if run_result == code)
+        return dict(sorted(counts.items()))
+
+    def find(self, pattern):
+        """Finds a pattern on the sequence of results of every shoe.
+
+        Args:
+            pattern: str, a regular expression over the letters B, P and T of
+                the results, such as 'B{8,}' or 'PBT'.
+
+        Returns:
+            list, with the shoe index and the index of the first coup on the
+                shoe of every non overlapping match.
+        """
+        return [self._locate(match.start())
+                for match in re.finditer(pattern.encode(), self._sequence)]
+
+    def outcomes(self, result=None, punto_value=None, banco_value=None, punto_third=None,
+                 banco_third=None, natural=None):
+        """Finds the coups with a card value pattern, every argument left as
+        None matching anything.
+
+        Args:
+            result: str, the winning hand or tie.
+            punto_value, banco_value: int, final value of each hand.
+            punto_third, banco_third: bool, if the hand drew a third card.
+            natural: bool, if there was a natural.
+
+        Returns:
+            list, with the shoe index and the index on the shoe of every coup.
+        """
+        wanted = (result, punto_value, banco_value, punto_third, banco_third, natural)
+        matching = {code for code in set(self._codes)
+                    if all(value is None or value == field
+                           for value, field in zip(wanted, unpack_outcome(code)))}
+        coups = []
+        for coup in (i for i, code in enumerate(self._codes) if code in matching):
+            shoe_i = bisect.bisect_right(self._starts, coup) - 1
+            coups.append((shoe_i, coup - self._starts[shoe_i]))
+        return coups
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'ResultIndex({self._file_name + EXTENSION!r})'
@@ -0,0 +1,218 @@
+import numpy as np
+from cards import DECK
+from outcomes import OUTCOME_LIMIT, RESULTS, outcome_table
+from players import PAYOUTS
+from sides import SIDE_BETS, PAIR_PAYOUT, value_payout_table
+
+# Card values along each of the six axes of the coup tensors, the first axis
+# being the first card drawn from the shoe.
+_AXES = [np.arange(10).reshape([10 if i == axis else 1 for i in range(6)])
+         for axis in range(6)]
+
+# Entry of outcomes.outcome_table() of every sequence of six card values.
+_OUTCOME_CODES = np.asarray(outcome_table())[
+    (_AXES[0] + _AXES[1]) % 10 * 1000 + (_AXES[2] + _AXES[3]) % 10 * 100
+    + _AXES[4] * 10 + _AXES[5]]
+
+# Index on RESULTS of every sequence of six card values.
+RESULT_CODES = (_OUTCOME_CODES & 3).astype(np.int8)
+
+# Most cards on which the number of ways of drawing every sequence of six
+# cards, summed and times the largest side bet payout, still fits in int64.
+# Larger shoes are counted with Python integers.
+INT64_CARDS = 724
+
+def weights_dtype(num_cards):
+    """Returns the numpy dtype that counts the sequences of six cards of a
+    shoe exactly, int64 up to INT64_CARDS cards and object above.
+    """
+    return np.int64 if num_cards <= INT64_CARDS else object
+
+def shoe_counts(num_decks):
+    """Returns the number of cards of each value, from 0 to 9, on a full shoe."""
+    return [16 * num_decks] + [4 * num_decks] * 9
+
+def shoe_rank_counts(num_decks):
+    """Returns the number of cards of each rank of cards.RANKS on a full shoe."""
+    return [4 * num_decks] * 13
+
+def sequence_weights(counts):
+    """Counts the ways each sequence of six card values can be drawn from a shoe.
+
+    Args:
+        counts: list, the number of cards left of each value, from 0 to 9.
+
+    Returns:
+        numpy array of shape (10,) * 6, indexed by the values of the cards in
+            drawing order, of the dtype of weights_dtype().
+
+    Raises:
+        ValueError: If there are less than six cards left.
+    """
+    if sum(counts) < 6:
+        raise ValueError('At least six cards are needed to play a coup.')
+    dtype = weights_dtype(sum(counts))
+    counts = np.asarray(counts, dtype=np.int64).astype(dtype)
+    weights = np.ones((1,) * 6, dtype=dtype)
+    for i, card in enumerate(_AXES):
+        drawn = sum(_AXES[j] == card for j in range(i))
+        weights = weights * np.maximum(counts[card] - drawn, 0)
+    return weights
+
+def outcome_weights(counts):
+    """Returns a dict with the number of ways each result can happen on the
+    next coup. Integers, so the probabilities can be computed exactly.
+    """
+    weights = sequence_weights(counts)
+    return {result: int(weights[RESULT_CODES == code].sum())
+            for code, result in enumerate(RESULTS)}
+
+def outcome_probabilities(counts):
+    """Returns a dict with the probability of each result on the next coup.
+
+    Args:
+        counts: list, the number of cards left of each value, from 0 to 9.
+    """
+    weights = outcome_weights(counts)
+    total = sum(weights.values())
+    return {result: weight / total for result, weight in weights.items()}
+
+def bet_expectations(probabilities):
+    """Returns a dict with the expected value of a unit bet on each hand, with
+    the payouts of players.Player. A bet loses whenever its hand does not win.
+
+    Args:
+        probabilities: dict, the probability of each result.
+    """
+    return {hand: probabilities[hand] * PAYOUTS[hand] - (1 - probabilities[hand])
+            for hand in PAYOUTS}
+
+def side_bet_odds(rank_counts):
+    """Computes the exact odds of the side bets on the next coup. The pairs
+    only depend on the two cards of their hand, the value side bets are
+    weighted over every sequence of six card values.
+
+    Args:
+        rank_counts: list, the number of cards left of each rank of
+            cards.RANKS.
+
+    Returns:
+        dict, by side bet of sides.SIDE_BETS, with the probability that it
+            wins and the expected value of a unit bet.
+    """
+    counts = [0] * 10
+    for card, count in zip(DECK, rank_counts):
+        counts[card.value] += count
+    weights = sequence_weights(counts)
+    total = int(weights.sum())
+    odds = {}
+
+    num_cards = sum(rank_counts)
+    pair = sum(count * (count - 1) for count in rank_counts) / (num_cards * (num_cards - 1))
+    for bet in SIDE_BETS[:2]:
+        odds[bet] = {'probability': pair, 'expectation': pair * (PAIR_PAYOUT + 1) - 1}
+
+    table = np.zeros((OUTCOME_LIMIT, 4), dtype=np.int64)
+    value_payouts = value_payout_table()
+    table[list(value_payouts)] = list(value_payouts.values())
+    payouts = table[_OUTCOME_CODES]
+    for i, bet in enumerate(SIDE_BETS[2:]):
+        odds[bet] = {'probability': int(weights[payouts[..., i] > 0].sum()) / total,
+                     'expectation': int((weights * payouts[..., i]).sum()) / total}
+    return odds
+
+_patterns = None
+
+def composition_patterns():
+    """Groups the sequences of six card values by how many cards of each value
+    they draw, since the ways of drawing a sequence only depend on that.
+    Computed on the first call.
+
+    Returns:
+        tuple, with a numpy array of shape (5005, 10) with the number of cards
+            of each value drawn by every pattern and a numpy array of shape
+            (3, 5005) with the number of sequences of each pattern that end on
+            each result of RESULTS.
+    """
+    global _patterns
+    if _patterns is None:
+        values = np.stack(np.broadcast_arrays(*_AXES), axis=-1).reshape(-1, 6)
+        keys = (7 ** values.astype(np.int64)).sum(axis=1)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        drawn = keys[:, None] // 7 ** np.arange(10) % 7
+        results = np.bincount(RESULT_CODES.ravel().astype(np.int64) * len(keys)
+                              + inverse.ravel(), minlength=3 * len(keys))
+        _patterns = (drawn, results.reshape(3, len(keys)))
+    return _patterns
+
+class EdgeTracker:
+    """Probabilities and expected values of the next coup of a live shoe. Only
+    the values whose counts changed since the last query are updated, and the
+    results are cached until the counts change.
+
+    Args:
+        shoe: object with a counts attribute, the number of cards left of each
+            value, such as cards.Shoe or rules.Game.
+
+    Attributes:
+        counts: list, the counts of the last query.
+    """
+    def __init__(self, shoe):
+        self._shoe = shoe
+        self._drawn, self._results = composition_patterns()
+        self._factors = np.ones((10, len(self._drawn)), dtype=np.int64)
+        self._counts = [None] * 10
+        self._weights = None
+
+    @property
+    def counts(self):
+        """Returns the counts of the last query."""
+        return list(self._counts)
+
+    def _update(self):
+        """Updates the ways of drawing each pattern from the values that
+        changed on the shoe. The factors switch to Python integers once the
+        shoe is too large for int64, see weights_dtype().
+        """
+        counts = self._shoe.counts
+        if weights_dtype(sum(counts)) is object and self._factors.dtype != object:
+            self._factors = self._factors.astype(object)
+        for value, count in enumerate(counts):
+            if count != self._counts[value]:
+                falling = [1]
+                for i in range(6):
+                    falling.append(falling[-1] * max(count - i, 0))
+                falling = np.array(falling, dtype=self._factors.dtype)
+                self._factors[value] = falling[self._drawn[:, value]]
+                self._counts[value] = count
+                self._weights = None
+
+    def weights(self):
+        """Returns a dict with the number of ways each result can happen on the
+        next coup. Same as outcome_weights() of the current counts.
+        """
+        self._update()
+        if self._weights is None:
+            if sum(self._counts) < 6:
+                raise ValueError('At least six cards are needed to play a coup.')
+            ways = self._results.astype(self._factors.dtype) @ self._factors.prod(axis=0)
+            self._weights = dict(zip(RESULTS, ways.tolist()))
+        return dict(self._weights)
+
+    def probabilities(self):
+        """Returns a dict with the probability of each result on the next coup."""
+        weights = self.weights()
+        total = sum(weights.values())
+        return {result: weight / total for result, weight in weights.items()}
+
+    def expectations(self):
+        """Returns a dict with the expected value of a unit bet on each hand on
+        the next coup.
+        """
+        return bet_expectations(self.probabilities())
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'EdgeTracker({self._shoe!r})'
@@ -0,0 +1,128 @@
+from array import array
+from cards import Card, DECK
+from hands import Punto, Banco
+
+RESULTS = ('banco', 'punto', 'tie')
+
+# One card of each baccarat value, indexed by value.
+VALUE_CARDS = [Card(10, 'hearts'), Card('ace', 'hearts')] + \
+              [Card(rank, 'hearts') for rank in range(2, 10)]
+
+# Card values of a full deck.
+DECK_VALUES = [card.value for card in DECK]
+
+def _resolve(punto_two, banco_two, fifth, sixth):
+    """Plays a coup through the Punto and Banco rule methods.
+
+    Args:
+        punto_two: int, value of the two first punto cards.
+        banco_two: int, value of the two first banco cards.
+        fifth: int, value of the fifth card drawn from the shoe.
+        sixth: int, value of the sixth card drawn from the shoe.
+
+    Returns:
+        int, the packed outcome of the coup.
+    """
+    punto = Punto([VALUE_CARDS[punto_two], VALUE_CARDS[0]])
+    banco = Banco([VALUE_CARDS[banco_two], VALUE_CARDS[0]])
+    natural = punto.is_natural() or banco.is_natural()
+    if not natural:
+        if punto.draw_third():
+            punto.add_cards([VALUE_CARDS[fifth]])
+            if banco.draw_third(punto.cards[2]):
+                banco.add_cards([VALUE_CARDS[sixth]])
+        elif banco.draw_third():
+            banco.add_cards([VALUE_CARDS[fifth]])
+    if punto.value > banco.value:
+        result = 1
+    elif punto.value < banco.value:
+        result = 0
+    else:
+        result = 2
+    return pack_outcome(result, punto.value, banco.value, len(punto.cards) == 3,
+                        len(banco.cards) == 3, natural)
+
+def pack_outcome(result, punto_value, banco_value, punto_third, banco_third, natural):
+    """Packs the outcome of a coup as an entry of outcome_table().
+
+    Args:
+        result: int, the index of the result in RESULTS.
+        punto_value, banco_value: int, final value of each hand.
+        punto_third, banco_third: bool, True if the hand drew a third card.
+        natural: bool, True if there was a natural.
+    """
+    return result | punto_value << 2 | banco_value << 6 | punto_third << 10 | \
+        banco_third << 11 | natural << 12
+
+_outcomes = None
+
+def outcome_table():
+    """Returns the outcome of every coup, indexed by the two card totals of
+    punto and banco and the values of the fifth and sixth cards, see
+    outcome_index(). Each entry packs the index of the result in RESULTS
+    (bits 0-1), the punto value (bits 2-5), the banco value (bits 6-9),
+    whether punto (bit 10) and banco (bit 11) drew a third card and whether
+    there was a natural (bit 12). Built on the first call, so importing the
+    module costs nothing to the code that does not use the table.
+
+    Returns:
+        array, of 10000 unsigned shorts.
+    """
+    global _outcomes
+    if _outcomes is None:
+        _outcomes = array('H', [_resolve(punto_two, banco_two, fifth, sixth)
+                                for punto_two in range(10)
+                                for banco_two in range(10)
+                                for fifth in range(10)
+                                for sixth in range(10)])
+    return _outcomes
+
+# Upper bound of the entries of outcome_table(), to size tables indexed by them.
+OUTCOME_LIMIT = 1 << 13
+
+def outcome_index(cards):
+    """Returns the index on outcome_table() of a coup.
+
+    Args:
+        cards: list, the values of the next six cards of the shoe in drawing
+            order. Punto receives the first and second cards, banco the third
+            and fourth.
+    """
+    return ((cards[0] + cards[1]) % 10 * 1000 + (cards[2] + cards[3]) % 10 * 100
+            + cards[4] * 10 + cards[5])
+
+def coup_outcome(cards):
+    """Resolves a coup with a single lookup on outcome_table().
+
+    Args:
+        cards: list, the values of the next six cards of the shoe in drawing
+            order.
+
+    Returns:
+        tuple, see unpack_outcome().
+    """
+    return unpack_outcome(outcome_table()[outcome_index(cards)])
+
+def unpack_outcome(code):
+    """Unpacks an entry of outcome_table().
+
+    Returns:
+        tuple, with the result, the punto value, the banco value, whether
+            punto and banco drew a third card and whether there was a natural.
+    """
+    return (RESULTS[code & 3], code >> 2 & 15, code >> 6 & 15,
+            bool(code >> 10 & 1), bool(code >> 11 & 1), bool(code >> 12 & 1))
+
+def hand_cards(cards, punto_third, banco_third):
+    """Splits the six next card values of the shoe between both hands.
+
+    Returns:
+        tuple, with tuples of the card values of punto and banco.
+    """
+    if punto_third:
+        if banco_third:
+            return (cards[0], cards[1], cards[4]), (cards[2], cards[3], cards[5])
+        return (cards[0], cards[1], cards[4]), (cards[2], cards[3])
+    elif banco_third:
+        return (cards[0], cards[1]), (cards[2], cards[3], cards[4])
+    return (cards[0], cards[1]), (cards[2], cards[3])
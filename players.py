@@ -1,3 +1,54 @@
+from array import array
+from sides import SIDE_BETS
+
+# Winnings per unit bet on each hand.
+PAYOUTS = {'punto': 1, 'banco': 0.95, 'tie': 8}
+HANDS = ['punto', 'banco', 'tie']
+
+def check_balance(balance):
+    """Validates an initial balance.
+
+    Raises:
+        TypeError: if the balance is not an integer.
+        ValueError: if the balance is not positive.
+    """
+    if not isinstance(balance, int):
+        raise TypeError('Balance must be an integer.')
+    elif balance < 1:
+        raise ValueError('Balance must be positive.')
+
+def check_hand(hand):
+    """Validates the hand of a bet.
+
+    Raises:
+        ValueError: If the value is neither punto, banco or tie.
+    """
+    if hand not in HANDS:
+        raise ValueError('Invalid hand.')
+
+def check_side_bet(bet):
+    """Validates a side bet.
+
+    Raises:
+        ValueError: If the value is not one of sides.SIDE_BETS.
+    """
+    if bet not in SIDE_BETS:
+        raise ValueError('Invalid side bet.')
+
+def check_amount(amount, balance):
+    """Validates the amount of a bet against a balance.
+
+    Raises:
+        TypeError: If the amount is not an integer.
+        ValueError: If the amount is not positive or exceeds the balance.
+    """
+    if not isinstance(amount, int):
+        raise TypeError('Amount must be a integer.')
+    if amount < 1:
+        raise ValueError('Amount must be positive.')
+    if amount > balance:
+        raise ValueError('Amount exceeds available balance.')
+
 class Player:
     """A player of baccarat game. Create several instances to have multiplayer.
 
@@ -9,6 +60,7 @@ class Player:
         balance: int, the balance of player.
         hand_bet: str, the hand in which the player is betting.
         amount_bet: int, the amount of a bet.
+        side_bets: dict, the amount of each side bet of the player.
 
     Raises:
         TypeError: if the balance is not an integer.
@@ -17,14 +69,12 @@ class Player:
     _pid = 1
 
     def __init__(self, balance):
-        if not isinstance(balance, int):
-            raise TypeError('Balance must be an integer.')
-        elif balance < 1:
-            raise ValueError('Balance must be positive.')
+        check_balance(balance)
         self._pid = Player._pid
         self._balance = balance
         self._hand_bet = None
         self._amount_bet = 0
+        self._side_bets = {}
         Player._pid += 1
 
     @property
@@ -49,8 +99,7 @@ class Player:
 
     @hand_bet.setter
     def hand_bet(self, hand):
-        if hand not in ['punto', 'banco', 'tie']:
-            raise ValueError('Invalid hand.')
+        check_hand(hand)
         self._hand_bet = hand
 
     @property
@@ -60,27 +109,65 @@ class Player:
         Raises:
             TypeError: When setting if the amount is a integer.
             ValueError: When setting if the amount exceed the
-                available balance.
+                available balance, net of the side bets.
         """
         return self._amount_bet
 
     @amount_bet.setter
     def amount_bet(self, amount):
-        if not isinstance(amount, int):
-            raise TypeError('Amount must be a integer.')
-        if amount < 1:
-            raise ValueError('Amount must be positive.')
-        if amount > self._balance:
-            raise ValueError('Amount exceeds available balance.')
+        check_amount(amount, self._balance - sum(self._side_bets.values()))
         self._amount_bet = amount
 
+    @property
+    def side_bets(self):
+        """Get the amount of each side bet."""
+        return dict(self._side_bets)
+
+    def side_bet(self, bet, amount):
+        """Places or replaces a side bet.
+
+        Args:
+            bet: str, one of sides.SIDE_BETS.
+            amount: int, the amount to bet.
+
+        Raises:
+            ValueError: If the side bet is not valid or the amount is not
+                positive or exceeds the balance left by the other bets.
+            TypeError: If the amount is not an integer.
+        """
+        check_side_bet(bet)
+        committed = self._amount_bet + sum(self._side_bets.values()) - \
+            self._side_bets.get(bet, 0)
+        check_amount(amount, self._balance - committed)
+        self._side_bets[bet] = amount
+
+    def settle_side_bets(self, payouts):
+        """Applies the results of the side bets and resets them.
+
+        Args:
+            payouts: dict, the winnings per unit of each side bet, such as
+                sides.hand_payouts().
+
+        Returns:
+            int, the net winnings of the side bets.
+
+        Raises:
+            InvalidBet: If the player does not have side bets.
+        """
+        if not self._side_bets:
+            raise InvalidBet('Player does not have side bets.')
+        net = sum(amount * payouts[bet] for bet, amount in self._side_bets.items())
+        self._balance += net
+        self._side_bets = {}
+        return net
+
     def is_valid_bet(self):
         """Checks if the current bet is valid.
 
         Returns:
             bol, True if the bet is valid, False otherwise.
         """
-        if self._hand_bet not in ['punto', 'banco', 'tie'] or self._amount_bet <= 0:
+        if self._hand_bet not in HANDS or self._amount_bet <= 0:
             return False
         return True
 
@@ -92,12 +179,7 @@ class Player:
             InvalidBet: If the player does not have a valid bet.
         """
         if self.is_valid_bet():
-            if self._hand_bet == 'punto':
-                self._balance += int(self._amount_bet * 1)
-            elif self._hand_bet == 'banco':
-                self._balance += int(self._amount_bet * 0.95)
-            elif self._hand_bet == 'tie':
-                self._balance += int(self._amount_bet * 8)
+            self._balance += int(self._amount_bet * PAYOUTS[self._hand_bet])
             self._hand_bet = None
             self._amount_bet = 0
         else:
@@ -128,7 +210,201 @@ class Player:
         """
         bet = f'Hand bet: {self._hand_bet}, Amount bet: {self._amount_bet}'
         no_bet = 'No bet'
-        return f'Player: {self._pid}, Balance: {self._balance}, {bet if self.is_valid_bet() else no_bet}.'
+        sides = ''.join(f', {side}: {amount}' for side, amount in self._side_bets.items())
+        return f'Player: {self._pid}, Balance: {self._balance}, \
+{bet if self.is_valid_bet() else no_bet}{sides}.'
+
+class Seats:
+    """Players of a table stored by seat in flat arrays of balances, stakes and
+    hands, so that all the bets of a coup can be settled in one batch. Follows
+    the same rules as Player, with the player ids taken from the same sequence.
+
+    Attributes:
+        balances: array, the balance of each seat.
+        stakes: array, the amount bet on each seat, 0 if there is no bet.
+        hands: array, the index on HANDS of the hand bet on each seat, -1 if
+            there is no hand.
+        side_stakes: dict, by side bet placed at least once, an array with the
+            amount bet on each seat, 0 if there is no bet.
+    """
+    def __init__(self):
+        self._pids = array('q')
+        self.balances = array('q')
+        self.stakes = array('q')
+        self.hands = array('b')
+        self.side_stakes = {}
+
+    def __len__(self):
+        return len(self._pids)
+
+    def add(self, balance):
+        """Seats a new player.
+
+        Args:
+            balance: int, the initial balance of the player.
+
+        Returns:
+            int, the seat of the player.
+        """
+        check_balance(balance)
+        self._pids.append(Player._pid)
+        Player._pid += 1
+        self.balances.append(balance)
+        self.stakes.append(0)
+        self.hands.append(-1)
+        for stakes in self.side_stakes.values():
+            stakes.append(0)
+        return len(self._pids) - 1
+
+    def pid(self, seat):
+        """Returns the player id of a seat."""
+        return self._pids[seat]
+
+    def balance(self, seat):
+        """Returns the balance of a seat."""
+        return self.balances[seat]
+
+    def hand_bet(self, seat):
+        """Returns the hand bet on a seat, None if there is none."""
+        hand = self.hands[seat]
+        return HANDS[hand] if hand >= 0 else None
+
+    def bet(self, seat, hand, amount):
+        """Places a bet on a seat. As with Player, the hand is kept even if the
+        amount is then found invalid.
+
+        Raises:
+            TypeError, ValueError: On an invalid hand or amount.
+        """
+        check_hand(hand)
+        self.hands[seat] = HANDS.index(hand)
+        check_amount(amount, self.balances[seat] - self._side_total(seat))
+        self.stakes[seat] = amount
+
+    def side_bets(self, seat):
+        """Returns a dict with the amount of each side bet of a seat."""
+        return {bet: stakes[seat] for bet, stakes in self.side_stakes.items() if stakes[seat]}
+
+    def _side_total(self, seat):
+        """Returns the total amount of the side bets of a seat."""
+        return sum(stakes[seat] for stakes in self.side_stakes.values())
+
+    def side_bet(self, seat, bet, amount):
+        """Places or replaces a side bet on a seat, like Player.side_bet().
+
+        Raises:
+            TypeError, ValueError: On an invalid side bet or amount.
+        """
+        check_side_bet(bet)
+        stakes = self.side_stakes.get(bet)
+        if stakes is None:
+            stakes = self.side_stakes[bet] = array('q', [0]) * len(self._pids)
+        committed = self.stakes[seat] + self._side_total(seat) - stakes[seat]
+        check_amount(amount, self.balances[seat] - committed)
+        stakes[seat] = amount
+
+    def is_valid_bet(self, seat):
+        """Checks if the current bet of a seat is valid."""
+        return self.hands[seat] >= 0 and self.stakes[seat] > 0
+
+    def has_bets(self, seat):
+        """Checks if a seat has a valid bet or any side bet."""
+        return self.is_valid_bet(seat) or \
+            any(stakes[seat] for stakes in self.side_stakes.values())
+
+    def settle(self, seat, result, payouts=None):
+        """Applies the result of a coup to the bet and the side bets of a seat,
+        rounding the winnings like Player.win.
+
+        Args:
+            seat: int, the seat of the player.
+            result: str, the winning hand or tie.
+            payouts: dict, the winnings per unit of each side bet, such as
+                sides.hand_payouts(). Only needed if the seat has side bets.
+
+        Returns:
+            bool, True if the bet won, None if the seat only had side bets.
+
+        Raises:
+            InvalidBet: If the seat does not have a valid bet nor side bets.
+        """
+        if not self.has_bets(seat):
+            raise InvalidBet('Player does not have a valid bet.')
+        won = None
+        if self.is_valid_bet(seat):
+            hand = HANDS[self.hands[seat]]
+            won = hand == result
+            if won:
+                self.balances[seat] += int(self.stakes[seat] * PAYOUTS[hand])
+            else:
+                self.balances[seat] -= self.stakes[seat]
+        self.hands[seat] = -1
+        self.stakes[seat] = 0
+        for bet, stakes in self.side_stakes.items():
+            if stakes[seat]:
+                self.balances[seat] += stakes[seat] * payouts[bet]
+                stakes[seat] = 0
+        return won
+
+    def settle_all(self, result, payouts=None):
+        """Applies the result of a coup to every valid bet and side bet at
+        once. Uses NumPy views of the arrays when it is installed, settling
+        seat by seat otherwise. Winnings are rounded like Player.win, from a
+        table of the payout of each hand.
+
+        Args:
+            result: str, the winning hand or tie.
+            payouts: dict, the winnings per unit of each side bet. Only needed
+                if there are side bets.
+
+        Returns:
+            list, the seats that were left without balance.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            busted = []
+            for seat in range(len(self._pids)):
+                if self.has_bets(seat):
+                    self.settle(seat, result, payouts)
+                    if self.balances[seat] <= 0:
+                        busted.append(seat)
+            return busted
+
+        balances = np.frombuffer(self.balances, dtype=np.int64)
+        stakes = np.frombuffer(self.stakes, dtype=np.int64)
+        hands = np.frombuffer(self.hands, dtype=np.int8)
+        hand_payouts = np.array([PAYOUTS[hand] for hand in HANDS], dtype=np.float64)
+        valid = (hands >= 0) & (stakes > 0)
+        won = valid & (hands == HANDS.index(result))
+        lost = valid & ~won
+        balances[won] += (stakes[won] * hand_payouts[hands[won]]).astype(np.int64)
+        balances[lost] -= stakes[lost]
+        hands[valid] = -1
+        stakes[valid] = 0
+        settled = valid
+        for bet, side_stakes in self.side_stakes.items():
+            side_stakes = np.frombuffer(side_stakes, dtype=np.int64)
+            placed = side_stakes > 0
+            if placed.any():
+                balances[placed] += side_stakes[placed] * payouts[bet]
+                side_stakes[placed] = 0
+                settled = settled | placed
+        return np.flatnonzero(settled & (balances <= 0)).tolist()
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return 'Seats()'
+
+    def status(self, seat):
+        """Returns the same status string as Player for a seat."""
+        bet = f'Hand bet: {self.hand_bet(seat)}, Amount bet: {self.stakes[seat]}'
+        no_bet = 'No bet'
+        sides = ''.join(f', {side}: {amount}' for side, amount in self.side_bets(seat).items())
+        return f'Player: {self._pids[seat]}, Balance: {self.balances[seat]}, \
+{bet if self.is_valid_bet(seat) else no_bet}{sides}.'
 
 class InvalidBet(Exception):
     pass
@@ -0,0 +1,67 @@
+import time
+
+STAGES = ['shoe creation', 'coup resolution', 'record formatting', 'file writes']
+
+class StageTimer:
+    """Accumulates the time and the number of calls of each simulation stage.
+    The simulator only creates one with --profile, the stages check for it
+    once per shoe so that disabled profiling costs nothing.
+
+    Attributes:
+        seconds: dict, the accumulated seconds of each stage.
+        calls: dict, the number of timed calls of each stage.
+    """
+    clock = time.perf_counter
+
+    def __init__(self):
+        self._seconds = dict.fromkeys(STAGES, 0.0)
+        self._calls = dict.fromkeys(STAGES, 0)
+
+    @property
+    def seconds(self):
+        """Returns the accumulated seconds of each stage."""
+        return dict(self._seconds)
+
+    @property
+    def calls(self):
+        """Returns the number of timed calls of each stage."""
+        return dict(self._calls)
+
+    def add(self, stage, start):
+        """Adds the time elapsed since start to a stage.
+
+        Args:
+            stage: str, one of STAGES.
+            start: float, the value of clock() when the stage started.
+
+        Returns:
+            float, the current value of clock(), to start the next stage.
+        """
+        now = self.clock()
+        self._seconds[stage] += now - start
+        self._calls[stage] += 1
+        return now
+
+    def merge(self, other):
+        """Adds the times of another StageTimer, such as one of a worker."""
+        for stage in STAGES:
+            self._seconds[stage] += other._seconds[stage]
+            self._calls[stage] += other._calls[stage]
+
+    def report(self, wall_seconds, coups):
+        """Returns a string with the breakdown of the stages and the
+        throughput of the run.
+
+        Args:
+            wall_seconds: float, the duration of the whole run.
+            coups: int, the number of coups played.
+        """
+        total = sum(self._seconds.values()) or 1
+        lines = ['Profile:']
+        for stage in STAGES:
+            lines.append(f'{stage.capitalize()}:\t{self._seconds[stage]:.3f}s\t'
+                         f'({round(self._seconds[stage] / total * 100, 1)}%)\t'
+                         f'{self._calls[stage]} calls')
+        lines.append(f'Total:\t{wall_seconds:.3f}s\t'
+                     f'{round(coups / wall_seconds) if wall_seconds else 0} coups/s')
+        return '\n'.join(lines)
@@ -0,0 +1,260 @@
+import os
+import struct
+import itertools
+
+FORMATS = ['text', 'csv', 'bin']
+RESULTS = ('banco', 'punto', 'tie')
+NO_CARD = -1
+
+# Binary files start with MAGIC followed by fixed width RECORD coups: shoe
+# number, index of the result in RESULTS, banco and punto values and the three
+# card values of banco and punto, padded with NO_CARD.
+MAGIC = b'BACSIM01'
+RECORD = struct.Struct('<I9b')
+BUFFER_SIZE = 1 << 20
+
+# Strings of the card values of the csv files, NO_CARD being the last one.
+CSV_VALUES = tuple(map(str, range(10))) + ('',)
+
+def hand_values(hand):
+    """Creates a list of strings with the values of a hand."""
+    values = []
+    for i in range(3):
+        try:
+            values.append(str(hand[i]))
+        except IndexError:
+            values.append('x')
+    return values
+
+def record_dtype():
+    """Returns the numpy dtype of the RECORD coups of the binary files."""
+    import numpy as np
+
+    return np.dtype([('shoe', '<u4'), ('result', 'i1'), ('banco_value', 'i1'),
+                     ('punto_value', 'i1'), ('banco_cards', 'i1', 3),
+                     ('punto_cards', 'i1', 3)])
+
+def iter_records(records):
+    """Converts numpy arrays of coups to rules.Coup records.
+
+    Args:
+        records: numpy arrays of the fields of record_dtype() by name, one
+            entry per coup, such as a slice of read_binary().
+
+    Yields:
+        tuple, with the shoe number and the rules.Coup record, like
+            rules.iter_shoes().
+    """
+    from rules import Coup
+
+    for shoe, result, banco_value, punto_value, banco_cards, punto_cards in zip(
+            records['shoe'].tolist(), records['result'].tolist(),
+            records['banco_value'].tolist(), records['punto_value'].tolist(),
+            records['banco_cards'].tolist(), records['punto_cards'].tolist()):
+        punto_values = tuple(value for value in punto_cards if value != NO_CARD)
+        banco_values = tuple(value for value in banco_cards if value != NO_CARD)
+        natural = len(punto_values) == len(banco_values) == 2 and \
+            max(punto_value, banco_value) >= 8
+        yield shoe, Coup(RESULTS[result], punto_value, banco_value, punto_values,
+                         banco_values, natural)
+
+def group_shoes(stream):
+    """Groups a stream of (shoe number, coup) pairs, such as the one of
+    rules.iter_shoes(), into shoes.
+
+    Yields:
+        tuple, with the shoe number and the list of its coups.
+    """
+    for shoe_number, pairs in itertools.groupby(stream, key=lambda pair: pair[0]):
+        yield shoe_number, [coup for _, coup in pairs]
+
+class Writer:
+    """Base class of the simulation result writers. Coups are rules.Coup
+    records.
+
+    Args:
+        file_name: str, the name of the file to be written.
+        offset: int, resumes an existing file, truncated at an offset returned
+            by tell(), instead of creating a new one. Optional.
+    """
+    mode = 'w'
+
+    def __init__(self, file_name, offset=None):
+        if offset is None:
+            self._file = open(file_name, self.mode, buffering=BUFFER_SIZE)
+        else:
+            os.truncate(file_name, offset)
+            self._file = open(file_name, self.mode.replace('w', 'a'), buffering=BUFFER_SIZE)
+        self._resumed = offset is not None
+
+    def format_shoe(self, shoe_number, coups):
+        """Returns the record of the coups of a shoe, as written to the file."""
+        raise NotImplementedError
+
+    def format_records(self, records):
+        """Returns the record of the coups of numpy arrays, as written to the
+        file. Converts them to rules.Coup records shoe by shoe unless the
+        format writes the arrays directly.
+
+        Args:
+            records: numpy arrays of the fields of record_dtype() by name, one
+                entry per coup ordered by shoe, such as the coups of
+                engine.play_shoes() with the shoe numbers.
+        """
+        return ''.join(self.format_shoe(shoe_number, coups)
+                       for shoe_number, coups in group_shoes(iter_records(records)))
+
+    def write(self, record):
+        """Writes a record returned by format_shoe() or format_records()."""
+        self._file.write(record)
+
+    def write_shoe(self, shoe_number, coups):
+        """Writes the coups of a shoe."""
+        self._file.write(self.format_shoe(shoe_number, coups))
+
+    def write_stream(self, stream):
+        """Writes a stream of (shoe number, coup) pairs shoe by shoe."""
+        for shoe_number, coups in group_shoes(stream):
+            self.write_shoe(shoe_number, coups)
+
+    def write_totals(self, total_wins, game_count):
+        """Writes the total results of the simulation, if the format has them."""
+        pass
+
+    def tell(self):
+        """Flushes the file and returns its size, to resume it later."""
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self):
+        """Flushes and closes the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class TextWriter(Writer):
+    """Human readable results, with the wins of every shoe and the totals."""
+    def format_shoe(self, shoe_number, coups):
+        shoe_wins = {'banco': 0, 'punto': 0, 'tie': 0}
+        lines = [f'\nShoe number {shoe_number}\n\n']
+        for coup in coups:
+            shoe_wins[coup.result] += 1
+            result = [coup.result.title()[0], str(coup.banco_value), str(coup.punto_value)]
+            result.extend(hand_values(coup.banco_values))
+            result.extend(hand_values(coup.punto_values))
+            lines.append(','.join(result) + '\n')
+        lines.append('\nShoe results:\n')
+        for win in shoe_wins:
+            lines.append(f'{win.title()}:\t{shoe_wins[win]}\n')
+        return ''.join(lines)
+
+    def write_totals(self, total_wins, game_count):
+        self._file.write('\nTotal results:\n')
+        for win in total_wins:
+            self._file.write(f'{win.title()}:\t{total_wins[win]}\t\
+({round((total_wins[win]/game_count) * 100, 4)}%)\n')
+
+class CsvWriter(Writer):
+    """One coup per row with a header. Missing third cards are left empty."""
+    HEADER = 'shoe,result,banco_value,punto_value,banco_1,banco_2,banco_3,' \
+             'punto_1,punto_2,punto_3\n'
+
+    def __init__(self, file_name, offset=None):
+        Writer.__init__(self, file_name, offset)
+        if not self._resumed:
+            self._file.write(self.HEADER)
+
+    def format_shoe(self, shoe_number, coups):
+        lines = []
+        for coup in coups:
+            banco_cards = list(map(str, coup.banco_values)) + [''] * (3 - len(coup.banco_values))
+            punto_cards = list(map(str, coup.punto_values)) + [''] * (3 - len(coup.punto_values))
+            lines.append(f'{shoe_number},{coup.result},{coup.banco_value},{coup.punto_value},'
+                         + ','.join(banco_cards + punto_cards) + '\n')
+        return ''.join(lines)
+
+    def format_records(self, records):
+        import numpy as np
+
+        cards = np.hstack((records['banco_cards'], records['punto_cards'])).tolist()
+        results = [RESULTS[result] for result in records['result'].tolist()]
+        return ''.join(
+            f'{shoe},{result},{banco_value},{punto_value},{CSV_VALUES[b1]},{CSV_VALUES[b2]},'
+            f'{CSV_VALUES[b3]},{CSV_VALUES[p1]},{CSV_VALUES[p2]},{CSV_VALUES[p3]}\n'
+            for shoe, result, banco_value, punto_value, (b1, b2, b3, p1, p2, p3) in zip(
+                records['shoe'].tolist(), results, records['banco_value'].tolist(),
+                records['punto_value'].tolist(), cards))
+
+class BinaryWriter(Writer):
+    """Packed fixed width RECORD coups after the MAGIC header. Read back with
+    read_binary().
+    """
+    mode = 'wb'
+
+    def __init__(self, file_name, offset=None):
+        Writer.__init__(self, file_name, offset)
+        if not self._resumed:
+            self._file.write(MAGIC)
+
+    def format_shoe(self, shoe_number, coups):
+        pack = RECORD.pack
+        padding = (NO_CARD, NO_CARD, NO_CARD)
+        return b''.join(
+            pack(shoe_number, RESULTS.index(coup.result), coup.banco_value, coup.punto_value,
+                 *(coup.banco_values + padding)[:3], *(coup.punto_values + padding)[:3])
+            for coup in coups)
+
+    def format_records(self, records):
+        import numpy as np
+
+        packed = np.empty(len(records['shoe']), dtype=record_dtype())
+        for field in packed.dtype.names:
+            packed[field] = records[field]
+        return packed.tobytes()
+
+WRITERS = {'text': TextWriter, 'csv': CsvWriter, 'bin': BinaryWriter}
+EXTENSIONS = {'text': 'txt', 'csv': 'csv', 'bin': 'bin'}
+
+def read_binary(file_name):
+    """Memory maps a file written by BinaryWriter.
+
+    Args:
+        file_name: str, the name of the file.
+
+    Returns:
+        numpy record array with the fields shoe, result, banco_value,
+            punto_value, banco_cards and punto_cards, the last two with shape
+            (3,). The data is only read from the file when it is accessed.
+
+    Raises:
+        ValueError: If the file was not written by BinaryWriter.
+    """
+    import numpy as np
+
+    with open(file_name, 'rb') as sim_file:
+        if sim_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('Not a binary simulation file.')
+        empty = not sim_file.read(1)
+    dtype = record_dtype()
+    if empty:
+        return np.zeros(0, dtype=dtype).view(np.recarray)
+    return np.memmap(file_name, dtype=dtype, mode='r', offset=len(MAGIC)).view(np.recarray)
+
+def iter_binary(file_name, chunk_size=1 << 16):
+    """Streams the coups of a file written by BinaryWriter.
+
+    Args:
+        file_name: str, the name of the file.
+        chunk_size: int, number of records converted at a time.
+
+    Yields:
+        tuple, with the shoe number and the rules.Coup record, like
+            rules.iter_shoes().
+    """
+    records = read_binary(file_name)
+    for start in range(0, len(records), chunk_size):
+        yield from iter_records(records[start:start + chunk_size])
@@ -0,0 +1,243 @@
+ROWS = 6
+
+# Codes of the results on the bead plate and of the marks on the other roads.
+BEAD_CODES = {'banco': 1, 'punto': 2, 'tie': 3}
+BIG_ROAD_CODES = {'banco': 1, 'punto': 2}
+RED = 1
+BLUE = 2
+
+# Derived roads and the number of big road columns each one looks back.
+DERIVED_ROADS = {'big_eye_boy': 1, 'small_road': 2, 'cockroach_pig': 3}
+ROADS = ['big_road'] + list(DERIVED_ROADS)
+
+# Names of the mark codes of each road, indexed by code.
+MARK_NAMES = {'big_road': (None, 'banco', 'punto'),
+              **{road: (None, 'red', 'blue') for road in DERIVED_ROADS}}
+
+class Grid:
+    """Grid of a big road style road, stored column by column in a bytearray of
+    rows cells per column, 0 being an empty cell. A mark equal to the last one
+    goes down the same column, or turns right on the last row or above an
+    occupied cell, the dragon tail. A different mark starts a new column on the
+    top row, right of where the last column started.
+
+    Args:
+        rows: int, number of rows of the grid. Optional, default value ROWS.
+
+    Attributes:
+        marks: bytearray, every mark in order.
+        lengths: list, the number of marks of each column of equal marks,
+            including the ones on its dragon tail.
+        column_marks: bytearray, the mark of each column.
+        num_columns: int, the number of grid columns used.
+    """
+    def __init__(self, rows=ROWS):
+        self.rows = rows
+        self.marks = bytearray()
+        self.lengths = []
+        self.column_marks = bytearray()
+        self._cells = bytearray()
+        self._start = -1
+        self._last = None
+        self._turned = False
+
+    @property
+    def num_columns(self):
+        """Returns the number of grid columns used."""
+        return len(self._cells) // self.rows
+
+    def cell(self, column, row):
+        """Returns the mark of a cell, 0 if it is empty."""
+        index = column * self.rows + row
+        return self._cells[index] if index < len(self._cells) else 0
+
+    def add(self, mark):
+        """Places a mark.
+
+        Args:
+            mark: int, the code of the mark, not 0.
+
+        Returns:
+            tuple, with the grid column and row of the mark.
+        """
+        if self.marks and mark == self.marks[-1]:
+            column, row = self._last
+            if not self._turned and row + 1 < self.rows and not self.cell(column, row + 1):
+                row += 1
+            else:
+                column += 1
+                self._turned = True
+            self.lengths[-1] += 1
+        else:
+            column = self._start + 1
+            row = 0
+            while self.cell(column, row):
+                column += 1
+            self._start = column
+            self._turned = False
+            self.lengths.append(1)
+            self.column_marks.append(mark)
+        index = column * self.rows + row
+        if index >= len(self._cells):
+            self._cells.extend(bytes((column + 1) * self.rows - len(self._cells)))
+        self._cells[index] = mark
+        self.marks.append(mark)
+        self._last = (column, row)
+        return column, row
+
+    def to_rows(self):
+        """Returns the grid as a list of rows, each one a list of mark codes."""
+        return [list(self._cells[row::self.rows]) for row in range(self.rows)]
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'Grid({self.rows})'
+
+class Roads:
+    """The scoreboard roads of a shoe, updated in constant amortized time per
+    coup. The derived roads only compare the lengths of the big road columns,
+    so no road is ever recomputed from the history of the shoe.
+
+    Args:
+        rows: int, number of rows of every road. Optional, default value ROWS.
+
+    Attributes:
+        bead_plate: bytearray, the BEAD_CODES of every result in order, filling
+            the columns of rows cells from top to bottom.
+        big_road: Grid, the banco and punto wins, see BIG_ROAD_CODES.
+        ties: dict, by index on big_road.marks, the number of ties that
+            followed that mark.
+        leading_ties: int, the number of ties before the first big road mark.
+        derived: dict, by name of DERIVED_ROADS, the Grid of RED and BLUE marks
+            of each derived road.
+    """
+    def __init__(self, rows=ROWS):
+        self.rows = rows
+        self.bead_plate = bytearray()
+        self.big_road = Grid(rows)
+        self.ties = {}
+        self.leading_ties = 0
+        self.derived = {road: Grid(rows) for road in DERIVED_ROADS}
+
+    def bead_position(self, index):
+        """Returns the column and row on the bead plate of a result."""
+        return divmod(index, self.rows)
+
+    def add(self, result):
+        """Adds the result of a coup to every road.
+
+        Args:
+            result: str, the winning hand or tie.
+
+        Returns:
+            dict, by road, the RED or BLUE mark added to each derived road.
+        """
+        self.bead_plate.append(BEAD_CODES[result])
+        big_road = self.big_road
+        if result == 'tie':
+            if big_road.marks:
+                last = len(big_road.marks) - 1
+                self.ties[last] = self.ties.get(last, 0) + 1
+            else:
+                self.leading_ties += 1
+            return {}
+        big_road.add(BIG_ROAD_CODES[result])
+
+        # Position of the new mark on the big road columns of equal marks
+        lengths = big_road.lengths
+        column = len(lengths) - 1
+        row = lengths[-1] - 1
+        added = {}
+        for road, distance in DERIVED_ROADS.items():
+            if row == 0:
+                if column - 1 - distance < 0:
+                    continue
+                mark = RED if lengths[column - 1] == lengths[column - 1 - distance] else BLUE
+            else:
+                if column - distance < 0:
+                    continue
+                mark = BLUE if lengths[column - distance] == row else RED
+            self.derived[road].add(mark)
+            added[road] = mark
+        return added
+
+    def grid(self, road):
+        """Returns the Grid of a road of ROADS."""
+        return self.big_road if road == 'big_road' else self.derived[road]
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'Roads({self.rows})'
+
+class RoadStats:
+    """Aggregates the roads of many shoes for pattern studies: for every road
+    of ROADS and every mark, a histogram of the lengths of its columns of equal
+    marks.
+
+    Attributes:
+        shoes: int, the number of shoes added.
+        columns: dict, by road and mark name, a list with the number of columns
+            of each length, indexed by length.
+    """
+    def __init__(self):
+        self.shoes = 0
+        self.columns = {road: {name: [] for name in MARK_NAMES[road][1:]} for road in ROADS}
+
+    def add_shoe(self, results):
+        """Builds the roads of a shoe from its results and adds them."""
+        roads = Roads()
+        add = roads.add
+        for result in results:
+            add(result)
+        self.add_roads(roads)
+
+    def add_roads(self, roads):
+        """Adds the column lengths of the roads of a shoe."""
+        self.shoes += 1
+        for road in ROADS:
+            grid = roads.grid(road)
+            names = MARK_NAMES[road]
+            for mark, length in zip(grid.column_marks, grid.lengths):
+                histogram = self.columns[road][names[mark]]
+                if len(histogram) <= length:
+                    histogram.extend([0] * (length + 1 - len(histogram)))
+                histogram[length] += 1
+
+    def merge(self, other):
+        """Adds the histograms of another RoadStats, such as one of a worker."""
+        self.shoes += other.shoes
+        for road, marks in other.columns.items():
+            for name, other_histogram in marks.items():
+                histogram = self.columns[road][name]
+                if len(histogram) < len(other_histogram):
+                    histogram.extend([0] * (len(other_histogram) - len(histogram)))
+                for length, count in enumerate(other_histogram):
+                    histogram[length] += count
+
+    def report(self):
+        """Returns a dict, by road and mark name, with the number of columns,
+        their mean length and the longest one.
+        """
+        report = {}
+        for road, marks in self.columns.items():
+            report[road] = {}
+            for name, histogram in marks.items():
+                columns = sum(histogram)
+                marks_count = sum(length * count for length, count in enumerate(histogram))
+                report[road][name] = {'columns': columns,
+                                      'mean_length': marks_count / columns if columns else 0,
+                                      'longest': len(histogram) - 1 if columns else 0}
+        return report
+
+    def state(self):
+        """Returns the JSON serializable state of the statistics."""
+        return {'shoes': self.shoes, 'columns': self.columns}
+
+    def restore(self, state):
+        """Restores a state returned by state()."""
+        self.shoes = state['shoes']
+        self.columns = state['columns']
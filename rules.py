@@ -1,6 +1,89 @@
-from cards import Card, Shoe
+from collections import namedtuple
+from cards import Card, Shoe, CompactShoe, make_rng
 from hands import Punto, Banco
-from players import Player
+from players import Seats
+from roads import Roads
+from sides import hand_payouts
+
+# Result record of a coup. The card values are tuples in drawing order. The
+# pairs, whether the two first cards of each hand have the same rank, are None
+# when unknown, such as on coups read back from results files.
+Coup = namedtuple('Coup', ['result', 'punto_value', 'banco_value', 'punto_values',
+                           'banco_values', 'natural', 'punto_pair', 'banco_pair'])
+Coup.__new__.__defaults__ = (None, None)
+
+def resolve_coup(shoe):
+    """Deals a coup from a shoe and applies the third card rules. The coup is
+    resolved through the Punto and Banco hands, which Game keeps for its cards
+    and values, not through the outcome table of outcomes.py, which only the
+    table engine of baccarat-sim.py uses.
+
+    Args:
+        shoe: Shoe, the shoe from which the cards are drawn.
+
+    Returns:
+        tuple, with the Punto and Banco hands and the Coup record.
+    """
+    draw_cards = shoe.draw_cards
+    punto = Punto(draw_cards(2))
+    banco = Banco(draw_cards(2))
+    natural = punto.is_natural() or banco.is_natural()
+    if not natural:
+        if punto.draw_third():
+            punto.add_cards(draw_cards(1))
+            if banco.draw_third(punto.cards[2]):
+                banco.add_cards(draw_cards(1))
+        elif banco.draw_third():
+            banco.add_cards(draw_cards(1))
+    punto_value = punto.value
+    banco_value = banco.value
+    if punto_value > banco_value:
+        result = 'punto'
+    elif punto_value < banco_value:
+        result = 'banco'
+    else:
+        result = 'tie'
+    punto_cards = punto.cards
+    banco_cards = banco.cards
+    coup = Coup(result, punto_value, banco_value,
+                tuple(card.value for card in punto_cards),
+                tuple(card.value for card in banco_cards), natural,
+                punto_cards[0].rank == punto_cards[1].rank,
+                banco_cards[0].rank == banco_cards[1].rank)
+    return punto, banco, coup
+
+def iter_coups(shoe):
+    """Lazily plays a shoe until it has less than six cards.
+
+    Args:
+        shoe: Shoe, the shoe to be played.
+
+    Yields:
+        Coup, the result record of each coup as it is dealt.
+    """
+    while shoe.num_cards >= 6:
+        yield resolve_coup(shoe)[2]
+
+def iter_shoes(num_shoes, num_decks=8, rng=None, compact=True):
+    """Lazily plays num_shoes new shoes one coup at a time, in constant memory.
+    Group the coups of each shoe with itertools.groupby on the shoe number.
+
+    Args:
+        num_shoes: int, number of shoes to be played.
+        num_decks: int, number of decks per shoe. Optional, default value 8.
+        rng: random number generator or seed shared by all the shoes, see
+            cards.make_rng(). Optional.
+        compact: bool, use CompactShoe instead of Shoe. Optional, default
+            value True.
+
+    Yields:
+        tuple, with the shoe number, starting at 1, and the Coup record.
+    """
+    rng = make_rng(rng)
+    for shoe_number in range(1, num_shoes + 1):
+        shoe = CompactShoe(num_decks, rng) if compact else Shoe(num_decks, rng)
+        for coup in iter_coups(shoe):
+            yield shoe_number, coup
 
 class Game:
     """Application of the rules of baccarat - punto banco variation. This class
@@ -9,6 +92,13 @@ class Game:
     Args:
         num_decks: int, number of decks of the initial shoe. Optional, default
             value 8.
+        compact: bool, use CompactShoe instead of Shoe. Optional, default
+            value False.
+        rng: random number generator or seed shared by all the shoes of the
+            game, see cards.make_rng(). Optional, the global random module by
+            default.
+        roads: bool, keep the scoreboard roads of the shoe. Optional, default
+            value False.
 
     Attributes:
         punto_value: int, value of punto hand.
@@ -16,12 +106,21 @@ class Game:
         banco_value: int, value of banco hand.
         banco_cards: str, cards of banco hand.
         num_decks: int, current number of decks in the shoe.
+        counts: list, the number of cards left of each value in the shoe.
+        roads: roads.Roads, the roads of the current shoe, updated with every
+            result, None unless enabled.
     """
-    def __init__(self, num_decks=8):
+    def __init__(self, num_decks=8, compact=False, rng=None, roads=False):
         self._game_running = False
+        self._compact = compact
+        self._roads = roads
+        self.roads = None
+        self._rng = make_rng(rng)
         self._players = []
         self._punto = None
         self._banco = None
+        self._result = None
+        self._side_results = None
         self.create_shoe(num_decks)
 
     @property
@@ -106,10 +205,20 @@ class Game:
         """Returns current number of cards in shoe."""
         return self._shoe.num_cards
 
+    @property
+    def counts(self):
+        """Returns the number of cards left of each value in shoe."""
+        return self._shoe.counts
+
     def create_shoe(self, num_decks):
         """Creates an instance of Shoe with num_decks."""
-        self._shoe = Shoe(num_decks)
+        if self._compact:
+            self._shoe = CompactShoe(num_decks, self._rng)
+        else:
+            self._shoe = Shoe(num_decks, self._rng)
         self._num_decks = num_decks
+        if self._roads:
+            self.roads = Roads()
 
     def deal_hands(self):
         """Deals both hands. Creates a Punto and Banco instance and pops two
@@ -122,8 +231,29 @@ class Game:
             raise GameError('Game is running')
         self._punto = Punto(self._shoe.draw_cards(2))
         self._banco = Banco(self._shoe.draw_cards(2))
+        self._result = None
+        self._side_results = None
         self._game_running = True
 
+    def play_coup(self):
+        """Deals and resolves a whole coup in one pass, without the display
+        strings of the step by step methods. The game stays closed.
+
+        Returns:
+            Coup, the result record of the coup.
+
+        Raises:
+           GameError: If a game is currently running.
+        """
+        if self._game_running:
+            raise GameError('Game is running')
+        self._punto, self._banco, coup = resolve_coup(self._shoe)
+        self._result = coup.result
+        self._side_results = None
+        if self.roads is not None:
+            self.roads.add(coup.result)
+        return coup
+
     def is_natural(self):
         """Checks if there is an hand with a natural. If there is closes the
         game.
@@ -179,12 +309,34 @@ class Game:
         """
         if self._game_running:
             raise GameError('Game is running.')
-        if self._punto.value > self._banco.value:
-            return 'punto'
-        elif self._punto.value < self._banco.value:
-            return 'banco'
-        else:
-            return 'tie'
+        if self._result is None:
+            if self._punto.value > self._banco.value:
+                self._result = 'punto'
+            elif self._punto.value < self._banco.value:
+                self._result = 'banco'
+            else:
+                self._result = 'tie'
+            if self.roads is not None:
+                self.roads.add(self._result)
+        return self._result
+
+    def side_results(self):
+        """Resolves the side bets from the dealt hands, see
+        sides.hand_payouts().
+
+        Returns:
+            dict, the winnings per unit of each side bet.
+
+        Raises:
+            GameError: If the game is still running or no hands were dealt.
+        """
+        if self._game_running:
+            raise GameError('Game is running.')
+        if not self._punto:
+            raise GameError('No hands were dealt.')
+        if self._side_results is None:
+            self._side_results = hand_payouts(self._punto, self._banco)
+        return dict(self._side_results)
 
     def __repr__(self):
         """Return the representation string as if the object was
@@ -201,34 +353,45 @@ class Table(Game):
         available_players: list, with the indexes of the players that are still
             in game with a positive balance.
         valid_bets: list, with the indexes of the players that currently have a
-            valid bet on the table.
+            valid bet, or only side bets, on the table.
+
+    Both lists are read from indexes of the funded players and of the players
+    with a valid bet, kept up to date whenever a player is added, bets or has
+    the bet settled, instead of checking every seat. The players are stored in
+    the flat arrays of a players.Seats.
     """
-    def __init__(self, num_decks=8):
+    def __init__(self, num_decks=8, compact=False, rng=None, roads=False):
         self._bets_open = True
-        Game.__init__(self, num_decks)
+        self._seats = Seats()
+        self._funded = {}
+        self._bettors = set()
+        Game.__init__(self, num_decks, compact, rng, roads)
 
     @property
     def num_players(self):
         """Retuns the total number of players."""
-        return len(self._players)
+        return len(self._seats)
 
     @property
     def available_players(self):
         """Returns the list of indexes of the players with positive balance."""
-        players = []
-        for player in self._players:
-            if player.balance > 0:
-                players.append(self._players.index(player))
-        return players
+        return list(self._funded)
 
     @property
     def valid_bets(self):
         """Returns the list of players with valid bets on table."""
-        players = []
-        for player_i in self.available_players:
-            if self._players[player_i].is_valid_bet():
-                players.append(player_i)
-        return players
+        return sorted(self._bettors)
+
+    def _index_player(self, player_i):
+        """Updates the indexes of funded players and valid bets for a player."""
+        if self._seats.balance(player_i) > 0:
+            self._funded[player_i] = None
+        else:
+            self._funded.pop(player_i, None)
+        if self._seats.has_bets(player_i):
+            self._bettors.add(player_i)
+        else:
+            self._bettors.discard(player_i)
 
     def deal_hands(self):
         """Deals both hands. Calls deal_hands from the superclass Game. Sets the
@@ -239,13 +402,25 @@ class Table(Game):
         self._bets_open = False
         Game.deal_hands(self)
 
+    def play_coup(self):
+        """Deals and resolves a whole coup. Calls play_coup from the superclass
+        Game. Sets the bets as closed.
+
+        Returns:
+            Coup, the result record of the coup.
+        """
+        if not self._bets_open:
+            raise GameError('There are some bets on table.')
+        self._bets_open = False
+        return Game.play_coup(self)
+
     def add_player(self, balance):
         """Add a new player to the table.
 
         Args:
             balance: int, the initial balance of the player.
         """
-        self._players.append(Player(balance))
+        self._index_player(self._seats.add(balance))
 
     def bet(self, player_i, hand_bet, amount_bet):
         """Place a bet.
@@ -260,25 +435,70 @@ class Table(Game):
         """
         if not self._bets_open:
             raise GameError('A player cannot make a bet after the hands are dealt.')
-        self._players[player_i].hand_bet = hand_bet
-        self._players[player_i].amount_bet = amount_bet
+        player_i = range(len(self._seats))[player_i]
+        try:
+            self._seats.bet(player_i, hand_bet, amount_bet)
+        finally:
+            self._index_player(player_i)
+
+    def side_bet(self, player_i, bet, amount):
+        """Place a side bet, see sides.SIDE_BETS.
+
+        Args:
+            player_i: int, index of the player that will make the bet.
+            bet: str, the side bet.
+            amount: int, the amount to bet.
+
+        Raises:
+            GameError: If the bets are closed.
+        """
+        if not self._bets_open:
+            raise GameError('A player cannot make a bet after the hands are dealt.')
+        player_i = range(len(self._seats))[player_i]
+        try:
+            self._seats.side_bet(player_i, bet, amount)
+        finally:
+            self._index_player(player_i)
 
     def bet_result(self, player_i):
-        """Apply the result, win or loss, of a bet according to the result of a game.
+        """Apply the result, win or loss, of a bet according to the result of a
+        game, along with the side bets of the player.
 
         Args:
             player_i: int, the index of the player to apply the bet result.
+
+        Returns:
+            tuple, with win or lose for the bet on the hand, or for the net
+                result of the side bets when there is none, push if they were
+                returned, and the balance of the player.
         """
-        if self._players[player_i].hand_bet == self.game_result():
-            self._players[player_i].win()
-            result = ('win', self._players[player_i].balance)
-        else:
-            self._players[player_i].lose()
-            result = ('lose', self._players[player_i].balance)
-        return result
+        player_i = range(len(self._seats))[player_i]
+        balance = self._seats.balance(player_i)
+        payouts = self.side_results() if self._seats.side_bets(player_i) else None
+        won = self._seats.settle(player_i, self.game_result(), payouts)
+        self._index_player(player_i)
+        if won is None:
+            change = self._seats.balance(player_i) - balance
+            return ('win' if change > 0 else 'push' if change == 0 else 'lose',
+                    self._seats.balance(player_i))
+        return ('win' if won else 'lose', self._seats.balance(player_i))
+
+    def settle_all(self):
+        """Applies the result of the game to every valid bet and side bet on
+        the table in a single batch, see players.Seats.settle_all().
+
+        Returns:
+            int, the number of players settled.
+        """
+        settled = len(self._bettors)
+        payouts = self.side_results() if self._bettors else None
+        for player_i in self._seats.settle_all(self.game_result(), payouts):
+            self._funded.pop(player_i, None)
+        self._bettors.clear()
+        return settled
 
     def open_bets(self):
-        if not self.valid_bets:
+        if not self._bettors:
             self._bets_open = True
         return self._bets_open
 
@@ -291,7 +511,7 @@ class Table(Game):
         Returns:
             str, the status of the player.
         """
-        return self._players[player_i].__str__()
+        return self._seats.status(player_i)
 
 class GameError(Exception):
     pass
@@ -0,0 +1,371 @@
+import json
+import random
+import asyncio
+from rules import Table, GameError
+from players import InvalidBet
+
+# Seconds the bets of a table stay open after the first bet of a coup.
+BET_WINDOW = 5.0
+# Messages queued for a client before it is disconnected as too slow.
+QUEUE_SIZE = 1024
+# Longest request line in bytes.
+LINE_LIMIT = 1 << 16
+
+# Errors of a request returned to the client instead of closing the connection.
+REQUEST_ERRORS = (GameError, InvalidBet, ValueError, TypeError, IndexError)
+
+def encode(message):
+    """Returns a message as a JSON line."""
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+class Client:
+    """Connection of a client. The messages to the client are queued and
+    written by its own task, so sending never waits on the network and a slow
+    client never delays the tables or the other clients. A client whose queue
+    fills up is disconnected.
+
+    Args:
+        writer: asyncio.StreamWriter, the connection of the client.
+        queue_size: int, the number of messages queued before disconnecting
+            the client. Optional, default value QUEUE_SIZE.
+
+    Attributes:
+        tables: set, the names of the tables the client joined.
+        closed: bool, True once the client is disconnected.
+    """
+    def __init__(self, writer, queue_size=QUEUE_SIZE):
+        self.tables = set()
+        self.closed = False
+        self._writer = writer
+        self._queue = asyncio.Queue(queue_size)
+        self._task = asyncio.ensure_future(self._write())
+
+    def send(self, data):
+        """Queues an encoded message.
+
+        Returns:
+            bool, False if the client is disconnected.
+        """
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.close()
+            return False
+        return True
+
+    async def _write(self):
+        """Writes the queued messages, everything queued at once before
+        waiting for the connection to drain.
+        """
+        queue = self._queue
+        try:
+            while True:
+                self._writer.write(await queue.get())
+                while not queue.empty():
+                    self._writer.write(queue.get_nowait())
+                await self._writer.drain()
+        except ConnectionError:
+            self.close()
+
+    def close(self):
+        """Disconnects the client."""
+        if not self.closed:
+            self.closed = True
+            self._task.cancel()
+            self._writer.close()
+
+class TableRoom:
+    """A Table hosted by the server, with the clients that joined it and the
+    owner of each player. The betting window of a coup opens with its first
+    bet and the coup is played when it closes, so an idle table costs
+    nothing.
+
+    Args:
+        name: str, the name of the table.
+        num_decks: int, number of decks of the shoes.
+        window: float, seconds the bets stay open after the first bet.
+        rng: random number generator or seed of the shoes, see
+            cards.make_rng(). Optional.
+
+    Attributes:
+        table: Table, the game of the room.
+        clients: set, the Client of every client that joined the table.
+        owners: dict, by index of player, the Client that added it.
+        coup: int, the number of coups played.
+    """
+    def __init__(self, name, num_decks, window, rng=None):
+        self.name = name
+        self.table = Table(num_decks, rng=rng)
+        self.window = window
+        self.clients = set()
+        self.owners = {}
+        self.coup = 0
+        self._timer = None
+        self._closes_at = None
+
+    def closes_in(self):
+        """Returns the seconds until the bets close, None if no window is open."""
+        if self._timer is None:
+            return None
+        return round(max(0.0, self._closes_at - asyncio.get_event_loop().time()), 3)
+
+    def broadcast(self, message):
+        """Sends a message to every client of the table, encoded only once."""
+        data = encode(message)
+        for client in list(self.clients):
+            if not client.send(data):
+                self.clients.discard(client)
+
+    def open_window(self):
+        """Starts the betting window of the next coup unless it is open."""
+        if self._timer is None:
+            loop = asyncio.get_event_loop()
+            self._closes_at = loop.time() + self.window
+            self._timer = loop.call_later(self.window, self.play)
+            self.broadcast({'event': 'bets', 'table': self.name, 'coup': self.coup + 1,
+                            'closes_in': self.window})
+
+    def play(self):
+        """Closes the bets, plays the coup step by step, settles every bet and
+        sends the result to the clients of the table.
+
+        Returns:
+            dict, the result message.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        table = self.table
+        table.deal_hands()
+        natural = table.is_natural()
+        if not natural:
+            table.draw_thirds()
+        result = table.game_result()
+        players = []
+        for player_i in table.valid_bets:
+            outcome, balance = table.bet_result(player_i)
+            players.append({'player': player_i, 'outcome': outcome, 'balance': balance})
+        table.open_bets()
+        self.coup += 1
+        message = {'event': 'result', 'table': self.name, 'coup': self.coup,
+                   'result': result, 'natural': natural,
+                   'punto_cards': table.punto_cards, 'punto_value': table.punto_value,
+                   'banco_cards': table.banco_cards, 'banco_value': table.banco_value,
+                   'players': players}
+        self.broadcast(message)
+        return message
+
+    def close(self):
+        """Cancels the betting window."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'TableRoom({self.name!r}, {self.table.num_decks}, {self.window})'
+
+class Server:
+    """Game server hosting many tables in one asyncio event loop. Clients
+    connect over TCP or a Unix socket and send one JSON object per line with
+    an op and its arguments, and an optional id echoed on the reply. Replies
+    are {"ok": true, ...} or {"ok": false, "error": ...}, and the tables send
+    their events to the clients that joined them:
+
+        join: table, decks. Joins a table, creating it with decks decks.
+        leave: table.
+        tables: the name, players, coups and clients of every table.
+        add_player: table, balance. Replies with the index of the player.
+        bet: table, player, hand, amount. Opens the betting window.
+        side_bet: table, player, bet, amount. Opens the betting window.
+        deal: table. Plays the coup without waiting for the window.
+        status: table. The status of every player.
+        create_shoe: table, decks.
+
+    Only the client that added a player bets for it. The tables send a bets
+    event when a betting window opens and a result event with the cards, the
+    result and the settled bets when it closes.
+
+    Args:
+        window: float, seconds the bets stay open after the first bet of a
+            coup. Optional, default value BET_WINDOW.
+        num_decks: int, default number of decks of the tables. Optional,
+            default value 8.
+        seed: int, seed of the shoes, each table shuffling with its own
+            stream derived from the seed and its name. Optional, random by
+            default.
+        queue_size: int, see Client. Optional, default value QUEUE_SIZE.
+
+    Attributes:
+        tables: dict, by name, the TableRoom of every table.
+    """
+    def __init__(self, window=BET_WINDOW, num_decks=8, seed=None, queue_size=QUEUE_SIZE):
+        self.tables = {}
+        self._window = window
+        self._num_decks = num_decks
+        self._seed = seed
+        self._queue_size = queue_size
+        self._ops = {
+            'join': self.join,
+            'leave': self.leave,
+            'tables': self.list_tables,
+            'add_player': self.add_player,
+            'bet': self.bet,
+            'side_bet': self.side_bet,
+            'deal': self.deal,
+            'status': self.status,
+            'create_shoe': self.create_shoe
+            }
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """Starts listening on a TCP port, or on a Unix socket if path is set.
+
+        Returns:
+            asyncio.Server, the listening server.
+        """
+        if path:
+            return await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    async def handle(self, reader, writer):
+        """Serves the requests of a connection until it is closed."""
+        client = Client(writer, self._queue_size)
+        try:
+            while not client.closed:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    client.send(encode(self.request(client, line)))
+        finally:
+            for name in client.tables:
+                self.tables[name].clients.discard(client)
+            client.close()
+
+    def request(self, client, line):
+        """Runs a request line of a client.
+
+        Returns:
+            dict, the reply.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'Invalid JSON.'}
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'Request must be a JSON object.'}
+        reply = {'id': request['id']} if 'id' in request else {}
+        op = self._ops.get(request.get('op'))
+        try:
+            if op is None:
+                raise ValueError('Unknown op.')
+            reply.update(op(client, request) or {})
+            reply['ok'] = True
+        except KeyError as error:
+            reply.update({'ok': False, 'error': f'Missing {error.args[0]}.'})
+        except REQUEST_ERRORS as error:
+            reply.update({'ok': False, 'error': str(error)})
+        return reply
+
+    def room(self, request):
+        """Returns the TableRoom of a request.
+
+        Raises:
+            ValueError: If the table does not exist.
+        """
+        room = self.tables.get(request['table'])
+        if room is None:
+            raise ValueError('Unknown table.')
+        return room
+
+    def owned(self, client, request):
+        """Returns the TableRoom and the index of the player of a request.
+
+        Raises:
+            ValueError: If the player was not added by the client.
+        """
+        room = self.room(request)
+        player_i = request['player']
+        if room.owners.get(player_i) is not client:
+            raise ValueError('Player not added by this client.')
+        return room, player_i
+
+    def join(self, client, request):
+        name = request['table']
+        if not isinstance(name, str):
+            raise TypeError('Table name must be a string.')
+        room = self.tables.get(name)
+        if room is None:
+            num_decks = request.get('decks', self._num_decks)
+            rng = None if self._seed is None else random.Random(f'{self._seed}:{name}')
+            room = TableRoom(name, num_decks, self._window, rng)
+            self.tables[name] = room
+        room.clients.add(client)
+        client.tables.add(name)
+        return {'table': name, 'decks': room.table.num_decks, 'coup': room.coup,
+                'closes_in': room.closes_in()}
+
+    def leave(self, client, request):
+        room = self.room(request)
+        room.clients.discard(client)
+        client.tables.discard(room.name)
+
+    def list_tables(self, client, request):
+        return {'tables': [{'table': name, 'players': room.table.num_players,
+                            'coup': room.coup, 'clients': len(room.clients)}
+                           for name, room in self.tables.items()]}
+
+    def add_player(self, client, request):
+        room = self.room(request)
+        room.table.add_player(request['balance'])
+        player_i = room.table.num_players - 1
+        room.owners[player_i] = client
+        return {'player': player_i}
+
+    def bet(self, client, request):
+        room, player_i = self.owned(client, request)
+        room.table.bet(player_i, request['hand'], request['amount'])
+        room.open_window()
+        return {'closes_in': room.closes_in()}
+
+    def side_bet(self, client, request):
+        room, player_i = self.owned(client, request)
+        room.table.side_bet(player_i, request['bet'], request['amount'])
+        room.open_window()
+        return {'closes_in': room.closes_in()}
+
+    def deal(self, client, request):
+        message = self.room(request).play()
+        return {'coup': message['coup'], 'result': message['result']}
+
+    def status(self, client, request):
+        room = self.room(request)
+        table = room.table
+        return {'coup': room.coup, 'closes_in': room.closes_in(),
+                'players': [table[player_i] for player_i in range(table.num_players)],
+                'valid_bets': table.valid_bets}
+
+    def create_shoe(self, client, request):
+        room = self.room(request)
+        if room.table.valid_bets:
+            raise GameError('There are some bets on table.')
+        room.table.create_shoe(request['decks'])
+        return {'decks': room.table.num_decks}
+
+    def close(self):
+        """Cancels the betting windows of every table."""
+        for room in self.tables.values():
+            room.close()
+
+    def __repr__(self):
+        """Return the representation string as if the object was
+        called when creating a new instance.
+        """
+        return f'Server({self._window}, {self._num_decks}, {self._seed})'
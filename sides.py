@@ -0,0 +1,147 @@
+from outcomes import outcome_table, unpack_outcome
+
+# Side bets, settled on the same coup as the bets on the hands. A pair wins when
+# the two first cards of its hand have the same rank. A dragon bonus wins when
+# its hand wins with a natural, pushing on a natural tie, or wins by at least
+# four points. Panda 8 wins when punto wins with a three card 8 and dragon 7
+# when banco wins with a three card 7.
+SIDE_BETS = ['punto_pair', 'banco_pair', 'punto_dragon', 'banco_dragon', 'panda_8', 'dragon_7']
+
+# Winnings per unit bet of the side bets. The dragon bonuses pay DRAGON_NATURAL
+# on a natural win and by the winning margin otherwise. A side bet pays PUSH
+# when it is returned and LOSS when it loses.
+PAIR_PAYOUT = 11
+DRAGON_NATURAL = 1
+DRAGON_MARGINS = {4: 1, 5: 2, 6: 4, 7: 6, 8: 10, 9: 30}
+PANDA_8_PAYOUT = 25
+DRAGON_7_PAYOUT = 40
+PUSH = 0
+LOSS = -1
+
+def dragon_payout(hand, result, punto_value, banco_value, natural):
+    """Returns the winnings per unit of a dragon bonus on a hand."""
+    if result != hand:
+        return PUSH if natural and result == 'tie' else LOSS
+    if natural:
+        return DRAGON_NATURAL
+    return DRAGON_MARGINS.get(abs(punto_value - banco_value), LOSS)
+
+def value_payouts(result, punto_value, banco_value, punto_third, banco_third, natural):
+    """Resolves the side bets that only depend on the card values.
+
+    Args:
+        result: str, the winning hand or tie.
+        punto_value, banco_value: int, final value of each hand.
+        punto_third, banco_third: bool, True if the hand drew a third card.
+        natural: bool, True if there was a natural.
+
+    Returns:
+        tuple, the winnings per unit of punto_dragon, banco_dragon, panda_8 and
+            dragon_7.
+    """
+    return (dragon_payout('punto', result, punto_value, banco_value, natural),
+            dragon_payout('banco', result, punto_value, banco_value, natural),
+            PANDA_8_PAYOUT if result == 'punto' and punto_third and punto_value == 8 else LOSS,
+            DRAGON_7_PAYOUT if result == 'banco' and banco_third and banco_value == 7 else LOSS)
+
+_value_payouts = None
+
+def value_payout_table():
+    """Returns a dict, by entry of outcomes.outcome_table(), with the value
+    side bet payouts of value_payouts(). Built on the first call.
+    """
+    global _value_payouts
+    if _value_payouts is None:
+        _value_payouts = {code: value_payouts(*unpack_outcome(code))
+                          for code in set(outcome_table())}
+    return _value_payouts
+
+def pair_payout(pair):
+    """Returns the winnings per unit of a pair bet, None if the pair is unknown."""
+    if pair is None:
+        return None
+    return PAIR_PAYOUT if pair else LOSS
+
+def coup_payouts(coup):
+    """Resolves the side bets of a rules.Coup record.
+
+    Returns:
+        tuple, the winnings per unit of each of SIDE_BETS. The pairs are None
+            when the coup does not record them.
+    """
+    return (pair_payout(coup.punto_pair), pair_payout(coup.banco_pair)) + value_payouts(
+        coup.result, coup.punto_value, coup.banco_value, len(coup.punto_values) == 3,
+        len(coup.banco_values) == 3, coup.natural)
+
+def hand_payouts(punto, banco):
+    """Resolves the side bets from the dealt hands.
+
+    Args:
+        punto: Punto, the punto hand of the coup.
+        banco: Banco, the banco hand of the coup.
+
+    Returns:
+        dict, the winnings per unit of each of SIDE_BETS.
+    """
+    if punto.value > banco.value:
+        result = 'punto'
+    elif punto.value < banco.value:
+        result = 'banco'
+    else:
+        result = 'tie'
+    payouts = (pair_payout(punto.cards[0].rank == punto.cards[1].rank),
+               pair_payout(banco.cards[0].rank == banco.cards[1].rank)) + value_payouts(
+        result, punto.value, banco.value, len(punto.cards) == 3, len(banco.cards) == 3,
+        punto.is_natural() or banco.is_natural())
+    return dict(zip(SIDE_BETS, payouts))
+
+class SideTally:
+    """Accumulates the hits and the net winnings per unit of every side bet
+    over many coups, one at a time or in batches.
+
+    Attributes:
+        coups: dict, the number of coups on which each side bet was resolved.
+        hits: dict, the number of coups on which each side bet won.
+        net: dict, the net winnings of a unit bet on every coup.
+    """
+    def __init__(self):
+        self.coups = dict.fromkeys(SIDE_BETS, 0)
+        self.hits = dict.fromkeys(SIDE_BETS, 0)
+        self.net = dict.fromkeys(SIDE_BETS, 0)
+
+    def add(self, coup):
+        """Adds the side bets of a rules.Coup record, skipping unknown pairs."""
+        for bet, payout in zip(SIDE_BETS, coup_payouts(coup)):
+            if payout is not None:
+                self.coups[bet] += 1
+                self.hits[bet] += payout > 0
+                self.net[bet] += payout
+
+    def add_batch(self, payouts):
+        """Adds a batch of coups.
+
+        Args:
+            payouts: numpy array of shape (n, len(SIDE_BETS)), the winnings per
+                unit of each coup, such as engine.side_payouts().
+        """
+        hits = (payouts > 0).sum(axis=0).tolist()
+        net = payouts.sum(axis=0, dtype='int64').tolist()
+        for i, bet in enumerate(SIDE_BETS):
+            self.coups[bet] += len(payouts)
+            self.hits[bet] += hits[i]
+            self.net[bet] += net[i]
+
+    def merge(self, other):
+        """Adds the counts of another SideTally, such as one of a worker."""
+        for bet in SIDE_BETS:
+            self.coups[bet] += other.coups[bet]
+            self.hits[bet] += other.hits[bet]
+            self.net[bet] += other.net[bet]
+
+    def report(self):
+        """Returns a dict with the hit rate and the expected value of a unit
+        bet of every side bet that was resolved, like odds.side_bet_odds().
+        """
+        return {bet: {'probability': self.hits[bet] / self.coups[bet],
+                      'expectation': self.net[bet] / self.coups[bet]}
+                for bet in SIDE_BETS if self.coups[bet]}
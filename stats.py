@@ -0,0 +1,164 @@
+import math
+
+# Normal quantile of the two sided 95% confidence intervals.
+Z_95 = 1.959964
+
+class Welford:
+    """Running mean and variance of a stream of values, updated one value at a
+    time with Welford's algorithm.
+
+    Attributes:
+        count: int, the number of values.
+        mean: float, the mean of the values.
+        variance: float, the sample variance of the values, None with less
+            than two values.
+    """
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self._m2 = m2
+
+    @property
+    def variance(self):
+        """Returns the sample variance."""
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+    def add(self, value):
+        """Adds a value to the stream."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def state(self):
+        """Returns the state as a list, to be restored with Welford(*state)."""
+        return [self.count, self.mean, self._m2]
+
+class BatchMeans:
+    """Streaming means and standard errors of metrics of categorical
+    observations, such as the results of the coups. The coups of a shoe are
+    correlated through the cards already drawn, so the standard errors come
+    from the variance of the means of consecutive batches of batch_size
+    observations instead of from the variance of single observations.
+
+    Args:
+        values: dict, by metric, a list with its value for each category.
+        batch_size: int, the number of observations of a batch. Optional,
+            default value 1000.
+
+    Attributes:
+        count: int, the number of observations.
+        num_batches: int, the number of completed batches.
+    """
+    def __init__(self, values, batch_size=1000):
+        self._values = values
+        self._batch_size = batch_size
+        num_categories = len(next(iter(values.values())))
+        self._totals = [0] * num_categories
+        self._batch = [0] * num_categories
+        self._batch_count = 0
+        self._means = {metric: Welford() for metric in values}
+
+    @property
+    def count(self):
+        """Returns the number of observations."""
+        return sum(self._totals)
+
+    @property
+    def num_batches(self):
+        """Returns the number of completed batches."""
+        return next(iter(self._means.values())).count
+
+    def add(self, category):
+        """Adds an observation.
+
+        Args:
+            category: int, the index of the category of the observation.
+        """
+        self._batch[category] += 1
+        self._batch_count += 1
+        if self._batch_count == self._batch_size:
+            self._close_batch()
+
+    def add_categories(self, categories):
+        """Adds many observations in order, counting the ones of each batch at
+        once. Gives the same statistics as adding them one by one.
+
+        Args:
+            categories: bytes, the index of the category of every observation,
+                such as a numpy array of them converted with tobytes().
+        """
+        position = 0
+        while position < len(categories):
+            stop = min(len(categories), position + self._batch_size - self._batch_count)
+            observations = categories[position:stop]
+            for category in range(len(self._batch)):
+                self._batch[category] += observations.count(category)
+            self._batch_count += stop - position
+            position = stop
+            if self._batch_count == self._batch_size:
+                self._close_batch()
+
+    def _close_batch(self):
+        """Adds the means of the completed batch and starts the next one."""
+        for metric, values in self._values.items():
+            self._means[metric].add(sum(count * value for count, value
+                                        in zip(self._batch, values)) / self._batch_size)
+        for category, count in enumerate(self._batch):
+            self._totals[category] += count
+            self._batch[category] = 0
+        self._batch_count = 0
+
+    def mean(self, metric):
+        """Returns the mean of a metric over every observation."""
+        totals = [total + count for total, count in zip(self._totals, self._batch)]
+        count = sum(totals)
+        if not count:
+            return None
+        return sum(total * value for total, value in zip(totals, self._values[metric])) / count
+
+    def standard_error(self, metric):
+        """Returns the batch means standard error of a metric, None with less
+        than two batches.
+        """
+        means = self._means[metric]
+        if means.variance is None:
+            return None
+        return math.sqrt(means.variance / means.count)
+
+    def precise(self, target):
+        """Checks if the standard error of every metric is at most target."""
+        for metric in self._values:
+            standard_error = self.standard_error(metric)
+            if standard_error is None or standard_error > target:
+                return False
+        return True
+
+    def report(self):
+        """Returns a dict, by metric, with the mean, the standard error and the
+        bounds of the 95% confidence interval, None while unknown.
+        """
+        report = {}
+        for metric in self._values:
+            mean = self.mean(metric)
+            standard_error = self.standard_error(metric)
+            interval = (None, None)
+            if standard_error is not None:
+                interval = (mean - Z_95 * standard_error, mean + Z_95 * standard_error)
+            report[metric] = {'mean': mean, 'standard_error': standard_error,
+                              'interval': interval}
+        return report
+
+    def state(self):
+        """Returns the JSON serializable state of the statistics."""
+        return {'totals': self._totals, 'batch': self._batch,
+                'means': {metric: means.state() for metric, means in self._means.items()}}
+
+    def restore(self, state):
+        """Restores a state returned by state()."""
+        self._totals = list(state['totals'])
+        self._batch = list(state['batch'])
+        self._batch_count = sum(self._batch)
+        self._means = {metric: Welford(*means) for metric, means in state['means'].items()}
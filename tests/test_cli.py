@@ -0,0 +1,105 @@
+import io
+import os
+import json
+import runpy
+import unittest
+import contextlib
+from unittest import mock
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'baccarat-cli.py')
+Cli = runpy.run_path(CLI_PATH)['Cli']
+
+SCRIPT = '''# two players
+add 1000
+add 500
+bet 1 banco 100
+bet 2 p 50  # punto
+side 1 punto_pair 10
+deal
+bet 3 banco 10
+bet 1 banco x
+deal
+status
+quit
+deal
+'''
+
+def balances(players):
+    """Returns the status strings of players without the global player ids."""
+    return [player.split(',', 1)[1] for player in players]
+
+def run_script(script, seed=7):
+    """Returns the number of failed commands and the records of a script,
+    the status records without the global player ids.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        failed = Cli(seed, pace=False).run_script(script.splitlines())
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    for record in records:
+        if 'players' in record:
+            record['players'] = balances(record['players'])
+    return failed, records
+
+class TestScript(unittest.TestCase):
+
+    def test_records(self):
+        failed, records = run_script(SCRIPT)
+        self.assertEqual(failed, 2)
+        self.assertEqual([record['command'] for record in records],
+                         ['add', 'add', 'bet', 'bet', 'side', 'deal', 'bet', 'bet', 'deal',
+                          'status'])
+        self.assertEqual(records[1], {'line': 3, 'command': 'add', 'player': 2,
+                                      'balance': 500, 'ok': True})
+        self.assertEqual(records[6]['error'], 'Invalid player.')
+        self.assertFalse(records[7]['ok'])
+        first, second = records[5], records[8]
+        self.assertEqual((first['round'], second['round']), (1, 2))
+        self.assertEqual([bet['player'] for bet in first['bets']], [1, 2])
+        self.assertEqual(second['bets'], [])
+        self.assertTrue(first['bets_open'])
+        for record in [first, second]:
+            for hand in ['punto', 'banco']:
+                values = record[f'{hand}_values']
+                self.assertEqual(len(record[f'{hand}_cards'].split(', ')), len(values))
+                self.assertEqual(sum(values) % 10, record[f'{hand}_value'])
+        self.assertEqual(len(records[9]['players']), 2)
+
+    def test_same_seed(self):
+        self.assertEqual(run_script(SCRIPT), run_script(SCRIPT))
+
+    def test_usage(self):
+        failed, records = run_script('add\nfold 1\n')
+        self.assertEqual(failed, 2)
+        self.assertEqual(records[0]['error'], 'Usage: add BALANCE.')
+        self.assertEqual(records[1]['error'], 'Command not recognized.')
+
+class TestMenus(unittest.TestCase):
+
+    def test_matches_script(self):
+        """The menus settle the same rounds as the script commands."""
+        inputs = iter(['1000', '500', 'b', '100', 'p', '50', 'x', '5', 's', 'b', '20', 'c'])
+        cli = Cli(7, pace=False)
+        with mock.patch('builtins.input', lambda prompt: next(inputs)), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+            cli.add_player()
+            cli.add_player()
+            cli.place_bets()
+            cli.deal_hands()
+            cli.place_bets()
+            cli.deal_hands()
+            cli.create_shoe()
+        _, records = run_script('add 1000\nadd 500\nbet 1 banco 100\nbet 2 punto 50\ndeal\n'
+                                'bet 2 banco 20\ndeal\nstatus\n')
+        self.assertEqual(balances(cli.status_command()['players']), records[7]['players'])
+        self.assertIn('Invalid hand.', output.getvalue())
+        for record in [records[4], records[6]]:
+            self.assertIn(f'{record["result"].title()}', output.getvalue())
+            for bet in record['bets']:
+                self.assertIn(f'Player {bet["player"]} {bet["outcome"]}. '
+                              f'Balance: {bet["balance"]}.', output.getvalue())
+            self.assertIn(f'Punto hand: {record["punto_cards"]}.', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from cards import DECK
+from outcomes import outcome_table
+from rules import iter_coups
+from sides import coup_payouts
+
+try:
+    import numpy as np
+    import engine
+except ImportError:
+    np = None
+
+class CodeShoe:
+    """Shoe that deals the cards of a list of codes in order."""
+    def __init__(self, codes):
+        self._cards = [DECK[code] for code in codes]
+
+    @property
+    def num_cards(self):
+        return len(self._cards)
+
+    def draw_cards(self, num_cards):
+        drawn, self._cards = self._cards[:num_cards], self._cards[num_cards:]
+        return drawn
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestEngine(unittest.TestCase):
+
+    def test_outcome_table(self):
+        """The vectorized engine matches the table on all 10^6 card values."""
+        cards = np.indices((10,) * 6).reshape(6, -1).T
+        coups = engine.resolve_coups(cards)
+        codes = (coups['result'].astype(np.intp) | coups['punto_value'].astype(np.intp) << 2
+                 | coups['banco_value'].astype(np.intp) << 6
+                 | coups['punto_third'].astype(np.intp) << 10
+                 | coups['banco_third'].astype(np.intp) << 11
+                 | coups['natural'].astype(np.intp) << 12)
+        index = ((cards[:, 0] + cards[:, 1]) % 10 * 1000 + (cards[:, 2] + cards[:, 3]) % 10 * 100
+                 + cards[:, 4] * 10 + cards[:, 5])
+        np.testing.assert_array_equal(codes, np.asarray(outcome_table())[index])
+
+    def test_play_shoes(self):
+        """Whole shoes play like rules.iter_coups() on the same cards, side
+        bets included.
+        """
+        for num_decks in [1, 8]:
+            codes = engine.shuffle_codes(20, num_decks, 1)
+            coups = engine.play_shoes(engine.DECK_VALUES[codes], codes % 13)
+            payouts = engine.side_payouts(coups).tolist()
+            expected = [(shoe, coup) for shoe, shoe_codes in enumerate(codes.tolist())
+                        for coup in iter_coups(CodeShoe(shoe_codes))]
+            self.assertEqual(len(coups['result']), len(expected))
+            for i, (shoe, coup) in enumerate(expected):
+                self.assertEqual(coups['shoe'][i], shoe)
+                self.assertEqual(engine.RESULTS[coups['result'][i]], coup.result)
+                self.assertEqual((coups['punto_value'][i], coups['banco_value'][i]),
+                                 (coup.punto_value, coup.banco_value))
+                for hand, values in [('punto', coup.punto_values), ('banco', coup.banco_values)]:
+                    cards = [value for value in coups[f'{hand}_cards'][i].tolist()
+                             if value != engine.NO_CARD]
+                    self.assertEqual(tuple(cards), values)
+                self.assertEqual((coups['natural'][i], coups['punto_pair'][i],
+                                  coups['banco_pair'][i]),
+                                 (coup.natural, coup.punto_pair, coup.banco_pair))
+                self.assertEqual(tuple(payouts[i]), coup_payouts(coup))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from hands import Hand, Punto, Banco, BANCO_DRAWS
+from outcomes import VALUE_CARDS
+
+# Punto third card values on which banco draws, by banco total, as printed on
+# the tableau. Banco always draws on 0 to 2 and never on 7.
+TABLEAU = {3: [0, 1, 2, 3, 4, 5, 6, 7, 9],
+           4: [2, 3, 4, 5, 6, 7],
+           5: [4, 5, 6, 7],
+           6: [6, 7]}
+
+class TestBancoDraws(unittest.TestCase):
+
+    def test_tableau(self):
+        for banco in range(10):
+            for punto_third in range(10):
+                draws = banco <= 2 or punto_third in TABLEAU.get(banco, [])
+                self.assertEqual(BANCO_DRAWS[banco][punto_third], draws, (banco, punto_third))
+            self.assertEqual(BANCO_DRAWS[banco][10], banco <= 5, banco)
+
+    def test_draw_third(self):
+        for banco in range(8):
+            hand = Banco([VALUE_CARDS[banco], VALUE_CARDS[0]])
+            self.assertEqual(hand.draw_third(), banco <= 5)
+            for punto_third in range(10):
+                self.assertEqual(hand.draw_third(VALUE_CARDS[punto_third]),
+                                 BANCO_DRAWS[banco][punto_third])
+
+class TestHandValue(unittest.TestCase):
+
+    def test_cached_value(self):
+        """The value kept by add_cards() is the sum of the cards modulo 10."""
+        for first in range(10):
+            for second in range(10):
+                hand = Hand([VALUE_CARDS[first], VALUE_CARDS[second]])
+                self.assertEqual(hand.value, (first + second) % 10)
+                for third in range(10):
+                    hand = Punto([VALUE_CARDS[first], VALUE_CARDS[second]])
+                    self.assertEqual(hand.draw_third(), hand.value <= 5)
+                    hand.add_cards([VALUE_CARDS[third]])
+                    self.assertEqual(hand.value, (first + second + third) % 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import re
+import unittest
+import tempfile
+import itertools
+import index
+from rules import iter_shoes
+from results import WRITERS, EXTENSIONS, group_shoes
+
+LETTERS = {'banco': 'B', 'punto': 'P', 'tie': 'T'}
+
+def streaks(results, result, skip_ties):
+    """Returns the start and length of the streaks of a result on the results
+    of a shoe, ties being ignored if skip_ties.
+    """
+    coups = [(i, other) for i, other in enumerate(results)
+             if not (skip_ties and result != 'tie' and other == 'tie')]
+    found = []
+    for other, group in itertools.groupby(coups, key=lambda coup: coup[1]):
+        group = list(group)
+        if other == result:
+            found.append((group[0][0], len(group)))
+    return found
+
+class TestResultIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls.shoes = list(group_shoes(iter_shoes(12, 8, 5)))
+        cls.files = {}
+        for file_format, writer_class in WRITERS.items():
+            file_name = os.path.join(cls._directory.name, f'sim.{EXTENSIONS[file_format]}')
+            with writer_class(file_name) as writer:
+                for shoe_number, coups in cls.shoes:
+                    writer.write_shoe(shoe_number, coups)
+                writer.write_totals({'banco': 1, 'punto': 1, 'tie': 0}, 2)
+            cls.files[file_format] = file_name
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def indexes(self):
+        for file_format, file_name in self.files.items():
+            yield file_format, index.build_index(file_name)
+
+    def test_counts(self):
+        for file_format, idx in self.indexes():
+            self.assertEqual(idx.file_format, file_format)
+            self.assertEqual(idx.num_shoes, len(self.shoes))
+            self.assertEqual(idx.num_coups, sum(len(coups) for _, coups in self.shoes))
+            for shoe_i, (shoe_number, coups) in enumerate(self.shoes):
+                self.assertEqual(idx.shoe_number(shoe_i), shoe_number)
+                self.assertEqual(idx.shoe_counts(shoe_i),
+                                 {result: sum(coup.result == result for coup in coups)
+                                  for result in LETTERS})
+            bancos = [sum(coup.result == 'banco' for coup in coups) for _, coups in self.shoes]
+            low, high = sorted(bancos)[3], sorted(bancos)[8]
+            self.assertEqual(idx.shoes_where('banco', low, high),
+                             [shoe_i for shoe_i, count in enumerate(bancos)
+                              if low <= count <= high])
+
+    def test_streaks(self):
+        for file_format, idx in self.indexes():
+            for result, minimum, skip_ties in itertools.product(LETTERS, [1, 3], [False, True]):
+                expected = [(shoe_i, start, length)
+                            for shoe_i, (_, coups) in enumerate(self.shoes)
+                            for start, length in streaks([coup.result for coup in coups],
+                                                         result, skip_ties)
+                            if length >= minimum]
+                self.assertEqual(idx.runs(result, minimum, skip_ties), expected,
+                                 (file_format, result, minimum, skip_ties))
+                if minimum == 1:
+                    counts = {}
+                    for _, _, length in expected:
+                        counts[length] = counts.get(length, 0) + 1
+                    self.assertEqual(idx.streak_counts(result, skip_ties),
+                                     dict(sorted(counts.items())))
+
+    def test_find(self):
+        for file_format, idx in self.indexes():
+            for pattern in ['BB', 'P{3,}', 'TB|BT']:
+                expected = [(shoe_i, match.start())
+                            for shoe_i, (_, coups) in enumerate(self.shoes)
+                            for match in re.finditer(
+                                pattern, ''.join(LETTERS[coup.result] for coup in coups))]
+                self.assertEqual(idx.find(pattern), expected, (file_format, pattern))
+
+    def test_outcomes(self):
+        queries = [{'result': 'tie'}, {'punto_value': 8, 'natural': True},
+                   {'banco_third': True, 'punto_third': False}, {'banco_value': 0}]
+        for file_format, idx in self.indexes():
+            for query in queries:
+                expected = []
+                for shoe_i, (_, coups) in enumerate(self.shoes):
+                    for coup_i, coup in enumerate(coups):
+                        fields = {'result': coup.result, 'punto_value': coup.punto_value,
+                                  'banco_value': coup.banco_value,
+                                  'punto_third': len(coup.punto_values) == 3,
+                                  'banco_third': len(coup.banco_values) == 3,
+                                  'natural': coup.natural}
+                        if all(fields[key] == value for key, value in query.items()):
+                            expected.append((shoe_i, coup_i))
+                self.assertEqual(idx.outcomes(**query), expected, (file_format, query))
+
+    def test_shoe_records(self):
+        for file_format, idx in self.indexes():
+            writer = WRITERS[file_format]
+            for shoe_i in [0, 5, len(self.shoes) - 1]:
+                record = writer.format_shoe(writer, *self.shoes[shoe_i])
+                record = record if isinstance(record, bytes) else record.encode()
+                if file_format == 'text':
+                    # A text shoe starts with a blank line, kept by the shoe before
+                    record = record[1:] + (b'\n' if shoe_i + 1 < len(self.shoes) else b'')
+                self.assertEqual(idx.shoe_records(shoe_i), record, (file_format, shoe_i))
+
+    def test_stale(self):
+        file_name = os.path.join(self._directory.name, 'stale.csv')
+        with WRITERS['csv'](file_name) as writer:
+            writer.write_shoe(*self.shoes[0])
+        with self.assertRaises(ValueError):
+            index.open_index(file_name, rebuild=False)
+        idx = index.open_index(file_name)
+        self.assertEqual(idx.num_shoes, 1)
+        self.assertFalse(idx.is_stale())
+        with WRITERS['csv'](file_name, os.path.getsize(file_name)) as writer:
+            writer.write_shoe(*self.shoes[1])
+        self.assertTrue(idx.is_stale())
+        self.assertEqual(index.open_index(file_name).num_shoes, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+    import odds
+    from rules import Game
+except ImportError:
+    odds = None
+
+@unittest.skipIf(odds is None, 'NumPy is not installed')
+class TestExactOdds(unittest.TestCase):
+
+    def check_probabilities(self, probabilities):
+        for probability in probabilities.values():
+            self.assertTrue(0 <= probability <= 1, probabilities)
+        self.assertAlmostEqual(sum(probabilities.values()), 1, places=12)
+
+    def test_eight_decks(self):
+        probabilities = odds.outcome_probabilities(odds.shoe_counts(8))
+        self.assertAlmostEqual(probabilities['banco'], 0.458597, places=6)
+        self.assertAlmostEqual(probabilities['punto'], 0.446247, places=6)
+        self.assertAlmostEqual(probabilities['tie'], 0.095156, places=6)
+
+    def test_large_shoes(self):
+        """Shoes beyond int64 stay exact."""
+        for num_decks in [1, 8, 14, 32, 64, 1000]:
+            probabilities = odds.outcome_probabilities(odds.shoe_counts(num_decks))
+            self.check_probabilities(probabilities)
+            self.assertAlmostEqual(probabilities['banco'], 0.4584, places=2)
+            self.assertAlmostEqual(probabilities['tie'], 0.0953, places=2)
+            for bet in odds.side_bet_odds(odds.shoe_rank_counts(num_decks)).values():
+                self.assertTrue(0 <= bet['probability'] <= 1)
+                self.assertTrue(-1 <= bet['expectation'] < 0)
+
+    def test_int64_bound(self):
+        """int64 and Python integers agree on the largest int64 shoe."""
+        counts = [odds.INT64_CARDS - 9 * 58] + [58] * 9
+        weights = odds.outcome_weights(counts)
+        with mock.patch.object(odds, 'INT64_CARDS', 0):
+            self.assertEqual(odds.outcome_weights(counts), weights)
+
+    def test_side_bets(self):
+        side_odds = odds.side_bet_odds(odds.shoe_rank_counts(8))
+        self.assertAlmostEqual(side_odds['punto_pair']['expectation'], -0.1036, places=4)
+        self.assertAlmostEqual(side_odds['punto_dragon']['expectation'], -0.0265, places=4)
+        self.assertAlmostEqual(side_odds['banco_dragon']['expectation'], -0.0937, places=4)
+        self.assertAlmostEqual(side_odds['panda_8']['expectation'], -0.1019, places=4)
+        self.assertAlmostEqual(side_odds['dragon_7']['expectation'], -0.0761, places=4)
+
+    def test_edge_tracker(self):
+        """The tracker follows outcome_weights() on small and large shoes."""
+        for num_decks, num_coups in [(1, 8), (8, 30), (32, 3)]:
+            game = Game(num_decks, rng=num_decks)
+            tracker = odds.EdgeTracker(game)
+            for coup in range(num_coups):
+                self.assertEqual(tracker.weights(), odds.outcome_weights(game.counts))
+                self.check_probabilities(tracker.probabilities())
+                game.play_coup()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from outcomes import VALUE_CARDS, RESULTS, outcome_table, outcome_index, unpack_outcome, \
+    pack_outcome
+from rules import resolve_coup
+
+class StackedShoe:
+    """Shoe that deals a fixed list of cards in order."""
+    def __init__(self, cards):
+        self._cards = list(cards)
+
+    def draw_cards(self, num_cards):
+        drawn, self._cards = self._cards[:num_cards], self._cards[num_cards:]
+        return drawn
+
+class TestOutcomeTable(unittest.TestCase):
+
+    def test_object_engine(self):
+        """The table matches rules.resolve_coup on every entry."""
+        table = outcome_table()
+        for punto_two in range(10):
+            for banco_two in range(10):
+                for fifth in range(10):
+                    for sixth in range(10):
+                        values = [punto_two, 0, banco_two, 0, fifth, sixth]
+                        shoe = StackedShoe(VALUE_CARDS[value] for value in values)
+                        coup = resolve_coup(shoe)[2]
+                        expected = pack_outcome(RESULTS.index(coup.result), coup.punto_value,
+                                                coup.banco_value, len(coup.punto_values) == 3,
+                                                len(coup.banco_values) == 3, coup.natural)
+                        self.assertEqual(table[outcome_index(values)], expected, values)
+
+    def test_unpack(self):
+        code = pack_outcome(1, 8, 7, True, False, False)
+        self.assertEqual(unpack_outcome(code), ('punto', 8, 7, True, False, False))
+
+if __name__ == '__main__':
+    unittest.main()
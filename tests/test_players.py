@@ -0,0 +1,45 @@
+import random
+import unittest
+from players import Player, Seats
+from rules import Table
+from sides import SIDE_BETS
+
+class TestSeats(unittest.TestCase):
+
+    def test_matches_player(self):
+        """Seats settle hand and side bets like Player objects."""
+        rng = random.Random(1)
+        table = Table(rng=1)
+        for coup in range(200):
+            player = Player(1000)
+            seats = Seats()
+            seats.add(1000)
+            hand = rng.choice(['punto', 'banco', 'tie'])
+            bet = rng.choice(SIDE_BETS)
+            player.hand_bet = hand
+            player.amount_bet = 10
+            player.side_bet(bet, 5)
+            seats.bet(0, hand, 10)
+            seats.side_bet(0, bet, 5)
+            table.deal_hands()
+            if not table.is_natural():
+                table.draw_thirds()
+            result = table.game_result()
+            payouts = table.side_results()
+            if hand == result:
+                player.win()
+            else:
+                player.lose()
+            player.settle_side_bets(payouts)
+            seats.settle(0, result, payouts)
+            self.assertEqual(seats.balance(0), player.balance)
+            table.open_bets()
+
+    def test_invalid_side_bet(self):
+        seats = Seats()
+        seats.add(100)
+        with self.assertRaises(ValueError):
+            seats.side_bet(0, 'banco', 10)
+
+if __name__ == '__main__':
+    unittest.main()
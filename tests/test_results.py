@@ -0,0 +1,93 @@
+import os
+import unittest
+import tempfile
+from rules import iter_shoes
+from results import WRITERS, BinaryWriter, group_shoes, read_binary, iter_binary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def shoe_stream(num_shoes, seed):
+    """Returns the (shoe number, coup) pairs of seeded shoes."""
+    return list(iter_shoes(num_shoes, 8, seed))
+
+class TestWriters(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self._directory.name, name)
+
+    def read(self, name):
+        with open(self.path(name), 'rb') as sim_file:
+            return sim_file.read()
+
+    def test_resume(self):
+        """A file resumed at an offset of tell() is the same as one written at
+        once, whatever was written after the offset.
+        """
+        shoes = list(group_shoes(shoe_stream(6, 3)))
+        for file_format, writer_class in WRITERS.items():
+            with writer_class(self.path(f'full.{file_format}')) as writer:
+                for shoe_number, coups in shoes:
+                    writer.write_shoe(shoe_number, coups)
+                writer.write_totals({'banco': 1, 'punto': 1, 'tie': 0}, 2)
+            with writer_class(self.path(f'resumed.{file_format}')) as writer:
+                for shoe_number, coups in shoes[:3]:
+                    writer.write_shoe(shoe_number, coups)
+                offset = writer.tell()
+                writer.write_shoe(*shoes[0])
+            with writer_class(self.path(f'resumed.{file_format}'), offset) as writer:
+                for shoe_number, coups in shoes[3:]:
+                    writer.write_shoe(shoe_number, coups)
+                writer.write_totals({'banco': 1, 'punto': 1, 'tie': 0}, 2)
+            self.assertEqual(self.read(f'resumed.{file_format}'),
+                             self.read(f'full.{file_format}'), file_format)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_binary_round_trip(self):
+        """iter_binary() reads back the coups written, without the pairs."""
+        stream = shoe_stream(5, 1)
+        with BinaryWriter(self.path('sim.bin')) as writer:
+            writer.write_stream(stream)
+        expected = [(shoe_number, coup._replace(punto_pair=None, banco_pair=None))
+                    for shoe_number, coup in stream]
+        self.assertEqual(list(iter_binary(self.path('sim.bin'), chunk_size=50)), expected)
+        records = read_binary(self.path('sim.bin'))
+        self.assertEqual(len(records), len(stream))
+        self.assertEqual(records.shoe.tolist(), [shoe_number for shoe_number, _ in stream])
+        self.assertEqual(records.punto_value.tolist(), [coup.punto_value for _, coup in stream])
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_read_binary_errors(self):
+        with BinaryWriter(self.path('empty.bin')):
+            pass
+        self.assertEqual(len(read_binary(self.path('empty.bin'))), 0)
+        with open(self.path('sim.txt'), 'w') as sim_file:
+            sim_file.write('Shoe number 1\n')
+        with self.assertRaises(ValueError):
+            read_binary(self.path('sim.txt'))
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_format_records(self):
+        """Every writer formats the arrays of a binary file like its coups."""
+        stream = shoe_stream(4, 2)
+        with BinaryWriter(self.path('sim.bin')) as writer:
+            writer.write_stream(stream)
+        records = read_binary(self.path('sim.bin'))
+        for file_format, writer_class in WRITERS.items():
+            with writer_class(self.path(f'sim_records.{file_format}')) as writer:
+                expected = b''
+                for shoe_number, coups in group_shoes(stream):
+                    record = writer.format_shoe(shoe_number, coups)
+                    expected += record if isinstance(record, bytes) else record.encode()
+                record = writer.format_records(records)
+                record = record if isinstance(record, bytes) else record.encode()
+                self.assertEqual(record, expected, file_format)
+
+if __name__ == '__main__':
+    unittest.main()
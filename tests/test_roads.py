@@ -0,0 +1,121 @@
+import random
+import unittest
+from roads import Grid, Roads, RoadStats, DERIVED_ROADS, RED, BLUE
+
+def random_results(seed, count):
+    rng = random.Random(seed)
+    return [rng.choice(['banco', 'banco', 'punto', 'punto', 'tie']) for i in range(count)]
+
+def derived_marks(results, distance):
+    """Rebuilds a derived road from the whole big road after every result,
+    with the rules as printed: a new column compares the lengths of the two
+    columns before it, distance columns apart; any other mark looks at the
+    column distance columns to the left, red if it has a cell on the same row
+    or has none on the row above, blue if it ends on the row above.
+    """
+    marks = []
+    wins = []
+    for result in results:
+        if result == 'tie':
+            continue
+        wins.append(result)
+        columns = []
+        for win in wins:
+            if columns and columns[-1][0] == win:
+                columns[-1][1] += 1
+            else:
+                columns.append([win, 1])
+        column = len(columns) - 1
+        row = columns[-1][1] - 1
+        if row == 0:
+            if column - 1 - distance >= 0:
+                same = columns[column - 1][1] == columns[column - 1 - distance][1]
+                marks.append(RED if same else BLUE)
+        elif column - distance >= 0:
+            length = columns[column - distance][1]
+            has_cell = length > row
+            has_above = length > row - 1
+            marks.append(RED if has_cell or not has_above else BLUE)
+    return bytearray(marks)
+
+class TestGrid(unittest.TestCase):
+
+    def test_dragon_tail(self):
+        """A long column turns right on the last row, and a later column turns
+        right above the tail.
+        """
+        grid = Grid()
+        positions = [grid.add(1) for i in range(7)]
+        self.assertEqual(positions, [(0, row) for row in range(6)] + [(1, 5)])
+        positions = [grid.add(2) for i in range(7)]
+        self.assertEqual(positions, [(1, row) for row in range(5)] + [(2, 4), (3, 4)])
+        self.assertEqual(grid.add(1), (2, 0))
+        self.assertEqual(grid.lengths, [7, 7, 1])
+        self.assertEqual(grid.column_marks, bytearray([1, 2, 1]))
+        self.assertEqual(grid.num_columns, 4)
+        self.assertEqual(grid.to_rows()[5], [1, 1, 0, 0])
+
+    def test_blocked_start(self):
+        """A new column starts further right when its top cell is taken by a
+        dragon tail.
+        """
+        grid = Grid(2)
+        self.assertEqual([grid.add(1) for i in range(3)], [(0, 0), (0, 1), (1, 1)])
+        self.assertEqual([grid.add(2) for i in range(2)], [(1, 0), (2, 0)])
+        self.assertEqual(grid.add(1), (3, 0))
+
+class TestRoads(unittest.TestCase):
+
+    def test_example(self):
+        roads = Roads()
+        for result in ['tie', 'banco', 'banco', 'tie', 'tie', 'punto', 'punto', 'punto',
+                       'banco']:
+            roads.add(result)
+        self.assertEqual(roads.bead_plate, bytearray([3, 1, 1, 3, 3, 2, 2, 2, 1]))
+        self.assertEqual(roads.leading_ties, 1)
+        self.assertEqual(roads.ties, {1: 2})
+        self.assertEqual(roads.big_road.lengths, [2, 3, 1])
+        self.assertEqual(roads.derived['big_eye_boy'].marks, bytearray([RED, BLUE, BLUE]))
+        self.assertEqual(roads.derived['small_road'].marks, bytearray())
+        self.assertEqual(roads.bead_position(8), (1, 2))
+
+    def test_derived_rules(self):
+        """The incremental derived roads match the rules applied to the whole
+        big road after every result.
+        """
+        for seed in range(30):
+            results = random_results(seed, 80)
+            roads = Roads()
+            added = {road: bytearray() for road in DERIVED_ROADS}
+            for result in results:
+                for road, mark in roads.add(result).items():
+                    added[road].append(mark)
+            for road, distance in DERIVED_ROADS.items():
+                expected = derived_marks(results, distance)
+                self.assertEqual(roads.derived[road].marks, expected, (seed, road))
+                self.assertEqual(added[road], expected, (seed, road))
+
+class TestRoadStats(unittest.TestCase):
+
+    def test_merge(self):
+        shoes = [random_results(seed, 80) for seed in range(10)]
+        expected = RoadStats()
+        for results in shoes:
+            expected.add_shoe(results)
+        first, second = RoadStats(), RoadStats()
+        for results in shoes[:4]:
+            first.add_shoe(results)
+        for results in shoes[4:]:
+            second.add_shoe(results)
+        first.merge(second)
+        self.assertEqual(first.state(), expected.state())
+        restored = RoadStats()
+        restored.restore(expected.state())
+        self.assertEqual(restored.report(), expected.report())
+        big_road = expected.report()['big_road']
+        wins = sum(result != 'tie' for results in shoes for result in results)
+        self.assertAlmostEqual(sum(marks['columns'] * marks['mean_length']
+                                   for marks in big_road.values()), wins)
+
+if __name__ == '__main__':
+    unittest.main()
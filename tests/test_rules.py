@@ -0,0 +1,58 @@
+import sys
+import random
+import unittest
+from unittest import mock
+from rules import Table
+from sides import SIDE_BETS
+
+def play_rounds(seed, settle_all):
+    """Plays random rounds of bets and side bets at a Table, settling them with
+    settle_all() or bet_result().
+
+    Returns:
+        list, the balance of every seat after each round.
+    """
+    rng = random.Random(seed)
+    table = Table(rng=seed)
+    for i in range(rng.randint(1, 6)):
+        table.add_player(rng.randint(1, 300))
+    balances = []
+    for coup in range(30):
+        if rng.random() < 0.2:
+            table.add_player(rng.randint(1, 300))
+        for player_i in table.available_players:
+            if rng.random() < 0.6:
+                try:
+                    table.bet(player_i, rng.choice(['punto', 'banco', 'tie']), rng.randint(1, 50))
+                except ValueError:
+                    pass
+            if rng.random() < 0.4:
+                try:
+                    table.side_bet(player_i, rng.choice(SIDE_BETS), rng.randint(1, 20))
+                except ValueError:
+                    pass
+        table.deal_hands()
+        if not table.is_natural():
+            table.draw_thirds()
+        if settle_all:
+            table.settle_all()
+        else:
+            for player_i in table.valid_bets:
+                table.bet_result(player_i)
+        table.open_bets()
+        balances.append([table._seats.balance(seat) for seat in range(table.num_players)])
+    return balances
+
+class TestSettleAll(unittest.TestCase):
+
+    def test_matches_bet_result(self):
+        for seed in range(50):
+            self.assertEqual(play_rounds(seed, True), play_rounds(seed, False), seed)
+
+    def test_without_numpy(self):
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            for seed in range(50):
+                self.assertEqual(play_rounds(seed, True), play_rounds(seed, False), seed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import json
+import asyncio
+import unittest
+import tempfile
+from server import Server
+
+TIMEOUT = 5.0
+
+class Connection:
+    """Client side of a connection to the server, collecting the events sent
+    before each reply.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def receive(self):
+        """Returns the next message."""
+        return json.loads(await asyncio.wait_for(self.reader.readline(), TIMEOUT))
+
+    async def ask(self, request):
+        """Sends a request, a dict or a raw line.
+
+        Returns:
+            tuple, with the reply and the list of events received before it.
+        """
+        line = request if isinstance(request, bytes) else json.dumps(request).encode()
+        self.writer.write(line + b'\n')
+        events = []
+        while True:
+            message = await self.receive()
+            if 'event' not in message:
+                return message, events
+            events.append(message)
+
+async def serve(test, window=60.0):
+    """Starts a seeded server on a Unix socket and runs a test coroutine
+    with two connections to it.
+    """
+    server = Server(window=window, num_decks=8, seed=3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'server.sock')
+        listener = await server.start(path=path)
+        connections = [Connection(*await asyncio.open_unix_connection(path))
+                       for _ in range(2)]
+        try:
+            return await test(*connections)
+        finally:
+            for connection in connections:
+                connection.writer.close()
+                await connection.writer.wait_closed()
+            # Lets the server see the connections closed before the loop ends
+            await asyncio.sleep(0.01)
+            server.close()
+            listener.close()
+            await listener.wait_closed()
+
+class TestServer(unittest.TestCase):
+
+    def test_coup(self):
+        async def test(first, second):
+            reply, _ = await first.ask({'op': 'join', 'table': 'a', 'id': 1})
+            self.assertEqual(reply, {'id': 1, 'table': 'a', 'decks': 8, 'coup': 0,
+                                     'closes_in': None, 'ok': True})
+            await second.ask({'op': 'join', 'table': 'a'})
+            reply, _ = await first.ask({'op': 'add_player', 'table': 'a', 'balance': 1000})
+            self.assertEqual(reply['player'], 0)
+            reply, events = await first.ask({'op': 'bet', 'table': 'a', 'player': 0,
+                                             'hand': 'banco', 'amount': 100})
+            self.assertTrue(reply['ok'])
+            self.assertEqual(events, [{'event': 'bets', 'table': 'a', 'coup': 1,
+                                       'closes_in': 60.0}])
+            reply, events = await second.ask({'op': 'bet', 'table': 'a', 'player': 0,
+                                              'hand': 'punto', 'amount': 100})
+            self.assertEqual(reply, {'ok': False, 'error': 'Player not added by this client.'})
+            self.assertEqual([event['event'] for event in events], ['bets'])
+            reply, events = await first.ask({'op': 'deal', 'table': 'a'})
+            result, = events
+            self.assertEqual(reply, {'coup': 1, 'result': result['result'], 'ok': True})
+            self.assertEqual(result['event'], 'result')
+            self.assertIn(len(result['punto_cards'].split(', ')), (2, 3))
+            self.assertEqual(result['players'][0]['player'], 0)
+            self.assertEqual(await second.receive(), result)
+            reply, _ = await second.ask({'op': 'status', 'table': 'a'})
+            self.assertEqual((reply['coup'], reply['closes_in'], reply['valid_bets']),
+                             (1, None, []))
+            self.assertEqual(len(reply['players']), 1)
+            reply, _ = await second.ask({'op': 'tables'})
+            self.assertEqual(reply['tables'], [{'table': 'a', 'players': 1, 'coup': 1,
+                                                'clients': 2}])
+            return result
+
+        first, second = asyncio.run(serve(test)), asyncio.run(serve(test))
+        self.assertEqual(first, second)
+        balance = {'banco': 1095, 'punto': 900, 'tie': 1000}[first['result']]
+        self.assertEqual(first['players'][0]['balance'], balance)
+
+    def test_window(self):
+        async def test(first, second):
+            await first.ask({'op': 'join', 'table': 'a'})
+            await first.ask({'op': 'add_player', 'table': 'a', 'balance': 1000})
+            await first.ask({'op': 'bet', 'table': 'a', 'player': 0,
+                             'hand': 'punto', 'amount': 10})
+            result = await first.receive()
+            self.assertEqual((result['event'], result['coup']), ('result', 1))
+            self.assertEqual(len(result['players']), 1)
+
+        asyncio.run(serve(test, window=0.05))
+
+    def test_errors(self):
+        async def test(first, second):
+            requests = [
+                (b'{"op": ', 'Invalid JSON.'),
+                (b'[1, 2]', 'Request must be a JSON object.'),
+                ({'op': 'fold', 'id': 'x'}, 'Unknown op.'),
+                ({'op': 'join'}, 'Missing table.'),
+                ({'op': 'deal', 'table': 'b'}, 'Unknown table.'),
+                ]
+            for request, error in requests:
+                reply, events = await first.ask(request)
+                self.assertEqual(events, [])
+                self.assertFalse(reply['ok'])
+                self.assertEqual(reply['error'], error)
+            self.assertEqual(reply.get('id'), None)
+            reply, _ = await first.ask({'op': 'fold', 'id': 'x'})
+            self.assertEqual(reply['id'], 'x')
+
+        asyncio.run(serve(test))
+
+if __name__ == '__main__':
+    unittest.main()
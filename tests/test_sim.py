@@ -0,0 +1,82 @@
+import io
+import os
+import sys
+import runpy
+import unittest
+import tempfile
+import contextlib
+from unittest import mock
+
+SIM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'baccarat-sim.py')
+
+class Interrupted(Exception):
+    pass
+
+class TestResume(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.sim = runpy.run_path(SIM_PATH)
+        main_globals = self.sim['main'].__globals__
+        # Small chunks, so that a short run has many checkpoints
+        patcher = mock.patch.dict(main_globals, {'SHOE_BATCH': 40})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_sim(self, name, args, checkpoints=None):
+        """Runs main() in its own directory, stopping after a number of
+        checkpoints if set.
+
+        Returns:
+            tuple, with the final line of the output and the directory.
+        """
+        directory = os.path.join(self._directory.name, name)
+        os.makedirs(directory, exist_ok=True)
+        save_checkpoint = self.sim['save_checkpoint']
+        saved = []
+
+        def interrupt(file_name, state):
+            save_checkpoint(file_name, state)
+            saved.append(file_name)
+            if len(saved) == checkpoints:
+                raise Interrupted
+
+        output = io.StringIO()
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            with mock.patch.object(sys, 'argv', [SIM_PATH] + args), \
+                    mock.patch.dict(self.sim['main'].__globals__,
+                                    {'save_checkpoint': interrupt}), \
+                    contextlib.redirect_stdout(output):
+                try:
+                    self.sim['main']()
+                except Interrupted:
+                    pass
+        finally:
+            os.chdir(cwd)
+        return output.getvalue().rsplit('\r', 1)[-1], directory
+
+    def test_resume(self):
+        """A run resumed from a checkpoint writes the same file and prints the
+        same statistics as an uninterrupted one.
+        """
+        for file_format in ['text', 'csv', 'bin']:
+            args = ['-s', '150', '--seed', '4', '-e', 'table', '-f', file_format,
+                    '--side-bets', '--roads', '--batch-size', '300']
+            expected, full = self.run_sim(f'{file_format}_full', args)
+            _, resumed = self.run_sim(f'{file_format}_resumed', args, checkpoints=2)
+            checkpoint, = [name for name in os.listdir(resumed) if name.endswith('.checkpoint')]
+            output, _ = self.run_sim(f'{file_format}_resumed',
+                                     ['--resume', os.path.join(resumed, checkpoint)])
+            self.assertEqual(output, expected, file_format)
+            full_file, = os.listdir(full)
+            resumed_file, = os.listdir(resumed)
+            with open(os.path.join(full, full_file), 'rb') as full_sim, \
+                    open(os.path.join(resumed, resumed_file), 'rb') as resumed_sim:
+                self.assertEqual(resumed_sim.read(), full_sim.read(), file_format)
+
+if __name__ == '__main__':
+    unittest.main()
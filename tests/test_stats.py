@@ -0,0 +1,85 @@
+import math
+import random
+import unittest
+import statistics
+from stats import Welford, BatchMeans
+
+# Rate and EV of a bet on the first category, paying 0.95, like the banco bet.
+VALUES = {'rate': [1, 0, 0], 'EV': [0.95, -1, 0]}
+
+def observations(seed, count):
+    rng = random.Random(seed)
+    return [rng.choice([0, 0, 1, 1, 2]) for i in range(count)]
+
+class TestWelford(unittest.TestCase):
+
+    def test_variance(self):
+        values = [random.Random(1).random() for i in range(100)]
+        welford = Welford()
+        for value in values:
+            welford.add(value)
+        self.assertAlmostEqual(welford.mean, statistics.mean(values))
+        self.assertAlmostEqual(welford.variance, statistics.variance(values))
+        self.assertEqual(Welford(*welford.state()).state(), welford.state())
+
+class TestBatchMeans(unittest.TestCase):
+
+    def test_batch_means(self):
+        """The standard error comes from the means of complete batches."""
+        categories = observations(1, 1050)
+        stream = BatchMeans(VALUES, 100)
+        for category in categories:
+            stream.add(category)
+        self.assertEqual(stream.count, 1000)
+        self.assertEqual(stream.num_batches, 10)
+        for metric, values in VALUES.items():
+            means = [sum(values[category] for category in categories[start:start + 100]) / 100
+                     for start in range(0, 1000, 100)]
+            self.assertAlmostEqual(stream.mean(metric),
+                                   sum(values[category] for category in categories) / 1050)
+            self.assertAlmostEqual(stream.standard_error(metric),
+                                   statistics.stdev(means) / math.sqrt(10))
+            low, high = stream.report()[metric]['interval']
+            self.assertAlmostEqual((low + high) / 2, stream.mean(metric))
+
+    def test_add_categories(self):
+        """Adding bytes of categories in any slices gives the same state as
+        adding them one by one.
+        """
+        categories = observations(2, 5000)
+        for batch_size in [1, 7, 1000, 6000]:
+            expected = BatchMeans(VALUES, batch_size)
+            for category in categories:
+                expected.add(category)
+            rng = random.Random(batch_size)
+            stream = BatchMeans(VALUES, batch_size)
+            start = 0
+            while start < len(categories):
+                stop = start + rng.randint(0, 2500)
+                stream.add_categories(bytes(categories[start:stop]))
+                start = stop
+            self.assertEqual(stream.state(), expected.state(), batch_size)
+
+    def test_restore(self):
+        categories = observations(3, 3000)
+        expected = BatchMeans(VALUES, 250)
+        expected.add_categories(bytes(categories))
+        stream = BatchMeans(VALUES, 250)
+        stream.add_categories(bytes(categories[:1111]))
+        restored = BatchMeans(VALUES, 250)
+        restored.restore(stream.state())
+        restored.add_categories(bytes(categories[1111:]))
+        self.assertEqual(restored.report(), expected.report())
+
+    def test_precise(self):
+        stream = BatchMeans(VALUES, 100)
+        self.assertIsNone(stream.mean('rate'))
+        stream.add_categories(bytes(observations(4, 150)))
+        self.assertIsNone(stream.standard_error('rate'))
+        self.assertFalse(stream.precise(1))
+        stream.add_categories(bytes(observations(5, 50)))
+        self.assertTrue(stream.precise(1))
+        self.assertFalse(stream.precise(0))
+
+if __name__ == '__main__':
+    unittest.main()